@@ -14,7 +14,7 @@ from app.models import User, NewsArticle, SavedArticle, ArticleSummary
 from app.config import settings
 
 config = context.config
-config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+config.set_main_option("sqlalchemy.url", settings.require("DATABASE_URL"))
 
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
@@ -0,0 +1,96 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('username', sa.String(), nullable=False),
+        sa.Column('hashed_password', sa.String(), nullable=True),
+        sa.Column('full_name', sa.String(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('is_google_user', sa.Boolean(), nullable=True),
+        sa.Column('google_id', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('google_id'),
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+
+    op.create_table(
+        'news_articles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('source_id', sa.String(), nullable=True),
+        sa.Column('source_name', sa.String(), nullable=True),
+        sa.Column('author', sa.String(), nullable=True),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('url', sa.String(), nullable=False),
+        sa.Column('url_to_image', sa.String(), nullable=True),
+        sa.Column('published_at', sa.DateTime(), nullable=True),
+        sa.Column('content', sa.Text(), nullable=True),
+        sa.Column('category', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('url'),
+    )
+    op.create_index('idx_category_published', 'news_articles', ['category', 'published_at'], unique=False)
+    op.create_index(op.f('ix_news_articles_id'), 'news_articles', ['id'], unique=False)
+
+    op.create_table(
+        'article_summaries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('article_id', sa.Integer(), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['article_id'], ['news_articles.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_article_summaries_id'), 'article_summaries', ['id'], unique=False)
+
+    op.create_table(
+        'saved_articles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('article_id', sa.Integer(), nullable=False),
+        sa.Column('saved_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['article_id'], ['news_articles.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('idx_user_article', 'saved_articles', ['user_id', 'article_id'], unique=True)
+    op.create_index(op.f('ix_saved_articles_id'), 'saved_articles', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_saved_articles_id'), table_name='saved_articles')
+    op.drop_index('idx_user_article', table_name='saved_articles')
+    op.drop_table('saved_articles')
+    op.drop_index(op.f('ix_article_summaries_id'), table_name='article_summaries')
+    op.drop_table('article_summaries')
+    op.drop_index(op.f('ix_news_articles_id'), table_name='news_articles')
+    op.drop_index('idx_category_published', table_name='news_articles')
+    op.drop_table('news_articles')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
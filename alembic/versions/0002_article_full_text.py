@@ -0,0 +1,26 @@
+"""Add extracted full text to news_articles
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('news_articles', sa.Column('full_text', sa.Text(), nullable=True))
+    op.add_column('news_articles', sa.Column('full_text_fetched_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('news_articles', 'full_text_fetched_at')
+    op.drop_column('news_articles', 'full_text')
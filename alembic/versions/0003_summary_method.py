@@ -0,0 +1,24 @@
+"""Record how each article summary was produced
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('article_summaries', sa.Column('method', sa.String(length=20), server_default='gemini', nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('article_summaries', 'method')
@@ -0,0 +1,185 @@
+"""Partition news_articles by month, add archive table and unique summary index
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from datetime import date
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+# Monthly partitions created ahead of time; the retention job keeps extending this
+PARTITIONS_AHEAD = 3
+# Names 0001's unnamed UNIQUE(url) the way PostgreSQL does, so batch mode can drop it
+URL_KEY_CONVENTION = {"uq": "%(table_name)s_%(column_0_name)s_key"}
+
+ARTICLE_COLUMNS = (
+    "id, source_id, source_name, author, title, description, url, url_to_image, "
+    "published_at, content, full_text, full_text_fetched_at, category, created_at"
+)
+
+
+def _add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def _article_columns(id_default=None):
+    return [
+        sa.Column('id', sa.Integer(), server_default=id_default, autoincrement=False, nullable=False),
+        sa.Column('source_id', sa.String(), nullable=True),
+        sa.Column('source_name', sa.String(), nullable=True),
+        sa.Column('author', sa.String(), nullable=True),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('url', sa.String(), nullable=False),
+        sa.Column('url_to_image', sa.String(), nullable=True),
+        sa.Column('published_at', sa.DateTime(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=True),
+        sa.Column('full_text', sa.Text(), nullable=True),
+        sa.Column('full_text_fetched_at', sa.DateTime(), nullable=True),
+        sa.Column('category', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+    ]
+
+
+def _partition_news_articles() -> None:
+    bind = op.get_bind()
+
+    # FKs cannot reference a partitioned table unless they include the partition key
+    op.drop_constraint('saved_articles_article_id_fkey', 'saved_articles', type_='foreignkey')
+    op.drop_constraint('article_summaries_article_id_fkey', 'article_summaries', type_='foreignkey')
+
+    # Keep the id sequence alive when the old table is dropped
+    op.execute("ALTER SEQUENCE news_articles_id_seq OWNED BY NONE")
+    op.rename_table('news_articles', 'news_articles_legacy')
+    op.execute("ALTER TABLE news_articles_legacy RENAME CONSTRAINT news_articles_pkey TO news_articles_legacy_pkey")
+    op.execute("ALTER TABLE news_articles_legacy RENAME CONSTRAINT news_articles_url_key TO news_articles_legacy_url_key")
+    op.drop_index('idx_category_published', table_name='news_articles_legacy')
+    op.drop_index('ix_news_articles_id', table_name='news_articles_legacy')
+
+    # Unique constraints on a partitioned table must include the partition key
+    op.create_table(
+        'news_articles',
+        *_article_columns(sa.text("nextval('news_articles_id_seq'::regclass)")),
+        sa.PrimaryKeyConstraint('id', 'published_at', name='news_articles_pkey'),
+        sa.UniqueConstraint('url', 'published_at', name='news_articles_url_key'),
+        postgresql_partition_by='RANGE (published_at)',
+    )
+    op.create_index('idx_category_published', 'news_articles', ['category', 'published_at'], unique=False)
+    # Lookups by id probe each partition's index; lookups by url use news_articles_url_key
+    op.create_index('ix_news_articles_id', 'news_articles', ['id'], unique=False)
+
+    oldest = bind.execute(sa.text("SELECT min(published_at) FROM news_articles_legacy")).scalar()
+    month = date.today().replace(day=1)
+    if oldest is not None:
+        month = min(month, oldest.date().replace(day=1))
+    last = _add_months(date.today().replace(day=1), PARTITIONS_AHEAD)
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE news_articles_p{month:%Y_%m} PARTITION OF news_articles "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+    # Anything outside the monthly ranges (e.g. bogus future dates)
+    op.execute("CREATE TABLE news_articles_default PARTITION OF news_articles DEFAULT")
+
+    op.execute(f"INSERT INTO news_articles ({ARTICLE_COLUMNS}) SELECT {ARTICLE_COLUMNS} FROM news_articles_legacy")
+    op.drop_table('news_articles_legacy')
+    op.execute("ALTER SEQUENCE news_articles_id_seq OWNED BY news_articles.id")
+
+
+def _unpartition_news_articles() -> None:
+    op.execute("ALTER SEQUENCE news_articles_id_seq OWNED BY NONE")
+    op.rename_table('news_articles', 'news_articles_partitioned')
+    op.execute("ALTER TABLE news_articles_partitioned RENAME CONSTRAINT news_articles_pkey TO news_articles_partitioned_pkey")
+    op.execute("ALTER TABLE news_articles_partitioned RENAME CONSTRAINT news_articles_url_key TO news_articles_partitioned_url_key")
+    op.drop_index('idx_category_published', table_name='news_articles_partitioned')
+    op.drop_index('ix_news_articles_id', table_name='news_articles_partitioned')
+
+    op.create_table(
+        'news_articles',
+        *_article_columns(sa.text("nextval('news_articles_id_seq'::regclass)")),
+        sa.PrimaryKeyConstraint('id', name='news_articles_pkey'),
+        sa.UniqueConstraint('url', name='news_articles_url_key'),
+    )
+    op.create_index('idx_category_published', 'news_articles', ['category', 'published_at'], unique=False)
+    op.create_index('ix_news_articles_id', 'news_articles', ['id'], unique=False)
+    op.execute(f"INSERT INTO news_articles ({ARTICLE_COLUMNS}) SELECT {ARTICLE_COLUMNS} FROM news_articles_partitioned")
+    op.execute("DROP TABLE news_articles_partitioned CASCADE")
+    op.execute("ALTER SEQUENCE news_articles_id_seq OWNED BY news_articles.id")
+    op.alter_column('news_articles', 'published_at', existing_type=sa.DateTime(), nullable=True)
+
+    # Summaries/saves of archived articles would violate the restored FKs
+    op.execute("DELETE FROM article_summaries WHERE article_id NOT IN (SELECT id FROM news_articles)")
+    op.execute("DELETE FROM saved_articles WHERE article_id NOT IN (SELECT id FROM news_articles)")
+    op.create_foreign_key('saved_articles_article_id_fkey', 'saved_articles', 'news_articles', ['article_id'], ['id'])
+    op.create_foreign_key('article_summaries_article_id_fkey', 'article_summaries', 'news_articles', ['article_id'], ['id'])
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # published_at becomes the partition key
+    op.execute("UPDATE news_articles SET published_at = COALESCE(created_at, CURRENT_TIMESTAMP) WHERE published_at IS NULL")
+
+    # Keep the newest summary per article before enforcing uniqueness
+    op.execute(
+        "DELETE FROM article_summaries WHERE id NOT IN "
+        "(SELECT max(id) FROM article_summaries GROUP BY article_id)"
+    )
+    op.create_index('idx_article_summaries_article_id', 'article_summaries', ['article_id'], unique=True)
+    op.create_index('idx_saved_article_id', 'saved_articles', ['article_id'], unique=False)
+
+    op.create_table(
+        'news_articles_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('source_id', sa.String(), nullable=True),
+        sa.Column('source_name', sa.String(), nullable=True),
+        sa.Column('author', sa.String(), nullable=True),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('url', sa.String(), nullable=False),
+        sa.Column('url_to_image', sa.String(), nullable=True),
+        sa.Column('published_at', sa.DateTime(), nullable=True),
+        sa.Column('content', sa.Text(), nullable=True),
+        sa.Column('full_text', sa.Text(), nullable=True),
+        sa.Column('category', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    # Range partitioning is PostgreSQL-only; other databases keep a plain table
+    # with the same constraints
+    if bind.dialect.name == 'postgresql':
+        _partition_news_articles()
+    else:
+        with op.batch_alter_table('news_articles', naming_convention=URL_KEY_CONVENTION) as batch_op:
+            batch_op.alter_column('published_at', existing_type=sa.DateTime(), nullable=False)
+            batch_op.drop_constraint('news_articles_url_key', type_='unique')
+            batch_op.create_unique_constraint('news_articles_url_key', ['url', 'published_at'])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        _unpartition_news_articles()
+    else:
+        with op.batch_alter_table('news_articles') as batch_op:
+            batch_op.alter_column('published_at', existing_type=sa.DateTime(), nullable=True)
+            batch_op.drop_constraint('news_articles_url_key', type_='unique')
+            batch_op.create_unique_constraint('news_articles_url_key', ['url'])
+
+    op.drop_table('news_articles_archive')
+    op.drop_index('idx_saved_article_id', table_name='saved_articles')
+    op.drop_index('idx_article_summaries_article_id', table_name='article_summaries')
@@ -0,0 +1,24 @@
+"""Index saved_articles.saved_at for trending reconciliation
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_saved_saved_at', 'saved_articles', ['saved_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_saved_saved_at', table_name='saved_articles')
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api import auth, news, ai, chat
+from app.api import auth, news, ai, chat, admin
 
 api_router = APIRouter()
 
@@ -7,3 +7,4 @@ api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 api_router.include_router(news.router, prefix="/news", tags=["News"])
 api_router.include_router(ai.router, prefix="/ai", tags=["AI"])
 api_router.include_router(chat.router, prefix="/chat", tags=["Chat"])
+api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.services.budget_service import newsapi_budget
+from app.services.ttl_policy import ttl_policy
+from app.utils.security import require_admin
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/cache", response_model=dict)
+async def get_cache_policy():
+    """NewsAPI budget, spend rate and the TTLs currently chosen per cache namespace"""
+    try:
+        return {
+            "budget": newsapi_budget.snapshot(),
+            "ttl": ttl_policy.describe()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to read cache policy: {str(e)}")
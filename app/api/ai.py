@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app.database import get_db
+from typing import Optional
+from app.config import settings
+from app.database import get_read_db
 from app.schemas.news import SummaryRequest, SummaryResponse
 from app.services.ai_service import ai_service
 from app.services.news_service import news_service
+from app.services.extraction_service import extraction_service
 from app.utils.security import get_current_user
 from app.models.user import User
 from app.models.news import NewsArticle
@@ -16,8 +19,9 @@ router = APIRouter()
 @router.post("/summarize", response_model=SummaryResponse)
 async def summarize_article(
     request: SummaryRequest,
+    mode: Optional[str] = Query(None, description="fast (local extractive), llm (Gemini) or auto"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     try:
         logger.info(f"Summarize request for URL: {request.article_url}")
@@ -27,21 +31,19 @@ async def summarize_article(
             logger.warning(f"Article not found for URL: {request.article_url}")
             raise HTTPException(status_code=404, detail="Article not found in database. Please save it first.")
         
-        logger.info(f"Found article ID: {article.id}, has content: {bool(article.content)}, content length: {len(article.content) if article.content else 0}")
+        logger.info(f"Found article ID: {article.id}, has content: {bool(article.content)}, content length: {len(article.content) if article.content else 0}, has full text: {bool(article.full_text)}")
         
-        if not article.content:
-            logger.warning(f"Article {article.id} has no content")
-            raise HTTPException(status_code=400, detail="Article content not available for summarization")
-        
-        if len(article.content.strip()) < 50:
-            logger.warning(f"Article {article.id} content too short: {len(article.content)} chars")
-            raise HTTPException(status_code=400, detail="Article content is too short for summarization")
-        
-        summary = await ai_service.summarize_article(db, article.id, article.content)
+        # NewsAPI content is truncated; the full text is fetched only if no summary exists yet
+        summary, method = await ai_service.summarize_article(
+            db, article.id, article.full_text or article.content,
+            load_full_text=lambda: extraction_service.ensure_full_text(db, article, settings.EXTRACTION_ON_DEMAND_TIMEOUT_SECONDS),
+            mode=mode
+        )
         logger.info(f"Successfully generated summary for article {article.id}")
         return {
             "summary": summary,
-            "article_id": article.id
+            "article_id": article.id,
+            "method": method
         }
     except HTTPException:
         raise
@@ -55,8 +57,9 @@ async def summarize_article(
 @router.post("/summarize/{article_id}", response_model=SummaryResponse)
 async def summarize_article_by_id(
     article_id: int,
+    mode: Optional[str] = Query(None, description="fast (local extractive), llm (Gemini) or auto"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     try:
         article = db.query(NewsArticle).filter(NewsArticle.id == article_id).first()
@@ -65,14 +68,15 @@ async def summarize_article_by_id(
             logger.warning(f"Article not found for ID: {article_id}")
             raise HTTPException(status_code=404, detail="Article not found")
         
-        if not article.content:
-            logger.warning(f"Article {article_id} has no content")
-            raise HTTPException(status_code=400, detail="Article content not available for summarization")
-        
-        summary = await ai_service.summarize_article(db, article.id, article.content)
+        summary, method = await ai_service.summarize_article(
+            db, article.id, article.full_text or article.content,
+            load_full_text=lambda: extraction_service.ensure_full_text(db, article, settings.EXTRACTION_ON_DEMAND_TIMEOUT_SECONDS),
+            mode=mode
+        )
         return {
             "summary": summary,
-            "article_id": article.id
+            "article_id": article.id,
+            "method": method
         }
     except HTTPException:
         raise
@@ -33,7 +33,8 @@ async def send_chat_message(
         result = await chat_service.chat(
             user_id=current_user.id,
             message=request.message,
-            conversation_history=conversation_history
+            conversation_history=conversation_history,
+            db=db
         )
         
         return {
@@ -1,16 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import Optional, List
-from app.database import get_db
-from app.schemas.news import NewsListResponse, NewsArticleResponse, SavedArticleResponse
+from app.config import settings
+from app.database import get_db, get_read_db, mark_recent_write
+from app.schemas.news import NewsListResponse, NewsArticleResponse, SavedArticleResponse, RelatedArticlesResponse
 from app.services.news_service import news_service
+from app.services.feed_service import feed_service
+from app.services.trending_service import trending_service
+from app.services.related_service import related_index
+from app.services.extraction_service import extraction_service, is_truncated
 from app.utils.security import get_current_user
+from app.utils.projection import ArticleView
 from app.models.user import User
+from app.models.news import NewsArticle
 from app.middleware.rate_limit import limiter
 from fastapi import Request
 
 router = APIRouter()
 
+def _article_view(fields: Optional[str], compact: bool) -> Optional[ArticleView]:
+    try:
+        return ArticleView.parse(fields, compact)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/headlines", response_model=dict)
 @limiter.limit("30/minute")
 async def get_headlines(
@@ -18,14 +31,36 @@ async def get_headlines(
     category: Optional[str] = Query(None, description="Category: business, entertainment, general, health, science, sports, technology"),
     country: str = Query("us", description="Country code"),
     page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100)
+    page_size: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma-separated article fields to return, e.g. title,url,source"),
+    compact: bool = Query(False, description="Columnar layout: a field list and one array per article")
 ):
+    view = _article_view(fields, compact)
     try:
-        data = await news_service.fetch_top_headlines(category, country, page, page_size)
+        data = await news_service.fetch_top_headlines(category, country, page, page_size, view=view)
         return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/headlines/bulk", response_model=dict)
+@limiter.limit("30/minute")
+async def get_headlines_bulk(
+    request: Request,
+    categories: Optional[str] = Query(None, description="Comma-separated categories (default: all seven)"),
+    country: str = Query("us", description="Country code"),
+    page_size: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma-separated article fields to return, e.g. title,url,source"),
+    compact: bool = Query(False, description="Columnar layout: a field list and one array per article")
+):
+    view = _article_view(fields, compact)
+    names = [name.strip().lower() for name in categories.split(",") if name.strip()] if categories else None
+    try:
+        return await news_service.fetch_headlines_bulk(names, country, page_size, view=view)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/search", response_model=dict)
 @limiter.limit("30/minute")
 async def search_news(
@@ -33,18 +68,81 @@ async def search_news(
     q: str = Query(..., description="Search query"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    from_date: Optional[str] = Query(None, description="From date (YYYY-MM-DD)")
+    from_date: Optional[str] = Query(None, description="From date (YYYY-MM-DD)"),
+    fields: Optional[str] = Query(None, description="Comma-separated article fields to return, e.g. title,url,source"),
+    compact: bool = Query(False, description="Columnar layout: a field list and one array per article")
 ):
+    view = _article_view(fields, compact)
     try:
-        data = await news_service.search_news(q, page, page_size, from_date)
+        data = await news_service.search_news(q, page, page_size, from_date, view=view)
         return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/feed", response_model=dict)
+async def get_feed(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    try:
+        articles, personalized = feed_service.get_feed(current_user.id, page, page_size)
+        # Past the end of a feed, or no saves: only rebuild when Redis lost the feed
+        if not personalized and feed_service.needs_rebuild(current_user.id) and feed_service.rebuild_user_feed(db, current_user.id):
+            articles, personalized = feed_service.get_feed(current_user.id, page, page_size)
+        return {
+            "articles": articles,
+            "page": page,
+            "page_size": page_size,
+            "personalized": personalized
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load feed: {str(e)}")
+
+@router.get("/trending", response_model=dict)
+async def get_trending(
+    hours: Optional[int] = Query(None, ge=1, description="Window in hours (default TRENDING_DEFAULT_HOURS)"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    try:
+        articles = trending_service.get_trending(hours, limit, db)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load trending articles: {str(e)}")
+    return {"articles": articles, "hours": hours or settings.TRENDING_DEFAULT_HOURS}
+
+@router.get("/{article_id}/related", response_model=RelatedArticlesResponse)
+async def get_related_articles(
+    article_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_read_db)
+):
+    article = db.query(NewsArticle).filter(NewsArticle.id == article_id).first()
+    if not article:
+        raise HTTPException(status_code=404, detail="Article not found")
+    
+    matches = related_index.related(article, limit)
+    articles = {
+        related.id: related
+        for related in db.query(NewsArticle).filter(NewsArticle.id.in_([match_id for match_id, _ in matches])).all()
+    }
+    return {
+        "article_id": article_id,
+        "related": [
+            {**NewsArticleResponse.model_validate(articles[match_id]).model_dump(), "score": round(score, 4)}
+            for match_id, score in matches
+            if match_id in articles
+        ]
+    }
+
 @router.post("/save/{article_url:path}")
 async def save_article(
     article_url: str,
     article_data: dict,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -57,6 +155,9 @@ async def save_article(
         
         article = news_service.save_article_to_db(db, article_data)
         saved = news_service.save_user_article(db, current_user.id, article.id)
+        mark_recent_write(current_user.id)
+        if article.full_text_fetched_at is None and is_truncated(article.content):
+            background_tasks.add_task(extraction_service.extract_by_id, article.id)
         return {
             "message": "Article saved successfully",
             "saved_article_id": saved.id,
@@ -72,7 +173,7 @@ async def get_saved_articles(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     saved_articles = news_service.get_user_saved_articles(db, current_user.id, skip, limit)
     return saved_articles
@@ -83,13 +184,7 @@ async def remove_saved_article(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    from app.models.news import SavedArticle
-    saved = db.query(SavedArticle).filter(
-        SavedArticle.user_id == current_user.id,
-        SavedArticle.article_id == article_id
-    ).first()
-    if not saved:
+    if not news_service.remove_saved_article(db, current_user.id, article_id):
         raise HTTPException(status_code=404, detail="Saved article not found")
-    db.delete(saved)
-    db.commit()
+    mark_recent_write(current_user.id)
     return {"message": "Article removed from saved"}
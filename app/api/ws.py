@@ -0,0 +1,61 @@
+import asyncio
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from app.config import settings
+from app.services.headline_stream import VALID_CATEGORIES, Subscriber, headline_hub
+from app.utils.metrics import WS_MESSAGES
+
+router = APIRouter()
+
+def _categories(values) -> set:
+    return {value.strip().lower() for value in values if value and value.strip().lower() in VALID_CATEGORIES}
+
+@router.websocket("/ws/headlines")
+async def headlines_socket(websocket: WebSocket, categories: str = "general", country: str = "us"):
+    """
+    Push new headline URLs as they appear.
+
+    Query: ?categories=technology,sports&country=us
+    Client messages: {"subscribe": ["science"]} or {"unsubscribe": ["sports"]}
+    Server messages: {"type": "headlines", "category", "country", "articles": [...]}
+    """
+    if headline_hub.connections >= settings.WS_MAX_CONNECTIONS:
+        await websocket.close(code=1013)
+        return
+    await websocket.accept()
+
+    subscriber = Subscriber(_categories(categories.split(",")), country.lower())
+    headline_hub.subscribe(subscriber)
+
+    async def send_updates():
+        while True:
+            message = await subscriber.queue.get()
+            # A client that cannot keep up is disconnected rather than buffered
+            await asyncio.wait_for(websocket.send_text(message), settings.WS_SEND_TIMEOUT_SECONDS)
+            WS_MESSAGES.labels("sent").inc()
+
+    async def receive_commands():
+        while True:
+            command = await websocket.receive_json()
+            if not isinstance(command, dict):
+                continue
+            subscriber.categories |= _categories(command.get("subscribe") or [])
+            subscriber.categories -= _categories(command.get("unsubscribe") or [])
+            await websocket.send_json({"type": "subscribed", "categories": sorted(subscriber.categories)})
+
+    tasks = [asyncio.create_task(send_updates()), asyncio.create_task(receive_commands())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        # The tasks raise inside themselves, so the reason is read from the finished one
+        error = next(task.exception() for task in done)
+        if isinstance(error, WebSocketDisconnect):
+            pass  # the client went away; there is nothing left to close
+        elif isinstance(error, asyncio.TimeoutError):
+            WS_MESSAGES.labels("slow_consumer").inc()
+            await websocket.close(code=1013)
+        else:
+            await websocket.close(code=1011)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        headline_hub.unsubscribe(subscriber)
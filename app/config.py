@@ -6,37 +6,139 @@ class Settings(BaseSettings):
     APP_NAME: str = "News App API"
     DEBUG: bool = True
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
+    METRICS_ENABLED: bool = True
+    ADMIN_TOKEN: Optional[str] = None  # required in X-Admin-Token for /api/admin; unset disables it
+    METRICS_TOKEN: Optional[str] = None  # required as a Bearer token for /metrics; unset leaves it open
+    
+    # Request profiling (needs pyinstrument; enable on one worker at a time)
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_SECRET: Optional[str] = None  # HMAC key for the X-Profile header
+    PROFILING_DIR: str = ".cache/profiles"
+    PROFILING_INTERVAL_SECONDS: float = 0.001
+    PROFILING_MAX_FILES: int = 200
+    
+    # OpenTelemetry tracing (needs opentelemetry-sdk)
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "otlp"  # otlp or file
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_FILE: str = "traces.jsonl"
+    TRACING_SAMPLE_RATE: float = 0.1  # share of new traces kept; incoming traceparent decides otherwise
+    TRACING_SERVICE_NAME: str = "news-api"
+    
+    # Event-loop watchdog: logs the stack of any callback blocking the loop this long
+    LOOP_WATCHDOG_ENABLED: bool = True
+    LOOP_WATCHDOG_THRESHOLD_MS: float = 100.0
+    LOOP_WATCHDOG_INTERVAL_MS: float = 25.0
     
     # Database
-    DATABASE_URL: str
+    DATABASE_URL: Optional[str] = None
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_RETRY_INTERVAL_SECONDS: int = 30
+    READ_YOUR_WRITES_SECONDS: int = 10
     
     # Redis
-    REDIS_URL: str
+    REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_CODEC: str = "msgpack"  # msgpack, json, or off (plain JSON text as before)
+    CACHE_COMPRESSION: str = "zstd"  # zstd or zlib
+    CACHE_COMPRESSION_THRESHOLD: int = 1024
+    CACHE_COMPRESSION_LEVEL: int = 3
     
     # News API
-    NEWS_API_KEY: str
+    NEWS_API_KEY: Optional[str] = None
     NEWS_API_BASE_URL: str = "https://newsapi.org/v2"
+    NEWSAPI_DAILY_QUOTA: int = 100  # 0 disables budget-based TTL stretching
+    BULK_HEADLINES_DEADLINE_SECONDS: float = 3.0  # per-category upstream deadline for /headlines/bulk
+    # Adaptive cache TTLs (see app/services/ttl_policy.py)
+    HEADLINES_CACHE_SECONDS: int = 600
+    SEARCH_CACHE_SECONDS: int = 600
+    CACHE_TTL_MIN_SECONDS: int = 60
+    CACHE_TTL_MAX_SECONDS: int = 6 * 3600
+    CACHE_HOT_KEY_RPM: float = 30.0
+    
+    # Headline WebSocket push
+    HEADLINES_REFRESH_SECONDS: int = 60
+    WS_MAX_CONNECTIONS: int = 1000
+    WS_QUEUE_SIZE: int = 32
+    WS_SEND_TIMEOUT_SECONDS: float = 5.0
     
     # Gemini AI
-    GEMINI_API_KEY: str
+    GEMINI_API_KEY: Optional[str] = None
+    
+    # Article full-text extraction
+    EXTRACTION_CACHE_DIR: str = ".cache/pages"
+    EXTRACTION_MAX_CONCURRENCY: int = 20
+    EXTRACTION_PER_HOST_CONCURRENCY: int = 2
+    EXTRACTION_POLITENESS_DELAY_SECONDS: float = 1.0
+    EXTRACTION_TIMEOUT_SECONDS: float = 10.0
+    EXTRACTION_ON_DEMAND_TIMEOUT_SECONDS: float = 5.0
+    EXTRACTION_MAX_PAGE_BYTES: int = 2_000_000
+    EXTRACTION_MAX_REDIRECTS: int = 5
+    # Article URLs come from clients; private, loopback and link-local hosts are refused unless set
+    EXTRACTION_ALLOW_PRIVATE_HOSTS: bool = False
+    EXTRACTION_USER_AGENT: str = "ThinkFeedBot/1.0 (+https://github.com/ragul66/ThinkFeed)"
+    
+    # Related articles index (memory-mapped, shared by all workers on a host)
+    RELATED_INDEX_DIR: str = ".cache/related"
+    RELATED_INDEX_DIM: int = 1024  # power of two
+    RELATED_INDEX_MAX_ARTICLES: int = 50_000
+    RELATED_MIN_SCORE: float = 0.1
+    
+    # Summaries: "auto" uses the local extractive summarizer when it is confident, else Gemini
+    SUMMARY_DEFAULT_MODE: str = "auto"
+    SUMMARY_EXTRACTIVE_MIN_CONFIDENCE: float = 0.6
+    SUMMARY_EXTRACTIVE_MAX_SENTENCES: int = 40
+    
+    # Speculative pre-summarization (0 disables the in-process scheduler)
+    PRESUMMARIZE_TOP_N: int = 20
+    PRESUMMARIZE_DAILY_BUDGET: int = 200
+    PRESUMMARIZE_INTERVAL_MINUTES: int = 0
+    
+    # Personalized feed
+    FEED_MAX_ITEMS: int = 500
+    FEED_RECENCY_HALF_LIFE_HOURS: float = 12.0
+    # How long a user without saved articles is served the recent feed before the DB is checked again
+    FEED_NO_SAVES_TTL_SECONDS: int = 300
+    
+    # Trending (most-saved) articles from hourly Redis counters
+    TRENDING_DEFAULT_HOURS: int = 24
+    TRENDING_MAX_HOURS: int = 72
+    TRENDING_CACHE_SECONDS: int = 60
+    
+    # Article retention: unsaved articles older than this are moved to news_articles_archive
+    ARTICLE_RETENTION_DAYS: int = 180
+    ARTICLE_PARTITIONS_AHEAD: int = 3  # monthly partitions kept ready (PostgreSQL)
+    RETENTION_BATCH_SIZE: int = 1000
     
     # Gemini AI Chat (separate key for chat feature, optional - defaults to GEMINI_API_KEY)
     GEMINI_CHAT_API_KEY: Optional[str] = None
+    # Stored articles injected as context into chat turns (0 articles disables retrieval)
+    CHAT_CONTEXT_ARTICLES: int = 5
+    CHAT_CONTEXT_MAX_TOKENS: int = 600
+    CHAT_CONTEXT_MIN_SCORE: float = 0.15
+    # Answers to history-less first turns, reused until the headlines change
+    CHAT_ANSWER_CACHE_ENABLED: bool = True
+    CHAT_ANSWER_CACHE_TTL_SECONDS: int = 900
+    CHAT_ANSWER_CACHE_MIN_SIMILARITY: float = 0.8  # Jaccard similarity of the questions' content words
+    CHAT_ANSWER_CACHE_MAX_ENTRIES: int = 500  # per headline version
     
     @property
-    def chat_api_key(self) -> str:
+    def chat_api_key(self) -> Optional[str]:
         """Return chat API key, fallback to main API key if not set"""
         return self.GEMINI_CHAT_API_KEY or self.GEMINI_API_KEY
     
     # JWT
-    SECRET_KEY: str
+    SECRET_KEY: Optional[str] = None
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
     # Google OAuth
-    GOOGLE_CLIENT_ID: str
-    GOOGLE_CLIENT_SECRET: str
-    GOOGLE_REDIRECT_URI: str
+    GOOGLE_CLIENT_ID: Optional[str] = None
+    GOOGLE_CLIENT_SECRET: Optional[str] = None
+    GOOGLE_REDIRECT_URI: Optional[str] = None
+    GOOGLE_CERTS_URL: str = "https://www.googleapis.com/oauth2/v3/certs"
+    GOOGLE_CERTS_TTL_SECONDS: int = 3600  # used when the response has no max-age
+    GOOGLE_CERTS_REFRESH_MARGIN_SECONDS: int = 300
     
     class Config:
         env_file = ".env"
@@ -45,5 +147,16 @@ class Settings(BaseSettings):
     @property
     def cors_origins(self) -> List[str]:
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
+    
+    @property
+    def replica_urls(self) -> List[str]:
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+    
+    def require(self, name: str) -> str:
+        """Return a setting that a feature needs, failing only that feature when it is missing"""
+        value = getattr(self, name)
+        if not value:
+            raise ValueError(f"{name} is not configured")
+        return value
 
 settings = Settings()
@@ -1,15 +1,196 @@
-from sqlalchemy import create_engine
+import itertools
+import threading
+import time
+import logging
+from typing import List, Optional
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql import Delete, Insert, Update
 from app.config import settings
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+logger = logging.getLogger(__name__)
+
+# The engine is created on first use so importing the app never touches the database.
+# Schema is managed by Alembic (`alembic upgrade head`).
+_engine: Optional[Engine] = None
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 Base = declarative_base()
 
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        _engine = create_engine(settings.require("DATABASE_URL"), pool_pre_ping=True)
+        SessionLocal.configure(bind=_engine)
+    return _engine
+
+def peek_engine() -> Optional[Engine]:
+    """Return the engine if it has been created, without creating it"""
+    return _engine
+
+def dispose_engine():
+    global _engine, _replica_set
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
+    if _replica_set is not None:
+        _replica_set.dispose()
+        _replica_set = None
+
+def __getattr__(name):
+    # Backwards compatible `from app.database import engine`
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 def get_db():
+    get_engine()
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+class ReplicaSet:
+    """
+    Round-robin over read replica engines.
+
+    A replica that raises a connection error is taken out of rotation for
+    `retry_interval` seconds, then probed with `SELECT 1` before it is used again.
+    """
+
+    def __init__(self, urls: List[str], retry_interval: float):
+        self.engines = [create_engine(url, pool_pre_ping=True) for url in urls]
+        self.retry_interval = retry_interval
+        self._down_until = {id(engine): 0.0 for engine in self.engines}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        for engine in self.engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def _on_error(self, context):
+        if context.engine is None:
+            return
+        if context.is_disconnect or isinstance(context.sqlalchemy_exception, exc.OperationalError):
+            self.mark_down(context.engine)
+
+    def mark_down(self, engine: Engine):
+        with self._lock:
+            self._down_until[id(engine)] = time.monotonic() + self.retry_interval
+        logger.warning(f"Read replica {engine.url.render_as_string(hide_password=True)} marked unhealthy for {self.retry_interval}s")
+
+    def _probe(self, engine: Engine) -> bool:
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception:
+            self.mark_down(engine)
+            return False
+        with self._lock:
+            self._down_until[id(engine)] = 0.0
+        logger.info(f"Read replica {engine.url.render_as_string(hide_password=True)} back in rotation")
+        return True
+
+    def choose(self) -> Optional[Engine]:
+        """Next healthy replica, or None when every replica is down"""
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            engine = self.engines[next(self._counter) % len(self.engines)]
+            down_until = self._down_until[id(engine)]
+            if down_until == 0.0:
+                return engine
+            if down_until <= now and self._probe(engine):
+                return engine
+        return None
+
+    def dispose(self):
+        for engine in self.engines:
+            engine.dispose()
+
+
+_replica_set: Optional[ReplicaSet] = None
+_replica_lock = threading.Lock()
+
+def get_replica_set() -> Optional[ReplicaSet]:
+    global _replica_set
+    urls = settings.replica_urls
+    if not urls:
+        return None
+    if _replica_set is None:
+        with _replica_lock:
+            if _replica_set is None:
+                _replica_set = ReplicaSet(urls, settings.REPLICA_RETRY_INTERVAL_SECONDS)
+    return _replica_set
+
+
+class RoutingSession(Session):
+    """
+    Session that reads from a replica and writes to the primary.
+
+    A replica is picked once per session so a request sees one consistent
+    snapshot. Flushes and INSERT/UPDATE/DELETE statements always go to the
+    primary, and after the first write the whole session sticks to it.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.info["use_primary"] = True
+        if self.info.get("use_primary"):
+            return get_engine()
+
+        replica = self.info.get("replica")
+        if replica is None:
+            replica_set = get_replica_set()
+            replica = replica_set.choose() if replica_set else None
+            if replica is None:
+                self.info["use_primary"] = True
+                return get_engine()
+            self.info["replica"] = replica
+        return replica
+
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+
+def get_read_db():
+    """Session for read-only endpoints; falls back to the primary when no replica is available"""
+    get_engine()
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def is_on_replica(db: Session) -> bool:
+    return not db.info.get("use_primary") and db.info.get("replica") is not None
+
+def use_primary(db: Session):
+    """Route the rest of this session's queries to the primary"""
+    db.info["use_primary"] = True
+
+
+# Read-your-writes: after a user writes, their reads go to the primary for a short
+# window so they never see a replica that has not caught up yet. The marker lives
+# in Redis so it holds across workers.
+
+def _recent_write_key(user_id: int) -> str:
+    return f"db:recent_write:{user_id}"
+
+def mark_recent_write(user_id: int):
+    if not settings.replica_urls:
+        return
+    from app.utils.redis_client import redis_client
+    try:
+        redis_client.set(_recent_write_key(user_id), "1", expire=settings.READ_YOUR_WRITES_SECONDS)
+    except Exception as e:
+        logger.error(f"Failed to record recent write for user {user_id}: {str(e)}")
+
+def has_recent_write(user_id: int) -> bool:
+    if not settings.replica_urls:
+        return False
+    from app.utils.redis_client import redis_client
+    try:
+        return redis_client.exists(_recent_write_key(user_id))
+    except Exception:
+        # Without the marker we cannot prove the replica is safe to read
+        return True
@@ -0,0 +1,33 @@
+"""
+Manual cache invalidation.
+
+    python -m app.jobs.cache --tag headlines:technology --tag article:42
+    python -m app.jobs.cache --namespace news:search
+    python -m app.jobs.cache --pattern "chat:history:*"
+
+Tags and namespace bumps only touch the affected keys; --pattern walks the
+keyspace with SCAN + UNLINK and is meant for occasional cleanup.
+"""
+import argparse
+import logging
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Invalidate cached entries")
+    parser.add_argument("--tag", action="append", default=[], help="Drop every key registered under this tag")
+    parser.add_argument("--namespace", action="append", default=[], help="Bump the version of a versioned namespace")
+    parser.add_argument("--pattern", action="append", default=[], help="Unlink keys matching a glob pattern")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.tag:
+        logger.info(f"Unlinked {redis_client.invalidate_tags(*args.tag)} keys for tags {args.tag}")
+    for namespace in args.namespace:
+        logger.info(f"Namespace {namespace} is now at version {redis_client.bump_namespace(namespace)}")
+    for pattern in args.pattern:
+        logger.info(f"Unlinked {redis_client.clear_pattern(pattern)} keys matching {pattern}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Fetch and extract full article text for stored articles that do not have it yet.
+
+    python -m app.jobs.extract [--limit 500]
+
+Raw pages are kept in EXTRACTION_CACHE_DIR, so re-running (or re-extracting after
+a parser change with --refresh) never refetches a page.
+"""
+import argparse
+import asyncio
+import logging
+from app.database import SessionLocal, get_engine
+from app.models.news import NewsArticle
+from app.services.extraction_service import extraction_service
+
+logger = logging.getLogger(__name__)
+
+async def run(limit: int, refresh: bool = False) -> dict:
+    get_engine()
+    db = SessionLocal()
+    try:
+        query = db.query(NewsArticle)
+        if not refresh:
+            query = query.filter(NewsArticle.full_text_fetched_at.is_(None))
+        articles = query.order_by(NewsArticle.created_at.desc()).limit(limit).all()
+        stats = await extraction_service.extract_many(db, articles)
+        stats.update(fetched=extraction_service.fetches, cache_hits=extraction_service.cache_hits)
+        return stats
+    finally:
+        db.close()
+        await extraction_service.aclose()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract full text for stored articles")
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--refresh", action="store_true", help="Re-extract articles that already have text (uses the page cache)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    print(asyncio.run(run(args.limit, args.refresh)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Build the related-articles index from stored articles.
+
+    python -m app.jobs.index_articles            # index articles not indexed yet
+    python -m app.jobs.index_articles --rebuild  # start over (recomputes IDF weights)
+
+New articles are indexed as they are ingested, so this is only needed once for
+existing data, after changing RELATED_INDEX_DIM, or to refresh IDF weights.
+Restart the API workers after --rebuild so they map the new files.
+"""
+import argparse
+import logging
+from app.database import SessionLocal, get_engine
+from app.models.news import NewsArticle
+from app.services.related_service import related_index
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+def run(rebuild: bool = False) -> dict:
+    if rebuild:
+        related_index.reset()
+    get_engine()
+    db = SessionLocal()
+    try:
+        added = 0
+        last_id = 0
+        while True:
+            articles = (
+                db.query(NewsArticle)
+                .filter(NewsArticle.id > last_id)
+                .order_by(NewsArticle.id)
+                .limit(BATCH_SIZE)
+                .all()
+            )
+            if not articles:
+                break
+            added += sum(related_index.add(article) for article in articles)
+            last_id = articles[-1].id
+        return {"added": added, "size": related_index.size}
+    finally:
+        db.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the related-articles index")
+    parser.add_argument("--rebuild", action="store_true", help="Discard the existing index first")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    print(run(args.rebuild))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Speculative pre-summarization of in-demand articles.
+
+Ranks articles by demand (recent saves, summarize requests, headline position),
+then generates summaries for the top N that do not have one yet, within a daily
+Gemini call budget. Summaries go to `article_summaries` and the Redis cache, so
+the first reader gets a cache hit instead of waiting for Gemini.
+
+Run once (e.g. from cron):
+    python -m app.jobs.presummarize [--top-n 20] [--dry-run]
+
+Or in-process by setting PRESUMMARIZE_INTERVAL_MINUTES > 0; a Redis lock makes
+sure only one worker runs each round.
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+from app.config import settings
+from app.database import SessionLocal, get_engine
+from app.models.news import NewsArticle
+from app.services.ai_service import ai_service
+from app.services.demand_service import demand_service
+from app.utils.redis_client import redis_client
+from app.utils.metrics import PRESUMMARIZE_RESULTS
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = "jobs:presummarize:lock"
+
+def _budget_key() -> str:
+    return f"budget:gemini:presummarize:{datetime.utcnow().strftime('%Y%m%d')}"
+
+def remaining_budget() -> int:
+    used = int(redis_client.client.get(_budget_key()) or 0)
+    return max(settings.PRESUMMARIZE_DAILY_BUDGET - used, 0)
+
+def _consume_budget() -> bool:
+    key = _budget_key()
+    pipe = redis_client.client.pipeline()
+    pipe.incr(key)
+    pipe.expire(key, 2 * 86400)
+    used, _ = pipe.execute()
+    return used <= settings.PRESUMMARIZE_DAILY_BUDGET
+
+def run_once(top_n: Optional[int] = None, dry_run: bool = False) -> Dict[str, int]:
+    """Pre-summarize the top in-demand articles. Blocking; run it off the event loop."""
+    top_n = top_n or settings.PRESUMMARIZE_TOP_N
+    stats = {"candidates": 0, "summarized": 0, "skipped": 0, "failed": 0}
+
+    budget = remaining_budget()
+    if budget <= 0:
+        logger.info("Pre-summarization skipped: daily Gemini budget exhausted")
+        return stats
+
+    get_engine()
+    db = SessionLocal()
+    try:
+        candidates = demand_service.rank_candidates(db, min(top_n, budget))
+        stats["candidates"] = len(candidates)
+        if dry_run:
+            logger.info(f"Pre-summarization candidates: {candidates}")
+            return stats
+
+        articles = {
+            article.id: article
+            for article in db.query(NewsArticle).filter(NewsArticle.id.in_(candidates)).all()
+        }
+        for article_id in candidates:
+            article = articles.get(article_id)
+            content = article.full_text or article.content if article else None
+            if not content or len(content.strip()) < 50:
+                stats["skipped"] += 1
+                continue
+            try:
+                # Articles the local summarizer handles well do not spend Gemini budget
+                summary = ai_service.extractive_summary(content)
+                if summary:
+                    ai_service.store_summary(db, article_id, summary, method="extractive")
+                    stats["summarized"] += 1
+                    continue
+                if not _consume_budget():
+                    logger.info("Pre-summarization stopped: daily Gemini budget exhausted")
+                    break
+                summary = ai_service.generate_summary(content)
+                ai_service.store_summary(db, article_id, summary)
+                stats["summarized"] += 1
+            except Exception as e:
+                db.rollback()
+                stats["failed"] += 1
+                logger.warning(f"Pre-summarization failed for article {article_id}: {str(e)}")
+    finally:
+        db.close()
+
+    for outcome in ("summarized", "skipped", "failed"):
+        PRESUMMARIZE_RESULTS.labels(outcome).inc(stats[outcome])
+    logger.info(f"Pre-summarization finished: {stats}")
+    return stats
+
+async def run_periodically(interval_minutes: int):
+    """Background loop started by the app lifespan"""
+    interval = interval_minutes * 60
+    while True:
+        try:
+            # Only one worker per round; the lock expires with the interval
+            if redis_client.client.set(LOCK_KEY, "1", nx=True, ex=interval):
+                await asyncio.to_thread(run_once)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Pre-summarization round failed: {str(e)}", exc_info=True)
+        await asyncio.sleep(interval)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-generate summaries for in-demand articles")
+    parser.add_argument("--top-n", type=int, default=None, help="Articles to summarize (default PRESUMMARIZE_TOP_N)")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the ranked candidates")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    print(run_once(args.top_n, args.dry_run))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Print an X-Profile header value that makes the profiling middleware profile a request.
+
+    python -m app.jobs.profile_token                # valid for 15 minutes
+    python -m app.jobs.profile_token --minutes 60
+
+    curl -H "X-Profile: <token>" http://localhost:8000/api/news/saved ...
+
+Needs the same PROFILING_SECRET as the API; profiles land in PROFILING_DIR on
+whichever worker served the request.
+"""
+import argparse
+import time
+from app.middleware.profiling import sign_profile_token
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create a signed X-Profile header value")
+    parser.add_argument("--minutes", type=int, default=15, help="How long the token stays valid")
+    args = parser.parse_args(argv)
+    print(sign_profile_token(int(time.time()) + args.minutes * 60))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Move old articles out of the hot table and keep monthly partitions ready.
+
+    python -m app.jobs.retention            # archive, then maintain partitions
+    python -m app.jobs.retention --dry-run  # only report what would be archived
+    python -m app.jobs.retention --days 90  # override ARTICLE_RETENTION_DAYS
+
+Articles published more than ARTICLE_RETENTION_DAYS ago that nobody has saved are
+copied to news_articles_archive and deleted with their summaries. Saved articles
+stay put, so a partition is only dropped once it is empty. On PostgreSQL the job
+also creates the next ARTICLE_PARTITIONS_AHEAD monthly partitions; run it daily.
+Articles already in the DEFAULT partition for a new month (e.g. a future
+publishedAt) are moved into it, since PostgreSQL refuses to create a partition
+over rows in the default one.
+"""
+import argparse
+import logging
+import re
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal, get_engine
+from app.models.news import ArchivedArticle, ArticleSummary, NewsArticle, SavedArticle
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+PARTITION_NAME = re.compile(r"^news_articles_p(\d{4})_(\d{2})$")
+DEFAULT_PARTITION = "news_articles_default"
+ARCHIVED_COLUMNS = (
+    "id", "source_id", "source_name", "author", "title", "description", "url",
+    "url_to_image", "published_at", "content", "full_text", "category", "created_at",
+)
+
+def _add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+def _archive_batch(db: Session, cutoff: datetime, after_id: int, batch_size: int) -> List[NewsArticle]:
+    saved = db.query(SavedArticle.id).filter(SavedArticle.article_id == NewsArticle.id)
+    return (
+        db.query(NewsArticle)
+        .filter(NewsArticle.published_at < cutoff, NewsArticle.id > after_id, ~saved.exists())
+        .order_by(NewsArticle.id)
+        .limit(batch_size)
+        .all()
+    )
+
+def archive_articles(db: Session, cutoff: datetime, batch_size: int, dry_run: bool = False) -> int:
+    """Archive unsaved articles published before `cutoff`; returns how many were (or would be) moved"""
+    archived = 0
+    last_id = 0
+    while True:
+        articles = _archive_batch(db, cutoff, last_id, batch_size)
+        if not articles:
+            break
+        last_id = articles[-1].id
+        archived += len(articles)
+        if dry_run:
+            continue
+
+        ids = [article.id for article in articles]
+        now = datetime.utcnow()
+        db.bulk_insert_mappings(ArchivedArticle, [
+            {**{column: getattr(article, column) for column in ARCHIVED_COLUMNS}, "archived_at": now}
+            for article in articles
+        ])
+        db.query(ArticleSummary).filter(ArticleSummary.article_id.in_(ids)).delete(synchronize_session=False)
+        db.query(NewsArticle).filter(NewsArticle.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        db.expunge_all()
+        try:
+            redis_client.invalidate_tags(*(f"article:{article_id}" for article_id in ids))
+        except Exception as e:
+            # Cached summaries expire within a day anyway
+            logger.warning(f"Failed to invalidate cached entries for archived articles: {str(e)}")
+        logger.info(f"Archived {len(ids)} articles up to id {last_id}")
+    return archived
+
+def _is_partitioned(db: Session) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.execute(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'news_articles'::regclass"
+    )).first() is not None
+
+def _partitions(db: Session) -> List[str]:
+    rows = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'news_articles'::regclass"
+    ))
+    return [row[0] for row in rows]
+
+def _create_partition(db: Session, name: str, month: date, has_default: bool) -> int:
+    """Create the partition for `month`; returns how many rows it took over from the default partition"""
+    bounds = f"FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+    in_range = f"published_at >= '{month.isoformat()}' AND published_at < '{_add_months(month, 1).isoformat()}'"
+    if not has_default or db.execute(text(f"SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range} LIMIT 1")).first() is None:
+        db.execute(text(f"CREATE TABLE {name} PARTITION OF news_articles FOR VALUES {bounds}"))
+        return 0
+    # Build it standalone, move the rows out of the default partition, then attach.
+    # Writes to the default partition wait, so ATTACH finds no new rows in range.
+    db.execute(text(f"LOCK TABLE {DEFAULT_PARTITION} IN EXCLUSIVE MODE"))
+    db.execute(text(f"CREATE TABLE {name} (LIKE news_articles INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    moved = db.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE {in_range} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    )).rowcount
+    db.execute(text(f"ALTER TABLE news_articles ATTACH PARTITION {name} FOR VALUES {bounds}"))
+    return moved
+
+def maintain_partitions(db: Session, cutoff: datetime, ahead: int, dry_run: bool = False) -> Optional[dict]:
+    """
+    Create upcoming monthly partitions and drop empty ones that ended before `cutoff`.
+    Each partition is its own transaction, so one failure does not undo the others.
+    """
+    if not _is_partitioned(db):
+        return None
+    existing = set(_partitions(db))
+    created, dropped, failed = [], [], []
+
+    this_month = date.today().replace(day=1)
+    for offset in range(ahead + 1):
+        month = _add_months(this_month, offset)
+        name = f"news_articles_p{month:%Y_%m}"
+        if name in existing:
+            continue
+        created.append(name)
+        if dry_run:
+            continue
+        try:
+            moved = _create_partition(db, name, month, DEFAULT_PARTITION in existing)
+            db.commit()
+            if moved:
+                logger.info(f"Moved {moved} articles from {DEFAULT_PARTITION} into {name}")
+        except Exception as e:
+            db.rollback()
+            created.remove(name)
+            failed.append(name)
+            logger.error(f"Failed to create partition {name}: {str(e)}")
+
+    for name in sorted(existing):
+        match = PARTITION_NAME.match(name)
+        if not match:
+            continue
+        upper = _add_months(date(int(match.group(1)), int(match.group(2)), 1), 1)
+        if upper > cutoff.date():
+            continue
+        if db.execute(text(f"SELECT 1 FROM {name} LIMIT 1")).first() is not None:
+            continue
+        dropped.append(name)
+        if dry_run:
+            continue
+        try:
+            db.execute(text(f"DROP TABLE {name}"))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            dropped.remove(name)
+            failed.append(name)
+            logger.error(f"Failed to drop partition {name}: {str(e)}")
+
+    db.commit()
+    for name in created:
+        logger.info(f"{'Would create' if dry_run else 'Created'} partition {name}")
+    for name in dropped:
+        logger.info(f"{'Would drop' if dry_run else 'Dropped'} partition {name}")
+    return {"created": created, "dropped": dropped, "failed": failed}
+
+def run(days: Optional[int] = None, dry_run: bool = False) -> dict:
+    days = settings.ARTICLE_RETENTION_DAYS if days is None else days
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    get_engine()
+    db = SessionLocal()
+    try:
+        archived = archive_articles(db, cutoff, settings.RETENTION_BATCH_SIZE, dry_run)
+        partitions = maintain_partitions(db, cutoff, settings.ARTICLE_PARTITIONS_AHEAD, dry_run)
+        return {"cutoff": cutoff.isoformat(), "archived": archived, "partitions": partitions, "dry_run": dry_run}
+    finally:
+        db.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive old articles and maintain partitions")
+    parser.add_argument("--days", type=int, help="Retention in days (default: ARTICLE_RETENTION_DAYS)")
+    parser.add_argument("--dry-run", action="store_true", help="Report without changing anything")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    result = run(args.days, args.dry_run)
+    print(result)
+    # Let cron notice partitions that could not be created or dropped
+    if result["partitions"] and result["partitions"]["failed"]:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Repair the trending counters from saved_articles.
+
+    python -m app.jobs.trending             # last TRENDING_MAX_HOURS hours
+    python -m app.jobs.trending --hours 6
+
+Counters are updated after each save/unsave commits, so a Redis outage or a
+crash in between leaves them off by a few saves. Run this every few minutes;
+a save landing while its bucket is being rewritten is picked up by the next run.
+"""
+import argparse
+import logging
+from typing import Optional
+from app.database import SessionLocal, get_engine
+from app.services.trending_service import trending_service
+
+logger = logging.getLogger(__name__)
+
+def run(hours: Optional[int] = None) -> dict:
+    get_engine()
+    db = SessionLocal()
+    try:
+        return trending_service.reconcile(db, hours)
+    finally:
+        db.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reconcile trending counters with the database")
+    parser.add_argument("--hours", type=int, help="Buckets to check (default: TRENDING_MAX_HOURS)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    print(run(args.hours))
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,63 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from app.config import settings
-from app.database import engine, Base
-from app.api import api_router
+from app.database import dispose_engine
+from app.api import api_router, ws
 from app.middleware.rate_limit import limiter
+from app.middleware.metrics import PrometheusMiddleware
+from app.services.news_service import news_service
+from app.services.extraction_service import extraction_service
+from app.services.headline_stream import headline_hub
+from app.services.google_keys import google_keys
+from app.utils.redis_client import redis_client
+from app.utils import tracing
+from app.utils.loop_watchdog import loop_watchdog
+from app.utils.security import require_metrics_token
+from app.jobs import presummarize
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
+
+# Database, Redis, NewsAPI and Gemini clients are all created lazily on first use,
+# so importing this module has no I/O. Schema is managed by Alembic.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.TRACING_ENABLED:
+        tracing.configure_tracing()
+    if settings.LOOP_WATCHDOG_ENABLED:
+        loop_watchdog.start()
+    background_tasks = []
+    if settings.PRESUMMARIZE_INTERVAL_MINUTES > 0:
+        background_tasks.append(asyncio.create_task(
+            presummarize.run_periodically(settings.PRESUMMARIZE_INTERVAL_MINUTES)
+        ))
+    if settings.GOOGLE_CLIENT_ID:
+        google_keys.warm_up()
+    if not settings.METRICS_TOKEN:
+        logger.warning("METRICS_TOKEN is not set: /metrics is open and must only be reachable on an internal interface")
+    yield
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await loop_watchdog.stop()
+    await news_service.aclose()
+    await extraction_service.aclose()
+    await headline_hub.aclose()
+    await google_keys.aclose()
+    redis_client.close()
+    dispose_engine()
+    tracing.shutdown_tracing()
 
 app = FastAPI(
     title=settings.APP_NAME,
     debug=settings.DEBUG,
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Rate limiting
@@ -29,8 +73,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Profiling (innermost, so it only sees the application)
+if settings.PROFILING_ENABLED:
+    # pyinstrument is only imported when profiling is on
+    from app.middleware.profiling import ProfilingMiddleware
+    app.add_middleware(ProfilingMiddleware)
+
+# Metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(PrometheusMiddleware)
+
+# Tracing (outermost, so the server span covers the whole request)
+if settings.TRACING_ENABLED:
+    app.add_middleware(tracing.TracingMiddleware)
+
 # Include API routes
 app.include_router(api_router, prefix="/api")
+app.include_router(ws.router, tags=["WebSocket"])
 
 @app.get("/")
 async def root():
@@ -43,3 +102,7 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
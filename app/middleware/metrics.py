@@ -0,0 +1,40 @@
+import time
+from app.utils.metrics import REQUEST_LATENCY, REQUESTS_TOTAL, REQUESTS_IN_FLIGHT
+
+
+class PrometheusMiddleware:
+    """
+    Pure ASGI middleware recording per-route latency and in-flight requests.
+
+    Labels use the matched route template (e.g. ``/api/news/saved/{article_id}``)
+    so cardinality stays bounded; unmatched paths are grouped under ``unmatched``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            REQUEST_LATENCY.labels(method, route_path).observe(elapsed)
+            REQUESTS_TOTAL.labels(method, route_path, str(status_code)).inc()
@@ -0,0 +1,139 @@
+"""
+Opt-in request profiling with pyinstrument (an optional dependency).
+
+A request is profiled when it carries a valid signed header or is picked by
+PROFILING_SAMPLE_RATE. At most one request per worker is profiled at a time; the
+others pass through untouched, so the overhead is bounded even under load. Each
+profile is written to PROFILING_DIR as a speedscope file (open it at
+https://www.speedscope.app) and described by a line in PROFILING_DIR/profiles.jsonl
+with the route, method, status and latency. Only the newest PROFILING_MAX_FILES
+profiles are kept.
+
+The header is `X-Profile: <expires>.<signature>`, where the signature is the
+HMAC-SHA256 of the expiry timestamp keyed with PROFILING_SECRET. Generate one with
+`python -m app.jobs.profile_token`.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import random
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from app.config import settings
+from app.utils.metrics import PROFILES_CAPTURED
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:  # pragma: no cover
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+INDEX_FILE = "profiles.jsonl"
+
+def sign_profile_token(expires: int, secret: Optional[str] = None) -> str:
+    secret = secret or settings.require("PROFILING_SECRET")
+    signature = hmac.new(secret.encode(), str(expires).encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+def verify_profile_token(token: str) -> bool:
+    if not settings.PROFILING_SECRET:
+        return False
+    expires = token.partition(".")[0]
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(sign_profile_token(int(expires), settings.PROFILING_SECRET), token)
+
+def _slug(path: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware; add it only when PROFILING_ENABLED is set."""
+
+    def __init__(self, app):
+        self.app = app
+        self._busy = False
+        if Profiler is None:
+            logger.warning("PROFILING_ENABLED is set but pyinstrument is not installed; profiling is off")
+
+    def _trigger(self, scope) -> Optional[str]:
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_HEADER:
+                if verify_profile_token(value.decode("latin-1")):
+                    return "header"
+                break
+        if settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or Profiler is None or self._busy:
+            await self.app(scope, receive, send)
+            return
+        trigger = self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self._busy = True
+        profiler = Profiler(interval=settings.PROFILING_INTERVAL_SECONDS, async_mode="enabled")
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            session = profiler.stop()
+            elapsed = time.perf_counter() - start
+            self._busy = False
+            metadata = {
+                "timestamp": datetime.utcnow().isoformat(),
+                "method": scope["method"],
+                "route": getattr(scope.get("route"), "path", "unmatched"),
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round(elapsed * 1000, 2),
+                "trigger": trigger,
+            }
+            try:
+                # Rendering and file I/O stay off the event loop
+                await asyncio.to_thread(self._write, session, metadata)
+                PROFILES_CAPTURED.labels(trigger).inc()
+            except Exception as e:
+                logger.warning(f"Failed to write profile for {metadata['method']} {metadata['route']}: {str(e)}")
+
+    def _write(self, session, metadata: dict):
+        directory = Path(settings.PROFILING_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        name = (
+            f"{datetime.utcnow():%Y%m%dT%H%M%S%f}_{metadata['method']}_{_slug(metadata['route'])}"
+            f"_{int(metadata['duration_ms'])}ms.speedscope.json"
+        )
+        (directory / name).write_text(SpeedscopeRenderer().render(session))
+        with open(directory / INDEX_FILE, "a") as index:
+            index.write(json.dumps({**metadata, "file": name}) + "\n")
+
+        expired = sorted(directory.glob("*.speedscope.json"))[:-settings.PROFILING_MAX_FILES]
+        if expired:
+            for old in expired:
+                old.unlink(missing_ok=True)
+            kept = set(path.name for path in directory.glob("*.speedscope.json"))
+            lines = (directory / INDEX_FILE).read_text().splitlines()
+            (directory / INDEX_FILE).write_text("".join(
+                line + "\n" for line in lines if json.loads(line).get("file") in kept
+            ))
+        logger.info(f"Profiled {metadata['method']} {metadata['route']} ({metadata['duration_ms']} ms) -> {name}")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -12,38 +12,71 @@ class NewsArticle(Base):
     author = Column(String, nullable=True)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
-    url = Column(String, unique=True, nullable=False)
+    url = Column(String, nullable=False)
     url_to_image = Column(String, nullable=True)
-    published_at = Column(DateTime, nullable=True)
+    # Partition key on PostgreSQL (monthly range partitions), so never NULL
+    published_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     content = Column(Text, nullable=True)
+    full_text = Column(Text, nullable=True)
+    full_text_fetched_at = Column(DateTime, nullable=True)
     category = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     __table_args__ = (
+        # Unique constraints on a partitioned table must include the partition key;
+        # save_article_to_db keeps urls unique
+        UniqueConstraint('url', 'published_at', name='news_articles_url_key'),
         Index('idx_category_published', 'category', 'published_at'),
     )
 
+class ArchivedArticle(Base):
+    """Unsaved articles moved out of `news_articles` by the retention job"""
+    __tablename__ = "news_articles_archive"
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    source_id = Column(String, nullable=True)
+    source_name = Column(String, nullable=True)
+    author = Column(String, nullable=True)
+    title = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    url = Column(String, nullable=False)
+    url_to_image = Column(String, nullable=True)
+    published_at = Column(DateTime, nullable=True)
+    content = Column(Text, nullable=True)
+    full_text = Column(Text, nullable=True)
+    category = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
 class SavedArticle(Base):
     __tablename__ = "saved_articles"
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    article_id = Column(Integer, ForeignKey("news_articles.id"), nullable=False)
+    # No FK constraint: news_articles is partitioned and its primary key includes published_at
+    article_id = Column(Integer, nullable=False)
     saved_at = Column(DateTime, default=datetime.utcnow)
     
     user = relationship("User", back_populates="saved_articles")
-    article = relationship("NewsArticle")
+    article = relationship("NewsArticle", primaryjoin="foreign(SavedArticle.article_id) == NewsArticle.id")
     
     __table_args__ = (
         Index('idx_user_article', 'user_id', 'article_id', unique=True),
+        Index('idx_saved_article_id', 'article_id'),
+        Index('idx_saved_saved_at', 'saved_at'),
     )
 
 class ArticleSummary(Base):
     __tablename__ = "article_summaries"
     
     id = Column(Integer, primary_key=True, index=True)
-    article_id = Column(Integer, ForeignKey("news_articles.id"), nullable=False)
+    article_id = Column(Integer, nullable=False)
     summary = Column(Text, nullable=False)
+    method = Column(String(20), default="gemini")  # extractive or gemini
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    article = relationship("NewsArticle")
+    article = relationship("NewsArticle", primaryjoin="foreign(ArticleSummary.article_id) == NewsArticle.id")
+    
+    __table_args__ = (
+        Index('idx_article_summaries_article_id', 'article_id', unique=True),
+    )
@@ -17,6 +17,13 @@ class NewsArticleResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class RelatedArticleResponse(NewsArticleResponse):
+    score: float
+
+class RelatedArticlesResponse(BaseModel):
+    article_id: int
+    related: List[RelatedArticleResponse]
+
 class NewsListResponse(BaseModel):
     articles: List[NewsArticleResponse]
     total: int
@@ -37,3 +44,4 @@ class SummaryRequest(BaseModel):
 class SummaryResponse(BaseModel):
     summary: str
     article_id: int
+    method: str = "gemini"
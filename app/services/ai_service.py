@@ -1,92 +1,195 @@
-import google.generativeai as genai
+from typing import Awaitable, Callable, Optional, Tuple
+from datetime import datetime
 from sqlalchemy.orm import Session
 from app.config import settings
+from app.database import get_engine
 from app.models.news import ArticleSummary, NewsArticle
 from app.utils.redis_client import redis_client
+from app.utils.metrics import SUMMARIES_GENERATED, record_gemini_call
+from app.services.demand_service import demand_service
+from app.services.extraction_service import is_truncated, strip_truncation_marker
+from app.services.extractive_service import extractive_summarizer
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+SUMMARY_MODES = ("fast", "llm", "auto")
+
 class AIService:
     def __init__(self):
+        self._model = None
+    
+    @property
+    def model(self):
+        # google.generativeai is slow to import, so the client is built on first use
+        if self._model is None:
+            try:
+                if not settings.GEMINI_API_KEY or settings.GEMINI_API_KEY == "your_gemini_api_key_here":
+                    logger.error("Gemini API key not configured")
+                    raise ValueError("Gemini API key not configured")
+                
+                import google.generativeai as genai
+                genai.configure(api_key=settings.GEMINI_API_KEY)
+                # Use gemini-2.5-flash which is the latest stable model
+                self._model = genai.GenerativeModel('gemini-2.5-flash')
+                logger.info("AI Service initialized successfully with gemini-2.5-flash model")
+            except Exception as e:
+                logger.error(f"Failed to initialize AI Service: {str(e)}")
+                raise
+        return self._model
+    
+    @model.setter
+    def model(self, value):
+        self._model = value
+    
+    def generate_summary(self, content: str) -> str:
+        """Call Gemini for a 3-4 sentence summary. Blocking; raises ValueError with a user-facing message."""
+        content = strip_truncation_marker(content)
+        # Prepare prompt
+        prompt = f"""Please provide a concise summary of the following news article in 3-4 sentences. 
+        Focus on the key points and main takeaways:
+
+        {content[:5000]}
+        
+        Summary:"""
+        
+        # Generate summary with error handling
+        start = time.perf_counter()
         try:
-            if not settings.GEMINI_API_KEY or settings.GEMINI_API_KEY == "your_gemini_api_key_here":
-                logger.error("Gemini API key not configured")
-                raise ValueError("Gemini API key not configured")
+            response = self.model.generate_content(prompt)
+        except Exception as gemini_error:
+            record_gemini_call("summary", start, prompt, outcome="error")
+            error_msg = str(gemini_error)
+            logger.error(f"Gemini API error: {error_msg}")
             
-            genai.configure(api_key=settings.GEMINI_API_KEY)
-            # Use gemini-2.5-flash which is the latest stable model
-            self.model = genai.GenerativeModel('gemini-2.5-flash')
-            logger.info("AI Service initialized successfully with gemini-2.5-flash model")
-        except Exception as e:
-            logger.error(f"Failed to initialize AI Service: {str(e)}")
-            raise
+            # Check for specific error types
+            if "429" in error_msg or "quota" in error_msg.lower():
+                raise ValueError("AI service quota exceeded. Please try again later or upgrade your API plan.")
+            elif "404" in error_msg or "not found" in error_msg.lower():
+                raise ValueError("AI model not available. Please contact support.")
+            elif "403" in error_msg or "permission" in error_msg.lower():
+                raise ValueError("AI service access denied. Please check API key configuration.")
+            else:
+                raise ValueError(f"AI service error: {error_msg}")
+        
+        if not response or not response.text:
+            record_gemini_call("summary", start, prompt, outcome="error")
+            raise ValueError("AI service error: Gemini API returned empty response")
+        record_gemini_call("summary", start, prompt, response)
+        
+        summary = response.text.strip()
+        if len(summary) < 20:
+            raise ValueError("AI service error: Generated summary is too short")
+        return summary
+    
+    def store_summary(self, db: Session, article_id: int, summary: str, method: str = "gemini"):
+        """Upsert the article's summary (one row per article) and cache it"""
+        dialect = get_engine().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            insert = None
+        
+        if insert is not None:
+            statement = insert(ArticleSummary).values(
+                article_id=article_id, summary=summary, method=method, created_at=datetime.utcnow()
+            )
+            db.execute(statement.on_conflict_do_update(
+                index_elements=[ArticleSummary.article_id],
+                set_={
+                    "summary": statement.excluded.summary,
+                    "method": statement.excluded.method,
+                    "created_at": statement.excluded.created_at,
+                }
+            ))
+        else:
+            article_summary = db.query(ArticleSummary).filter(ArticleSummary.article_id == article_id).first()
+            if article_summary:
+                article_summary.summary = summary
+                article_summary.method = method
+            else:
+                db.add(ArticleSummary(article_id=article_id, summary=summary, method=method))
+        db.commit()
+        SUMMARIES_GENERATED.labels(method).inc()
+        self._cache_summary(article_id, summary, method)
     
-    async def summarize_article(self, db: Session, article_id: int, content: str) -> str:
+    def _cache_summary(self, article_id: int, summary: str, method: str):
+        redis_client.set(
+            f"summary:article:{article_id}", {"summary": summary, "method": method},
+            expire=86400, tags=[f"article:{article_id}"]
+        )
+    
+    def extractive_summary(self, content: str, mode: str = "auto") -> Optional[str]:
+        """Local summary for `fast`, or for `auto` when the heuristic trusts it; None means use Gemini"""
+        # Extracting from NewsAPI's truncated stub would return the stub itself
+        if mode == "llm" or is_truncated(content):
+            return None
+        result = extractive_summarizer.summarize(content)
+        if mode == "fast":
+            return result.summary if result else None
+        return result.summary if extractive_summarizer.good_enough(result) else None
+    
+    async def summarize_article(
+        self,
+        db: Session,
+        article_id: int,
+        content: Optional[str],
+        load_full_text: Optional[Callable[[], Awaitable[str]]] = None,
+        mode: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """
+        Return the article's summary and how it was made ("extractive" or "gemini")
+        from cache, the database, the local summarizer, or Gemini
+        
+        Args:
+            content: Text to summarize
+            load_full_text: Called only when a new summary is needed and `content` is truncated
+            mode: "fast" (local unless nothing can be extracted), "llm" (Gemini; upgrades an extractive summary) or "auto"
+        """
+        mode = mode or settings.SUMMARY_DEFAULT_MODE
+        if mode not in SUMMARY_MODES:
+            raise ValueError(f"Unknown summary mode '{mode}'. Use one of: {', '.join(SUMMARY_MODES)}")
         try:
+            demand_service.record_summarize_request(article_id)
+            
             # Check cache first
             cache_key = f"summary:article:{article_id}"
             cached = redis_client.get(cache_key)
             if cached:
-                logger.info(f"Returning cached summary for article {article_id}")
-                return cached
+                # Entries cached before summaries had a method are Gemini summaries
+                summary, method = (cached["summary"], cached["method"]) if isinstance(cached, dict) else (cached, "gemini")
+                if not (mode == "llm" and method == "extractive"):
+                    logger.info(f"Returning cached summary for article {article_id}")
+                    return summary, method
+            else:
+                # Check database for existing summary
+                existing_summary = db.query(ArticleSummary).filter(ArticleSummary.article_id == article_id).first()
+                if existing_summary:
+                    method = existing_summary.method or "gemini"
+                    self._cache_summary(article_id, existing_summary.summary, method)
+                    if not (mode == "llm" and method == "extractive"):
+                        logger.info(f"Returning existing summary for article {article_id}")
+                        return existing_summary.summary, method
             
-            # Check database for existing summary
-            existing_summary = db.query(ArticleSummary).filter(ArticleSummary.article_id == article_id).first()
-            if existing_summary:
-                redis_client.set(cache_key, existing_summary.summary, expire=86400)
-                logger.info(f"Returning existing summary for article {article_id}")
-                return existing_summary.summary
+            if load_full_text and is_truncated(content):
+                content = await load_full_text()
             
             # Validate content
             if not content or len(content.strip()) < 50:
                 raise ValueError("Article content is too short or empty for summarization")
             
-            # Prepare prompt
-            prompt = f"""Please provide a concise summary of the following news article in 3-4 sentences. 
-            Focus on the key points and main takeaways:
-
-            {content[:5000]}
-            
-            Summary:"""
-            
-            logger.info(f"Generating new summary for article {article_id}")
-            
-            # Generate summary with error handling
-            try:
-                response = self.model.generate_content(prompt)
-                
-                if not response or not response.text:
-                    raise ValueError("Gemini API returned empty response")
-                
-                summary = response.text.strip()
-                
-                if len(summary) < 20:
-                    raise ValueError("Generated summary is too short")
-                
-            except Exception as gemini_error:
-                error_msg = str(gemini_error)
-                logger.error(f"Gemini API error: {error_msg}")
-                
-                # Check for specific error types
-                if "429" in error_msg or "quota" in error_msg.lower():
-                    raise ValueError("AI service quota exceeded. Please try again later or upgrade your API plan.")
-                elif "404" in error_msg or "not found" in error_msg.lower():
-                    raise ValueError("AI model not available. Please contact support.")
-                elif "403" in error_msg or "permission" in error_msg.lower():
-                    raise ValueError("AI service access denied. Please check API key configuration.")
-                else:
-                    raise ValueError(f"AI service error: {error_msg}")
-            
-            # Save to database
-            article_summary = ArticleSummary(article_id=article_id, summary=summary)
-            db.add(article_summary)
-            db.commit()
-            
-            # Cache the result
-            redis_client.set(cache_key, summary, expire=86400)
-            logger.info(f"Successfully generated and cached summary for article {article_id}")
-            return summary
+            summary = self.extractive_summary(content, mode)
+            if summary:
+                method = "extractive"
+            else:
+                logger.info(f"Generating new summary for article {article_id}")
+                summary, method = self.generate_summary(content), "gemini"
+            self.store_summary(db, article_id, summary, method)
+            logger.info(f"Successfully generated and cached {method} summary for article {article_id}")
+            return summary, method
             
         except ValueError:
             raise
@@ -0,0 +1,152 @@
+import hashlib
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+from app.utils.redis_client import redis_client
+from app.utils.metrics import CHAT_ANSWER_CACHE, GEMINI_CALLS_SAVED
+from app.utils.text import WORD
+
+logger = logging.getLogger(__name__)
+
+# Bumped by the headline hub whenever a headline refresh brings new articles
+HEADLINES_NAMESPACE = "headlines"
+# Words that change how a question is asked, not what it asks for. Unlike the
+# retrieval STOPWORDS this keeps question words, negation and direction, which
+# change the answer ("is Tesla stock up?" vs "down?", "why" vs "when"). "What"
+# is the default way to ask and is dropped.
+CACHE_STOPWORDS = frozenset("""
+a an the is are was were be been being am do does did doing of to in on at for from about by with and or
+i me my we us our you your it its this that these those there here can could would will shall should may
+might please tell give show know want like let hey hi hello thanks thank any some s what
+""".split())
+# A similar (non-exact) match must agree on all of these
+MEANING_WORDS = frozenset("""
+why when who whom whose where which how not no nor never up down above below before after over under
+rise rising fall falling more less most least against
+""".split())
+CASED_WORD = re.compile(WORD.pattern, re.IGNORECASE)
+SENTENCE_END = re.compile(r"[.!?]+\s*")
+
+class ChatAnswerCache:
+    """
+    Gemini answers to first chat turns (no history), shared by all users.
+
+    A question is normalised to its words, in order, without CACHE_STOPWORDS, so
+    "What's the top news today?" and "top news today" share an entry while "did
+    Israel attack Iran" and "did Iran attack Israel" do not. Entries live under the current
+    headlines namespace version: when a refresh brings new articles the version
+    is bumped and every cached answer is ignored from then on. Each entry also has
+    its own CHAT_ANSWER_CACHE_TTL_SECONDS.
+
+    An exact match is one GET. Otherwise the version's index (normalised question
+    and its names -> entry, at most CHAT_ANSWER_CACHE_MAX_ENTRIES fields) is read
+    with one HGETALL. The closest question is used if its Jaccard similarity
+    reaches CHAT_ANSWER_CACHE_MIN_SIMILARITY, it has the same MEANING_WORDS and the
+    same names in the same order, and the words both questions share come in the same order.
+    """
+
+    def normalise(self, message: str) -> Tuple[List[str], List[str]]:
+        """
+        The question's words in order, and the names among them: capitalised words
+        that do not start a sentence, and acronyms
+        """
+        words: List[str] = []
+        names: List[str] = []
+        for sentence in SENTENCE_END.split(message or ""):
+            for position, match in enumerate(CASED_WORD.finditer(sentence)):
+                original = match.group()
+                word = original.lower()
+                # "isn't" -> "is not", "what's" -> "what"
+                if re.search(r"n['’]t$", word):
+                    parts = [word[:-3], "not"]
+                else:
+                    parts = [re.split(r"['’]", word, 1)[0]]
+                kept = [part for part in parts if part and part not in CACHE_STOPWORDS]
+                words.extend(part for part in kept if part not in words)
+                if kept and kept[0] == parts[0] and parts[0] not in names and (
+                    (original[0].isupper() and position > 0) or (len(original) > 1 and original.isupper())
+                ):
+                    names.append(parts[0])
+        return words, names
+
+    def _prefix(self) -> str:
+        # "o": keys are ordered word sequences (earlier entries used sorted word sets)
+        return f"chat:answers:o:h{redis_client.namespace_version(HEADLINES_NAMESPACE)}"
+
+    def _entry_key(self, prefix: str, normalised: str) -> str:
+        return f"{prefix}:{hashlib.sha1(normalised.encode()).hexdigest()}"
+
+    def _index_field(self, words: List[str], names: List[str]) -> str:
+        return f"{' '.join(words)}|{' '.join(names)}"
+
+    def _closest(self, index: Dict[str, str], words: List[str], names: List[str]) -> Optional[Tuple[str, float]]:
+        best, best_score = None, 0.0
+        word_set = frozenset(words)
+        meaning = word_set & MEANING_WORDS
+        for field, entry_key in index.items():
+            candidate, _, candidate_names = field.partition("|")
+            other_words = candidate.split()
+            other = frozenset(other_words)
+            if other & MEANING_WORDS != meaning or candidate_names.split() != names:
+                continue
+            # "Apple beat Microsoft" is not "Microsoft beat Apple"
+            shared = word_set & other
+            if [word for word in words if word in shared] != [word for word in other_words if word in shared]:
+                continue
+            score = len(shared) / len(word_set | other)
+            if score > best_score:
+                best, best_score = entry_key, score
+        if best is None or best_score < settings.CHAT_ANSWER_CACHE_MIN_SIMILARITY:
+            return None
+        return best, best_score
+
+    def get(self, message: str) -> Optional[str]:
+        if not settings.CHAT_ANSWER_CACHE_ENABLED:
+            return None
+        words, names = self.normalise(message)
+        if not words:
+            CHAT_ANSWER_CACHE.labels("uncacheable").inc()
+            return None
+        try:
+            prefix = self._prefix()
+            cached = redis_client.get(self._entry_key(prefix, " ".join(words)))
+            result = "exact"
+            if not cached:
+                closest = self._closest(redis_client.client.hgetall(f"{prefix}:index"), words, names)
+                if closest is not None:
+                    cached = redis_client.get(closest[0])
+                    result = "similar"
+        except Exception as e:
+            logger.warning(f"Chat answer cache lookup failed: {str(e)}")
+            return None
+        if not cached:
+            CHAT_ANSWER_CACHE.labels("miss").inc()
+            return None
+        CHAT_ANSWER_CACHE.labels(result).inc()
+        GEMINI_CALLS_SAVED.labels("chat").inc()
+        return cached["response"]
+
+    def put(self, message: str, response: str):
+        if not settings.CHAT_ANSWER_CACHE_ENABLED:
+            return
+        words, names = self.normalise(message)
+        if not words:
+            return
+        try:
+            prefix = self._prefix()
+            index_key = f"{prefix}:index"
+            entry_key = self._entry_key(prefix, " ".join(words))
+            ttl = settings.CHAT_ANSWER_CACHE_TTL_SECONDS
+            if redis_client.client.hlen(index_key) >= settings.CHAT_ANSWER_CACHE_MAX_ENTRIES:
+                return
+            redis_client.set(entry_key, {"question": message, "response": response}, expire=ttl)
+            pipe = redis_client.client.pipeline(transaction=False)
+            pipe.hset(index_key, self._index_field(words, names), entry_key)
+            # Index fields can outlive their entries; a stale one reads as a miss
+            pipe.expire(index_key, ttl)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to cache chat answer: {str(e)}")
+
+chat_answer_cache = ChatAnswerCache()
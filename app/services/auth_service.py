@@ -1,13 +1,17 @@
 from datetime import timedelta
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from google.oauth2 import id_token
-from google.auth.transport import requests
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin
 from app.utils.security import verify_password, get_password_hash, create_access_token
+from app.services.google_keys import GoogleKeysUnavailable, google_keys
 from app.config import settings
 
+USERNAME_ATTEMPTS = 3
+MAX_SUFFIX_DIGITS = 6
+
 class AuthService:
     def register_user(self, db: Session, user_data: UserCreate) -> User:
         existing_email = db.query(User).filter(User.email == user_data.email).first()
@@ -71,12 +75,17 @@ class AuthService:
         return access_token
     
     async def verify_google_token(self, token: str) -> dict:
+        # Verified locally against the cached Google signing keys
         try:
-            idinfo = id_token.verify_oauth2_token(
-                token, requests.Request(), settings.GOOGLE_CLIENT_ID
-            )
-            return idinfo
-        except Exception as e:
+            client_id = settings.require("GOOGLE_CLIENT_ID")
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Google sign-in is unavailable: {str(e)}")
+        try:
+            return await google_keys.verify(token, client_id)
+        except GoogleKeysUnavailable as e:
+            # An outage on Google's side, not a bad token
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Google sign-in is temporarily unavailable: {str(e)}")
+        except ValueError as e:
             raise HTTPException(status_code=400, detail=f"Invalid Google token: {str(e)}")
     
     def get_or_create_google_user(self, db: Session, google_data: dict) -> User:
@@ -92,23 +101,44 @@ class AuthService:
             db.refresh(user)
             return user
         
-        username = google_data["email"].split("@")[0]
-        base_username = username
+        base_username = google_data["email"].split("@")[0]
+        for attempt in range(USERNAME_ATTEMPTS):
+            user = User(
+                email=google_data["email"],
+                username=self._free_username(db, base_username),
+                full_name=google_data.get("name"),
+                is_google_user=True,
+                google_id=google_data["sub"]
+            )
+            db.add(user)
+            try:
+                db.commit()
+            except IntegrityError:
+                # Someone took the username (or signed up) between the lookup and the insert
+                db.rollback()
+                if attempt == USERNAME_ATTEMPTS - 1:
+                    raise
+                existing = db.query(User).filter(User.google_id == google_data["sub"]).first()
+                if existing:
+                    return existing
+                continue
+            db.refresh(user)
+            return user
+    
+    def _free_username(self, db: Session, base: str) -> str:
+        """Smallest free name of base, base1, base2, ... found with a single query"""
+        escaped = base.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        taken = {
+            name for (name,) in db.query(User.username).filter(
+                User.username.like(f"{escaped}%", escape="\\"),
+                func.length(User.username) <= len(base) + MAX_SUFFIX_DIGITS,
+            )
+        }
+        if base not in taken:
+            return base
         counter = 1
-        while db.query(User).filter(User.username == username).first():
-            username = f"{base_username}{counter}"
+        while f"{base}{counter}" in taken:
             counter += 1
-        
-        user = User(
-            email=google_data["email"],
-            username=username,
-            full_name=google_data.get("name"),
-            is_google_user=True,
-            google_id=google_data["sub"]
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-        return user
+        return f"{base}{counter}"
 
 auth_service = AuthService()
@@ -0,0 +1,100 @@
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+from app.config import settings
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Budget reads are served from memory for this long; TTLs do not need exact counts
+SNAPSHOT_TTL = 5.0
+# Upper bound on how far budget pressure stretches cache TTLs
+MAX_PRESSURE = 8.0
+
+class UpstreamBudget:
+    """
+    Daily call budget for an upstream API, shared by all workers through Redis.
+
+    Keys:
+    - budget:{upstream}:{YYYYMMDD}     calls made today (UTC)
+    - budget:{upstream}:{YYYYMMDDHH}   calls made in that hour
+
+    `pressure` compares the share of the quota left with the share of the day
+    left: 1.0 means spending on pace (or under), 2.0 means the remaining quota
+    has to last twice as long as the current pace allows.
+    """
+
+    def __init__(self, upstream: str, quota_setting: str):
+        self.upstream = upstream
+        self.quota_setting = quota_setting
+        self._snapshot: Optional[Tuple[Dict[str, Any], float]] = None
+
+    @property
+    def quota(self) -> int:
+        return getattr(settings, self.quota_setting)
+
+    def _keys(self, now: datetime) -> Tuple[str, str]:
+        return (
+            f"budget:{self.upstream}:{now.strftime('%Y%m%d')}",
+            f"budget:{self.upstream}:{now.strftime('%Y%m%d%H')}",
+        )
+
+    def record_call(self):
+        try:
+            day_key, hour_key = self._keys(datetime.utcnow())
+            pipe = redis_client.client.pipeline(transaction=False)
+            pipe.incr(day_key)
+            pipe.expire(day_key, 2 * 86400)
+            pipe.incr(hour_key)
+            pipe.expire(hour_key, 2 * 3600)
+            pipe.execute()
+            self._snapshot = None
+        except Exception as e:
+            logger.warning(f"Failed to record {self.upstream} call: {str(e)}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Usage, spend rate and pressure for the current UTC day"""
+        if self._snapshot and time.monotonic() - self._snapshot[1] < SNAPSHOT_TTL:
+            return self._snapshot[0]
+
+        now = datetime.utcnow()
+        day_key, hour_key = self._keys(now)
+        previous_hour_key = self._keys(now - timedelta(hours=1))[1]
+        used, this_hour, last_hour = (int(value or 0) for value in redis_client.client.mget([day_key, hour_key, previous_hour_key]))
+
+        quota = self.quota
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        hours_left = max((day_start + timedelta(days=1) - now).total_seconds() / 3600, 1 / 60)
+        # Calls over the last 60 minutes, taking the elapsed share of the previous hour
+        minutes = now.minute + now.second / 60
+        spend_rate = this_hour + last_hour * (60 - minutes) / 60
+        remaining = max(quota - used, 0)
+        if quota <= 0:
+            pressure = 1.0
+        elif not remaining:
+            pressure = MAX_PRESSURE
+        else:
+            pressure = min(max((hours_left / 24) / (remaining / quota), 1.0), MAX_PRESSURE)
+
+        snapshot = {
+            "upstream": self.upstream,
+            "period": day_start.strftime("%Y-%m-%d"),
+            "quota": quota,
+            "used": used,
+            "remaining": remaining,
+            "spend_rate_per_hour": round(spend_rate, 2),
+            "sustainable_rate_per_hour": round(remaining / hours_left, 2) if quota > 0 else None,
+            "pressure": round(pressure, 3),
+        }
+        self._snapshot = (snapshot, time.monotonic())
+        return snapshot
+
+    def pressure(self) -> float:
+        try:
+            return self.snapshot()["pressure"]
+        except Exception as e:
+            logger.warning(f"Failed to read {self.upstream} budget: {str(e)}")
+            return 1.0
+
+newsapi_budget = UpstreamBudget("newsapi", "NEWSAPI_DAILY_QUOTA")
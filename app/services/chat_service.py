@@ -1,7 +1,12 @@
-import google.generativeai as genai
 from app.config import settings
 from app.utils.redis_client import redis_client
+from app.utils.metrics import record_gemini_call
+from app.services.retrieval_service import news_retriever
+from app.services.answer_cache import chat_answer_cache
+from sqlalchemy.orm import Session
+from typing import Optional
 import logging
+import time
 import json
 from datetime import datetime
 
@@ -9,15 +14,8 @@ logger = logging.getLogger(__name__)
 
 class ChatService:
     def __init__(self):
-        try:
-            if not settings.chat_api_key or settings.chat_api_key == "your_gemini_api_key_here":
-                logger.error("Gemini Chat API key not configured")
-                raise ValueError("Gemini Chat API key not configured")
-            
-            genai.configure(api_key=settings.chat_api_key)
-            
-            # System instruction for news-only responses
-            self.system_instruction = """You are ThinkFeed AI, a specialized news assistant. Your role is to:
+        # System instruction for news-only responses
+        self.system_instruction = """You are ThinkFeed AI, a specialized news assistant. Your role is to:
 
 1. ONLY answer questions about news, current events, and world affairs
 2. Provide accurate, unbiased information about recent news stories
@@ -37,14 +35,32 @@ Example responses for non-news questions:
 - "That's outside my expertise as a news assistant. Would you like to know about today's top headlines instead?"
 
 Stay focused on news and current events at all times."""
-
-            self.model = genai.GenerativeModel('gemini-2.5-flash')
-            logger.info("Chat Service initialized successfully with gemini-2.5-flash model")
-        except Exception as e:
-            logger.error(f"Failed to initialize Chat Service: {str(e)}")
-            raise
+        
+        self._model = None
+    
+    @property
+    def model(self):
+        # google.generativeai is slow to import, so the client is built on first use
+        if self._model is None:
+            try:
+                if not settings.chat_api_key or settings.chat_api_key == "your_gemini_api_key_here":
+                    logger.error("Gemini Chat API key not configured")
+                    raise ValueError("Gemini Chat API key not configured")
+                
+                import google.generativeai as genai
+                genai.configure(api_key=settings.chat_api_key)
+                self._model = genai.GenerativeModel('gemini-2.5-flash')
+                logger.info("Chat Service initialized successfully with gemini-2.5-flash model")
+            except Exception as e:
+                logger.error(f"Failed to initialize Chat Service: {str(e)}")
+                raise
+        return self._model
     
-    async def chat(self, user_id: int, message: str, conversation_history: list = None) -> dict:
+    @model.setter
+    def model(self, value):
+        self._model = value
+    
+    async def chat(self, user_id: int, message: str, conversation_history: list = None, db: Optional[Session] = None) -> dict:
         """
         Process a chat message and return AI response
         
@@ -52,6 +68,7 @@ Stay focused on news and current events at all times."""
             user_id: User ID for tracking conversations
             message: User's message
             conversation_history: List of previous messages [{"role": "user/model", "parts": ["text"]}]
+            db: Used to load retrieved articles that are not cached
         
         Returns:
             dict with response and updated conversation history
@@ -64,26 +81,47 @@ Stay focused on news and current events at all times."""
             if len(message) > 2000:
                 raise ValueError("Message is too long. Please keep it under 2000 characters.")
             
+            first_turn = not conversation_history
+            question = message
+            if first_turn:
+                cached_response = chat_answer_cache.get(question)
+                if cached_response:
+                    logger.info(f"Answered first chat message for user {user_id} from cache")
+                    return self._respond(user_id, cached_response, [
+                        {"role": "user", "parts": [self._first_turn_prompt(question)]},
+                        {"role": "model", "parts": [cached_response]},
+                    ])
+            
+            # Ground the answer in our own articles; the context is sent but not kept in history
+            context = news_retriever.context_block(message, db)
+            
             # Start or continue chat session
             if conversation_history and len(conversation_history) > 0:
                 chat = self.model.start_chat(history=conversation_history)
             else:
                 # For first message, prepend system instruction
                 chat = self.model.start_chat(history=[])
-                message = f"{self.system_instruction}\n\nUser question: {message}"
+                message = self._first_turn_prompt(message)
+            stored_message = message
+            if context:
+                message = f"{context}\n\n{message}"
             
             logger.info(f"Processing chat message for user {user_id}")
             
             # Send message and get response
+            start = time.perf_counter()
             try:
                 response = chat.send_message(message)
                 
                 if not response or not response.text:
+                    # Recorded once, as an error, by the handler below
                     raise ValueError("AI returned empty response")
+                record_gemini_call("chat", start, message, response)
                 
                 response_text = response.text.strip()
                 
             except Exception as gemini_error:
+                record_gemini_call("chat", start, message, outcome="error")
                 error_msg = str(gemini_error)
                 logger.error(f"Gemini Chat API error: {error_msg}")
                 
@@ -101,7 +139,6 @@ Stay focused on news and current events at all times."""
             updated_history = chat.history
             
             # Cache conversation for user (keep last 10 messages)
-            cache_key = f"chat:history:{user_id}"
             history_to_cache = updated_history[-20:] if len(updated_history) > 20 else updated_history
             
             # Convert history to serializable format
@@ -112,16 +149,15 @@ Stay focused on news and current events at all times."""
                 }
                 for msg in history_to_cache
             ]
+            if context and len(serializable_history) >= 2 and serializable_history[-2]["role"] == "user":
+                serializable_history[-2]["parts"] = [stored_message]
             
-            redis_client.set(cache_key, json.dumps(serializable_history), expire=3600)  # Cache for 1 hour
+            if first_turn:
+                chat_answer_cache.put(question, response_text)
             
             logger.info(f"Chat response generated for user {user_id}")
             
-            return {
-                "response": response_text,
-                "conversation_history": serializable_history,
-                "timestamp": datetime.utcnow().isoformat()
-            }
+            return self._respond(user_id, response_text, serializable_history)
             
         except ValueError:
             raise
@@ -129,6 +165,18 @@ Stay focused on news and current events at all times."""
             logger.error(f"Error in chat service: {str(e)}", exc_info=True)
             raise ValueError(f"Failed to process chat message: {str(e)}")
     
+    def _first_turn_prompt(self, message: str) -> str:
+        return f"{self.system_instruction}\n\nUser question: {message}"
+    
+    def _respond(self, user_id: int, response_text: str, serializable_history: list) -> dict:
+        cache_key = f"chat:history:{user_id}"
+        redis_client.set(cache_key, json.dumps(serializable_history), expire=3600)  # Cache for 1 hour
+        return {
+            "response": response_text,
+            "conversation_history": serializable_history,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
     def get_conversation_history(self, user_id: int) -> list:
         """Get cached conversation history for a user"""
         try:
@@ -136,7 +184,8 @@ Stay focused on news and current events at all times."""
             cached = redis_client.get(cache_key)
             
             if cached:
-                return json.loads(cached)
+                # RedisClient.get already decodes JSON payloads
+                return cached if isinstance(cached, list) else json.loads(cached)
             return []
         except Exception as e:
             logger.error(f"Error retrieving conversation history: {str(e)}")
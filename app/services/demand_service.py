@@ -0,0 +1,146 @@
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.news import ArticleSummary, NewsArticle, SavedArticle
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Relative weight of each demand signal after normalising it to [0, 1]
+SAVE_WEIGHT = 0.5
+SUMMARIZE_WEIGHT = 0.3
+HEADLINE_WEIGHT = 0.2
+
+SIGNAL_TTL = 2 * 86400
+CANDIDATE_POOL = 200
+
+class DemandService:
+    """
+    Tracks which articles people want summaries for.
+
+    Signals are kept in daily Redis sorted sets so recording them is a single
+    O(log n) command on the request path:
+    - demand:summarize:{day}  article_id -> summarize requests
+    - demand:headlines:{day}  url -> best headline position score (1.0 = top story)
+    Save counts come from `saved_articles` at ranking time.
+    """
+
+    def _day(self, offset: int = 0) -> str:
+        return (datetime.utcnow() - timedelta(days=offset)).strftime("%Y%m%d")
+
+    def record_summarize_request(self, article_id: int):
+        try:
+            key = f"demand:summarize:{self._day()}"
+            pipe = redis_client.client.pipeline(transaction=False)
+            pipe.zincrby(key, 1, article_id)
+            pipe.expire(key, SIGNAL_TTL)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to record summarize demand for article {article_id}: {str(e)}")
+
+    def record_headlines(self, category: str, articles: List[Dict[str, Any]], offset: int = 0):
+        """Record headline positions for a freshly fetched page of top headlines"""
+        articles = [article for article in articles if article.get("url") and article.get("title")]
+        if not articles:
+            return
+        try:
+            day = self._day()
+            scores_key = f"demand:headlines:{day}"
+            payloads_key = f"demand:headline_articles:{day}"
+            pipe = redis_client.client.pipeline(transaction=False)
+            pipe.zadd(scores_key, {
+                article["url"]: 1.0 / (offset + position + 1)
+                for position, article in enumerate(articles)
+            }, gt=True)
+            pipe.hset(payloads_key, mapping={
+                article["url"]: json.dumps({**article, "category": article.get("category") or category})
+                for article in articles
+            })
+            pipe.expire(scores_key, SIGNAL_TTL)
+            pipe.expire(payloads_key, SIGNAL_TTL)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to record headline demand: {str(e)}")
+
+    def _normalised(self, scores: Dict[Any, float]) -> Dict[Any, float]:
+        top = max(scores.values(), default=0)
+        return {key: value / top for key, value in scores.items()} if top else {}
+
+    def _save_counts(self, db: Session) -> Dict[int, float]:
+        since = datetime.utcnow() - timedelta(days=1)
+        rows = (
+            db.query(SavedArticle.article_id, func.count(SavedArticle.id))
+            .filter(SavedArticle.saved_at >= since)
+            .group_by(SavedArticle.article_id)
+            .order_by(func.count(SavedArticle.id).desc())
+            .limit(CANDIDATE_POOL)
+            .all()
+        )
+        return {article_id: float(count) for article_id, count in rows}
+
+    def _summarize_counts(self) -> Dict[int, float]:
+        counts: Dict[int, float] = {}
+        for offset in (0, 1):
+            for member, score in redis_client.client.zrevrange(
+                f"demand:summarize:{self._day(offset)}", 0, CANDIDATE_POOL - 1, withscores=True
+            ):
+                counts[int(member)] = counts.get(int(member), 0.0) + score
+        return counts
+
+    def _headline_scores(self, db: Session) -> Dict[int, float]:
+        """Headline scores by article id, ingesting headline articles not yet in the database"""
+        from app.services.news_service import news_service
+
+        day = self._day()
+        url_scores = dict(redis_client.client.zrevrange(
+            f"demand:headlines:{day}", 0, CANDIDATE_POOL - 1, withscores=True
+        ))
+        if not url_scores:
+            return {}
+
+        known = dict(
+            db.query(NewsArticle.url, NewsArticle.id).filter(NewsArticle.url.in_(list(url_scores))).all()
+        )
+        missing = [url for url in url_scores if url not in known]
+        if missing:
+            payloads = redis_client.client.hmget(f"demand:headline_articles:{day}", missing)
+            for url, payload in zip(missing, payloads):
+                if not payload:
+                    continue
+                try:
+                    known[url] = news_service.save_article_to_db(db, json.loads(payload)).id
+                except Exception as e:
+                    db.rollback()
+                    logger.warning(f"Failed to ingest headline article {url}: {str(e)}")
+
+        return {known[url]: score for url, score in url_scores.items() if url in known}
+
+    def rank_candidates(self, db: Session, limit: int) -> List[int]:
+        """Article ids without a summary, most in-demand first"""
+        signals = [
+            (SAVE_WEIGHT, self._normalised(self._save_counts(db))),
+            (SUMMARIZE_WEIGHT, self._normalised(self._summarize_counts())),
+            (HEADLINE_WEIGHT, self._normalised(self._headline_scores(db))),
+        ]
+        scores: Dict[int, float] = {}
+        for weight, values in signals:
+            for article_id, value in values.items():
+                scores[article_id] = scores.get(article_id, 0.0) + weight * value
+        if not scores:
+            return []
+
+        summarized = {
+            article_id for (article_id,) in
+            db.query(ArticleSummary.article_id).filter(ArticleSummary.article_id.in_(list(scores))).all()
+        }
+        ranked = sorted(
+            (article_id for article_id in scores if article_id not in summarized),
+            key=lambda article_id: scores[article_id],
+            reverse=True,
+        )
+        return ranked[:limit]
+
+demand_service = DemandService()
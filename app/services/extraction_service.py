@@ -0,0 +1,360 @@
+import asyncio
+import gzip
+import hashlib
+import ipaddress
+import logging
+import os
+import re
+import socket
+import time
+import uuid
+from datetime import datetime
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urljoin, urlsplit
+import httpcore
+import httpx
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.news import NewsArticle
+from app.utils import tracing
+
+logger = logging.getLogger(__name__)
+
+# NewsAPI cuts `content` at ~200 chars and appends e.g. "… [+2345 chars]"
+TRUNCATION_MARKER = re.compile(r"[\s…]*\[\+\d+ chars\]\s*$")
+
+def is_truncated(content: Optional[str]) -> bool:
+    return not content or len(content.strip()) < 50 or bool(TRUNCATION_MARKER.search(content))
+
+def strip_truncation_marker(content: str) -> str:
+    """NewsAPI's stub without the trailing "… [+N chars]" """
+    return TRUNCATION_MARKER.sub("", content)
+
+class UnsafeURLError(ValueError):
+    pass
+
+def check_public_url(url: str):
+    """Refuse anything but http(s) URLs; the host's addresses are checked when connecting"""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise UnsafeURLError(f"Refusing to fetch {url}: only http(s) URLs are allowed")
+
+async def public_addresses(host: str, port: int) -> List[str]:
+    """
+    The host's addresses, refusing hosts that resolve to private, loopback,
+    link-local or reserved addresses (Redis, cloud metadata, internal services).
+    """
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except (OSError, ValueError) as e:
+        raise UnsafeURLError(f"Refusing to fetch from {host}: cannot resolve host ({str(e)})")
+    addresses = list(dict.fromkeys(info[4][0] for info in infos))
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%", 1)[0])
+        if not ip.is_global or ip.is_multicast:
+            raise UnsafeURLError(f"Refusing to fetch from {host}: it resolves to non-public address {ip}")
+    return addresses
+
+class _PublicOnlyBackend(httpcore.AsyncNetworkBackend):
+    """
+    Connects to the addresses public_addresses() just checked, so a host cannot
+    pass the check and then resolve to a private address for the connection (DNS
+    rebinding). TLS still uses the hostname for SNI and certificate checks.
+    """
+
+    def __init__(self):
+        self._backend = httpcore.AnyIOBackend()
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        if settings.EXTRACTION_ALLOW_PRIVATE_HOSTS:
+            return await self._backend.connect_tcp(host, port, timeout, local_address, socket_options)
+        error = None
+        for address in await public_addresses(host, port):
+            try:
+                return await self._backend.connect_tcp(address, port, timeout, local_address, socket_options)
+            except httpcore.ConnectError as e:
+                error = e
+        raise error
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        raise UnsafeURLError("Refusing to fetch over a unix socket")
+
+    async def sleep(self, seconds: float):
+        await self._backend.sleep(seconds)
+
+
+class PageCache:
+    """
+    Content-addressed on-disk cache of raw pages.
+
+    Bodies are stored gzipped under objects/<sha256[:2]>/<sha256>.gz, and
+    urls/<sha256(url)> points at the body's digest, so identical pages are
+    stored once and re-extraction never refetches.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _url_path(self, url: str) -> Path:
+        return self.root / "urls" / hashlib.sha256(url.encode()).hexdigest()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.gz"
+
+    def _write_atomic(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def get(self, url: str) -> Optional[bytes]:
+        try:
+            digest = self._url_path(url).read_text().strip()
+            return gzip.decompress(self._object_path(digest).read_bytes())
+        except (FileNotFoundError, OSError, EOFError):
+            return None
+
+    def put(self, url: str, body: bytes) -> str:
+        digest = hashlib.sha256(body).hexdigest()
+        object_path = self._object_path(digest)
+        if not object_path.exists():
+            self._write_atomic(object_path, gzip.compress(body, compresslevel=6))
+        self._write_atomic(self._url_path(url), digest.encode())
+        return digest
+
+
+class _MainTextParser(HTMLParser):
+    SKIP_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "figure", "svg", "button"}
+    BLOCK_TAGS = {"p", "h1", "h2", "h3", "li", "blockquote"}
+    CONTAINER_TAGS = {"article", "main"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._skip_depth = 0
+        self._container_depth = 0
+        self._block: Optional[List[str]] = None
+        self.blocks: List[str] = []
+        self.container_blocks: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.CONTAINER_TAGS:
+            self._container_depth += 1
+        elif tag in self.BLOCK_TAGS and not self._skip_depth:
+            self._flush()
+            self._block = []
+        elif tag == "br" and self._block is not None:
+            self._block.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag in self.CONTAINER_TAGS:
+            self._flush()
+            self._container_depth = max(self._container_depth - 1, 0)
+        elif tag in self.BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if self._block is not None and not self._skip_depth:
+            self._block.append(data)
+
+    def _flush(self):
+        if self._block is None:
+            return
+        text = " ".join("".join(self._block).split())
+        self._block = None
+        if len(text) < 40:
+            return
+        self.blocks.append(text)
+        if self._container_depth:
+            self.container_blocks.append(text)
+
+def extract_main_text(html: str) -> str:
+    """Paragraph text of the page, preferring <article>/<main> when they hold most of it"""
+    parser = _MainTextParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception as e:
+        logger.warning(f"HTML parse error during extraction: {str(e)}")
+    parser._flush()
+
+    blocks = parser.blocks
+    container_chars = sum(len(block) for block in parser.container_blocks)
+    if container_chars >= 0.5 * sum(len(block) for block in blocks):
+        blocks = parser.container_blocks or blocks
+    return "\n\n".join(blocks)
+
+
+class _HostGate:
+    """Per-host concurrency limit plus a minimum delay between request starts"""
+
+    def __init__(self, concurrency: int, delay: float):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.delay = delay
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        try:
+            async with self._lock:
+                wait = self._next_start - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._next_start = time.monotonic() + self.delay
+        except BaseException:
+            # Cancelled while waiting (e.g. ensure_full_text's timeout): __aexit__ will not run
+            self.semaphore.release()
+            raise
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+
+
+class ExtractionService:
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._gates: Dict[str, _HostGate] = {}
+        self._cache: Optional[PageCache] = None
+        self.fetches = 0
+        self.cache_hits = 0
+
+    @property
+    def cache(self) -> PageCache:
+        if self._cache is None:
+            self._cache = PageCache(settings.EXTRACTION_CACHE_DIR)
+        return self._cache
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            limits = httpx.Limits(max_connections=settings.EXTRACTION_MAX_CONCURRENCY)
+            transport = httpx.AsyncHTTPTransport(limits=limits)
+            # httpx has no public hook for the network backend
+            transport._pool = httpcore.AsyncConnectionPool(
+                ssl_context=httpx.create_ssl_context(),
+                max_connections=limits.max_connections,
+                max_keepalive_connections=limits.max_keepalive_connections,
+                keepalive_expiry=limits.keepalive_expiry,
+                network_backend=_PublicOnlyBackend(),
+            )
+            # Redirects are followed by fetch_page so every hop is checked. Environment
+            # proxies would bypass the transport and with it the address check.
+            self._client = tracing.async_http_client(
+                transport=transport,
+                trust_env=False,
+                follow_redirects=False,
+                timeout=settings.EXTRACTION_TIMEOUT_SECONDS,
+                headers={"User-Agent": settings.EXTRACTION_USER_AGENT},
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._gates.clear()
+
+    def _gate(self, url: str) -> _HostGate:
+        host = urlsplit(url).netloc.lower()
+        gate = self._gates.get(host)
+        if gate is None:
+            gate = self._gates[host] = _HostGate(
+                settings.EXTRACTION_PER_HOST_CONCURRENCY, settings.EXTRACTION_POLITENESS_DELAY_SECONDS
+            )
+        return gate
+
+    async def fetch_page(self, url: str) -> bytes:
+        """Raw page body, from the disk cache when we have fetched it before"""
+        cached = self.cache.get(url)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+
+        limit = settings.EXTRACTION_MAX_PAGE_BYTES
+        async with self._gate(url):
+            target = url
+            for _ in range(settings.EXTRACTION_MAX_REDIRECTS + 1):
+                check_public_url(target)
+                async with self.client.stream("GET", target) as response:
+                    self.fetches += 1
+                    if response.is_redirect:
+                        target = urljoin(str(response.url), response.headers["location"])
+                        continue
+                    response.raise_for_status()
+                    chunks, size = [], 0
+                    async for chunk in response.aiter_bytes():
+                        chunks.append(chunk)
+                        size += len(chunk)
+                        if size >= limit:
+                            break
+                break
+            else:
+                raise UnsafeURLError(f"Too many redirects fetching {url}")
+            body = b"".join(chunks)[:limit]
+
+        await asyncio.to_thread(self.cache.put, url, body)
+        return body
+
+    async def extract_article(self, db: Session, article: NewsArticle) -> Optional[str]:
+        """Fetch and extract an article's main text and store it on the row"""
+        try:
+            body = await self.fetch_page(article.url)
+        except Exception as e:
+            logger.warning(f"Failed to fetch article {article.id} ({article.url}): {str(e)}")
+            return None
+
+        text = await asyncio.to_thread(extract_main_text, body.decode("utf-8", errors="replace"))
+        article.full_text_fetched_at = datetime.utcnow()
+        if len(text) >= 200:
+            article.full_text = text
+        db.commit()
+        return article.full_text
+
+    async def extract_many(self, db: Session, articles: Iterable[NewsArticle]) -> Dict[str, int]:
+        """Extract many articles concurrently; per-host limits still apply"""
+        stats = {"extracted": 0, "failed": 0}
+        semaphore = asyncio.Semaphore(settings.EXTRACTION_MAX_CONCURRENCY)
+
+        async def one(article: NewsArticle):
+            async with semaphore:
+                text = await self.extract_article(db, article)
+                stats["extracted" if text else "failed"] += 1
+
+        await asyncio.gather(*(one(article) for article in articles))
+        return stats
+
+    async def ensure_full_text(self, db: Session, article: NewsArticle, timeout: Optional[float] = None) -> str:
+        """Best available text for summarization, extracting on demand when the stored content is truncated"""
+        if article.full_text:
+            return article.full_text
+        if is_truncated(article.content) and article.full_text_fetched_at is None:
+            try:
+                text = await asyncio.wait_for(self.extract_article(db, article), timeout)
+                if text:
+                    return text
+            except asyncio.TimeoutError:
+                logger.warning(f"On-demand extraction timed out for article {article.id}")
+        return article.content or ""
+
+    async def extract_by_id(self, article_id: int):
+        """Background-task entry point; uses its own session"""
+        from app.database import SessionLocal, get_engine
+
+        get_engine()
+        db = SessionLocal()
+        try:
+            article = db.query(NewsArticle).filter(NewsArticle.id == article_id).first()
+            if article and article.full_text_fetched_at is None:
+                await self.extract_article(db, article)
+        except Exception as e:
+            logger.error(f"Background extraction failed for article {article_id}: {str(e)}")
+        finally:
+            db.close()
+
+extraction_service = ExtractionService()
@@ -0,0 +1,106 @@
+import logging
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional
+from app.config import settings
+from app.utils.text import split_sentences, tokenize
+
+# numpy takes ~100 ms to import, so it is imported where it is used, off the startup path
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+# Sentences sharing more than this cosine similarity with a chosen one are skipped
+REDUNDANCY_THRESHOLD = 0.6
+KEYWORDS = 15
+
+class ExtractiveSummary(NamedTuple):
+    summary: str
+    confidence: float
+    sentences: int
+
+class ExtractiveSummarizer:
+    """
+    TextRank over TF-IDF sentence vectors.
+
+    The score of each sentence is its TextRank centrality plus a small lead bias
+    (news puts the key facts first). `confidence` is the share of the article's
+    top TF-IDF keyword weight that the chosen sentences cover.
+    """
+
+    def _candidates(self, text: str) -> List[str]:
+        return [sentence for sentence in split_sentences(text) if 6 <= len(sentence.split()) <= 80]
+
+    def _matrix(self, sentences: List[List[str]]) -> "np.ndarray":
+        import numpy as np
+        vocabulary: Dict[str, int] = {}
+        rows, cols = [], []
+        for row, tokens in enumerate(sentences):
+            for token in tokens:
+                rows.append(row)
+                cols.append(vocabulary.setdefault(token, len(vocabulary)))
+        tf = np.zeros((len(sentences), max(len(vocabulary), 1)), dtype=np.float32)
+        np.add.at(tf, (rows, cols), 1.0)
+        df = np.count_nonzero(tf, axis=0)
+        idf = np.log((1 + len(sentences)) / (1 + df)) + 1.0
+        return tf * idf
+
+    def _textrank(self, similarity: "np.ndarray") -> "np.ndarray":
+        import numpy as np
+        n = similarity.shape[0]
+        totals = similarity.sum(axis=1, keepdims=True)
+        transition = np.divide(similarity, totals, out=np.full_like(similarity, 1.0 / n), where=totals > 0)
+        scores = np.full(n, 1.0 / n, dtype=np.float32)
+        for _ in range(MAX_ITERATIONS):
+            updated = (1 - DAMPING) / n + DAMPING * transition.T @ scores
+            if np.abs(updated - scores).sum() < 1e-6:
+                return updated
+            scores = updated
+        return scores
+
+    def summarize(self, text: str, max_sentences: int = 4) -> Optional[ExtractiveSummary]:
+        """Top sentences in article order, or None when there are too few to choose from"""
+        import numpy as np
+        sentences = self._candidates(text)
+        if len(sentences) < 2:
+            return None
+
+        weights = self._matrix([tokenize(sentence) for sentence in sentences])
+        norms = np.linalg.norm(weights, axis=1, keepdims=True)
+        vectors = np.divide(weights, norms, out=np.zeros_like(weights), where=norms > 0)
+        similarity = vectors @ vectors.T
+        np.fill_diagonal(similarity, 0.0)
+
+        centrality = self._textrank(similarity)
+        lead = 1.0 / np.sqrt(1.0 + np.arange(len(sentences)))
+        scores = 0.8 * centrality / centrality.max() + 0.2 * lead
+
+        limit = min(max_sentences, 3 if len(sentences) <= 8 else 4)
+        chosen: List[int] = []
+        for index in np.argsort(-scores):
+            if len(chosen) >= limit:
+                break
+            if any(similarity[index, other] > REDUNDANCY_THRESHOLD for other in chosen):
+                continue
+            chosen.append(int(index))
+        chosen.sort()
+
+        term_weights = weights.sum(axis=0)
+        keywords = np.argsort(-term_weights)[:KEYWORDS]
+        covered = np.count_nonzero(weights[chosen][:, keywords], axis=0) > 0
+        confidence = float(term_weights[keywords][covered].sum() / term_weights[keywords].sum())
+
+        summary = " ".join(sentences[index] for index in chosen)
+        return ExtractiveSummary(summary, confidence, len(sentences))
+
+    def good_enough(self, result: Optional[ExtractiveSummary]) -> bool:
+        """Routing heuristic for `mode=auto`: long or poorly covered articles go to Gemini"""
+        return (
+            result is not None
+            and result.sentences <= settings.SUMMARY_EXTRACTIVE_MAX_SENTENCES
+            and result.confidence >= settings.SUMMARY_EXTRACTIVE_MIN_CONFIDENCE
+            and 100 <= len(result.summary) <= 1200
+        )
+
+extractive_summarizer = ExtractiveSummarizer()
@@ -0,0 +1,272 @@
+import json
+import logging
+import math
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.news import NewsArticle, SavedArticle
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_WEIGHT = 1.0
+SOURCE_WEIGHT = 0.5
+ARTICLE_TTL = 7 * 86400
+INDEX_LIMIT = 500
+
+class FeedService:
+    """
+    Per-user feeds materialized in Redis sorted sets.
+
+    Keys:
+    - feed:article:{id}             JSON payload served by MGET
+    - feed:recent                   ZSET article_id -> published timestamp (all ingested articles)
+    - feed:recent:category:{c}      same, per category
+    - feed:recent:source:{s}        same, per source
+    - feed:profile:{user_id}        HASH category:{c} / source:{s} -> saved-article counts
+    - feed:interest:category:{c}    SET of user ids with that category in their profile
+    - feed:interest:source:{s}      SET of user ids with that source in their profile
+    - feed:user:{user_id}           ZSET article_id -> score
+    - feed:nosaves:{user_id}        set for FEED_NO_SAVES_TTL_SECONDS when a rebuild found no saved articles
+
+    score = ln(affinity) + published_ts / tau. Exponential recency decay with
+    half-life `FEED_RECENCY_HALF_LIFE_HOURS` is equivalent to adding published_ts/tau
+    in log space, so scores never need recomputing as articles age; only a
+    profile change re-scores the articles of the affected category and source.
+    """
+
+    @property
+    def tau(self) -> float:
+        return settings.FEED_RECENCY_HALF_LIFE_HOURS * 3600 / math.log(2)
+
+    def _payload(self, article: NewsArticle) -> Dict[str, Any]:
+        published = article.published_at or article.created_at or datetime.utcnow()
+        return {
+            "id": article.id,
+            "source_name": article.source_name,
+            "author": article.author,
+            "title": article.title,
+            "description": article.description,
+            "url": article.url,
+            "url_to_image": article.url_to_image,
+            "published_at": published.isoformat(),
+            "category": article.category,
+        }
+
+    def _timestamp(self, payload: Dict[str, Any]) -> float:
+        return datetime.fromisoformat(payload["published_at"]).timestamp()
+
+    def _affinity(self, profile: Dict[str, int], category: Optional[str], source: Optional[str]) -> float:
+        category_count = int(profile.get(f"category:{category}", 0)) if category else 0
+        source_count = int(profile.get(f"source:{source}", 0)) if source else 0
+        return 1.0 + CATEGORY_WEIGHT * math.log1p(max(category_count, 0)) + SOURCE_WEIGHT * math.log1p(max(source_count, 0))
+
+    def _score(self, profile: Dict[str, int], payload: Dict[str, Any]) -> float:
+        return math.log(self._affinity(profile, payload.get("category"), payload.get("source_name"))) + self._timestamp(payload) / self.tau
+
+    def _trim(self, pipe, key: str, limit: int):
+        pipe.zremrangebyrank(key, 0, -limit - 1)
+
+    def _index(self, pipe, article: NewsArticle, payload: Dict[str, Any]):
+        published = self._timestamp(payload)
+        pipe.set(f"feed:article:{article.id}", json.dumps(payload), ex=ARTICLE_TTL)
+        pipe.zadd("feed:recent", {article.id: published})
+        self._trim(pipe, "feed:recent", settings.FEED_MAX_ITEMS * 4)
+        if article.category:
+            pipe.zadd(f"feed:recent:category:{article.category}", {article.id: published})
+            self._trim(pipe, f"feed:recent:category:{article.category}", INDEX_LIMIT)
+        if article.source_name:
+            pipe.zadd(f"feed:recent:source:{article.source_name}", {article.id: published})
+            self._trim(pipe, f"feed:recent:source:{article.source_name}", INDEX_LIMIT)
+
+    def on_article_ingested(self, article: NewsArticle):
+        """Index a new article and push it into the feeds of users interested in its category or source"""
+        try:
+            client = redis_client.client
+            payload = self._payload(article)
+            pipe = client.pipeline(transaction=False)
+            self._index(pipe, article, payload)
+            pipe.execute()
+
+            interest_keys = []
+            if article.category:
+                interest_keys.append(f"feed:interest:category:{article.category}")
+            if article.source_name:
+                interest_keys.append(f"feed:interest:source:{article.source_name}")
+            if not interest_keys:
+                return
+            user_ids = list(client.sunion(interest_keys))
+            if not user_ids:
+                return
+
+            pipe = client.pipeline(transaction=False)
+            for user_id in user_ids:
+                pipe.hgetall(f"feed:profile:{user_id}")
+            profiles = pipe.execute()
+
+            pipe = client.pipeline(transaction=False)
+            for user_id, profile in zip(user_ids, profiles):
+                feed_key = f"feed:user:{user_id}"
+                pipe.zadd(feed_key, {article.id: self._score(profile, payload)})
+                self._trim(pipe, feed_key, settings.FEED_MAX_ITEMS)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to index article {article.id} for feeds: {str(e)}")
+
+    def _update_profile(self, db: Session, user_id: int, article: NewsArticle, delta: int):
+        try:
+            client = redis_client.client
+            profile_key = f"feed:profile:{user_id}"
+            if not client.exists(profile_key):
+                # First save (or an evicted profile): materialize the whole feed, as a feed request would
+                self.rebuild_user_feed(db, user_id)
+                return
+            fields = []
+            if article.category:
+                fields.append(("category", article.category))
+            if article.source_name:
+                fields.append(("source", article.source_name))
+
+            pipe = client.pipeline(transaction=False)
+            for kind, value in fields:
+                pipe.hincrby(profile_key, f"{kind}:{value}", delta)
+                if delta > 0:
+                    pipe.sadd(f"feed:interest:{kind}:{value}", user_id)
+            pipe.hgetall(profile_key)
+            for kind, value in fields:
+                pipe.zrevrange(f"feed:recent:{kind}:{value}", 0, INDEX_LIMIT - 1)
+            results = pipe.execute()
+
+            profile = results[-1 - len(fields)]
+            for kind, value in fields:
+                if delta < 0 and int(profile.get(f"{kind}:{value}", 0)) <= 0:
+                    client.hdel(profile_key, f"{kind}:{value}")
+                    client.srem(f"feed:interest:{kind}:{value}", user_id)
+
+            # Only articles sharing the changed category/source need new scores
+            affected = list({article_id for ids in results[-len(fields):] for article_id in ids}) if fields else []
+            self._rescore(user_id, profile, affected)
+        except Exception as e:
+            logger.warning(f"Failed to update feed profile for user {user_id}: {str(e)}")
+
+    def _rescore(self, user_id: int, profile: Dict[str, int], article_ids: List[str]):
+        if not article_ids:
+            return
+        client = redis_client.client
+        payloads = client.mget([f"feed:article:{article_id}" for article_id in article_ids])
+        scores = {
+            article_id: self._score(profile, json.loads(payload))
+            for article_id, payload in zip(article_ids, payloads)
+            if payload
+        }
+        if not scores:
+            return
+        feed_key = f"feed:user:{user_id}"
+        pipe = client.pipeline(transaction=False)
+        pipe.zadd(feed_key, scores)
+        self._trim(pipe, feed_key, settings.FEED_MAX_ITEMS)
+        pipe.execute()
+
+    def on_user_saved(self, db: Session, user_id: int, article: NewsArticle):
+        self._update_profile(db, user_id, article, 1)
+
+    def on_user_unsaved(self, db: Session, user_id: int, article: NewsArticle):
+        self._update_profile(db, user_id, article, -1)
+
+    def needs_rebuild(self, user_id: int) -> bool:
+        """True when the user's profile or feed is missing from Redis and they are not known to have no saves"""
+        pipe = redis_client.client.pipeline(transaction=False)
+        pipe.exists(f"feed:profile:{user_id}", f"feed:user:{user_id}")
+        pipe.exists(f"feed:nosaves:{user_id}")
+        present, no_saves = pipe.execute()
+        return present < 2 and not no_saves
+
+    def rebuild_user_feed(self, db: Session, user_id: int) -> bool:
+        """
+        Recompute a user's profile and feed from the database (first request,
+        first save or after Redis eviction). Returns False when the user has no saved articles.
+        """
+        counts: Dict[str, int] = {}
+        rows = (
+            db.query(NewsArticle.category, NewsArticle.source_name, func.count(SavedArticle.id))
+            .join(SavedArticle, SavedArticle.article_id == NewsArticle.id)
+            .filter(SavedArticle.user_id == user_id)
+            .group_by(NewsArticle.category, NewsArticle.source_name)
+            .all()
+        )
+        for category, source, count in rows:
+            if category:
+                counts[f"category:{category}"] = counts.get(f"category:{category}", 0) + count
+            if source:
+                counts[f"source:{source}"] = counts.get(f"source:{source}", 0) + count
+        if not counts:
+            pipe = redis_client.client.pipeline()
+            pipe.delete(f"feed:profile:{user_id}", f"feed:user:{user_id}")
+            pipe.set(f"feed:nosaves:{user_id}", 1, ex=settings.FEED_NO_SAVES_TTL_SECONDS)
+            pipe.execute()
+            return False
+
+        recent = (
+            db.query(NewsArticle)
+            .order_by(func.coalesce(NewsArticle.published_at, NewsArticle.created_at).desc())
+            .limit(settings.FEED_MAX_ITEMS)
+            .all()
+        )
+        payloads = [self._payload(article) for article in recent]
+
+        pipe = redis_client.client.pipeline()
+        for article, payload in zip(recent, payloads):
+            self._index(pipe, article, payload)
+        pipe.delete(f"feed:profile:{user_id}", f"feed:user:{user_id}", f"feed:nosaves:{user_id}")
+        pipe.hset(f"feed:profile:{user_id}", mapping=counts)
+        for field in counts:
+            kind, value = field.split(":", 1)
+            pipe.sadd(f"feed:interest:{kind}:{value}", user_id)
+        if payloads:
+            pipe.zadd(f"feed:user:{user_id}", {payload["id"]: self._score(counts, payload) for payload in payloads})
+        pipe.execute()
+        logger.info(f"Rebuilt feed for user {user_id} from {len(payloads)} articles")
+        return True
+
+    def article_payloads(self, article_ids: List[int], db: Optional[Session] = None) -> Dict[int, Dict[str, Any]]:
+        """Cached payloads by id; with `db`, missing ones are loaded and cached again"""
+        if not article_ids:
+            return {}
+        client = redis_client.client
+        payloads = client.mget([f"feed:article:{article_id}" for article_id in article_ids])
+        found = {int(article_id): json.loads(payload) for article_id, payload in zip(article_ids, payloads) if payload}
+        missing = [int(article_id) for article_id in article_ids if int(article_id) not in found]
+        if missing and db is not None:
+            pipe = client.pipeline(transaction=False)
+            for article in db.query(NewsArticle).filter(NewsArticle.id.in_(missing)).all():
+                found[article.id] = self._payload(article)
+                pipe.set(f"feed:article:{article.id}", json.dumps(found[article.id]), ex=ARTICLE_TTL)
+            pipe.execute()
+        return found
+
+    def get_feed(self, user_id: int, page: int = 1, page_size: int = 20) -> Tuple[List[Dict[str, Any]], bool]:
+        """One ZREVRANGE plus one MGET. Returns (articles, personalized)."""
+        client = redis_client.client
+        start = (page - 1) * page_size
+        stop = start + page_size - 1
+
+        personalized = True
+        article_ids = client.zrevrange(f"feed:user:{user_id}", start, stop)
+        if not article_ids:
+            # No profile yet (or past the end of it): most recent articles
+            personalized = False
+            article_ids = client.zrevrange("feed:recent", start, stop)
+        if not article_ids:
+            return [], personalized
+
+        payloads = client.mget([f"feed:article:{article_id}" for article_id in article_ids])
+        articles = [json.loads(payload) for payload in payloads if payload]
+
+        expired = [article_id for article_id, payload in zip(article_ids, payloads) if not payload]
+        if expired and personalized:
+            client.zrem(f"feed:user:{user_id}", *expired)
+        return articles, personalized
+
+feed_service = FeedService()
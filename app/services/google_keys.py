@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Dict, Optional
+import httpx
+from jose import jwt
+from jose.exceptions import JWTError
+from app.config import settings
+from app.utils import tracing
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+MAX_AGE = re.compile(r"max-age=(\d+)")
+# Unknown key ids trigger at most one forced refetch per this many seconds
+FORCED_REFRESH_INTERVAL = 60.0
+CLOCK_SKEW_SECONDS = 10
+
+class GoogleKeysUnavailable(RuntimeError):
+    """Google's signing keys could not be fetched; not the token's fault"""
+    pass
+
+class GoogleKeySet:
+    """
+    Google's ID-token signing keys (JWKS), cached in process.
+
+    Keys are kept for the response's Cache-Control max-age and refreshed in a
+    background task once they are within GOOGLE_CERTS_REFRESH_MARGIN_SECONDS of
+    expiring, so sign-in only waits on the network for the very first fetch (or
+    after the keys expired unused). Concurrent fetches are collapsed into one.
+    Tokens are verified locally with python-jose: signature, expiry, audience and
+    issuer, the same checks as google.oauth2.id_token.verify_oauth2_token.
+    """
+
+    def __init__(self):
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._expires_at = 0.0
+        self._refresh_margin = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._last_forced_refresh = 0.0
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = tracing.async_http_client(timeout=5.0)
+        return self._client
+
+    async def aclose(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._lock = None
+
+    async def _fetch(self):
+        try:
+            response = await self.client.get(settings.GOOGLE_CERTS_URL)
+            response.raise_for_status()
+            keys = {key["kid"]: key for key in response.json().get("keys", []) if key.get("kid")}
+        except (httpx.HTTPError, ValueError) as e:
+            raise GoogleKeysUnavailable(f"Failed to fetch Google signing keys: {str(e)}")
+        if not keys:
+            raise GoogleKeysUnavailable("Google returned no signing keys")
+        match = MAX_AGE.search(response.headers.get("cache-control", ""))
+        ttl = int(match.group(1)) if match else settings.GOOGLE_CERTS_TTL_SECONDS
+        self._keys = keys
+        self._expires_at = time.monotonic() + ttl
+        # Short max-ages would otherwise put fresh keys straight into the refresh margin
+        self._refresh_margin = min(settings.GOOGLE_CERTS_REFRESH_MARGIN_SECONDS, ttl / 4)
+        logger.info(f"Fetched {len(keys)} Google signing keys, valid for {ttl}s")
+
+    async def refresh(self, force: bool = False):
+        """Fetch the keys unless another caller just did"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        fetched_before = self._expires_at
+        async with self._lock:
+            if self._expires_at != fetched_before and not force:
+                return
+            await self._fetch()
+
+    async def _background_refresh(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            # The current keys stay in use until they expire
+            logger.warning(f"Background refresh of Google signing keys failed: {str(e)}")
+        finally:
+            self._refresh_task = None
+
+    async def keys(self) -> Dict[str, Dict[str, Any]]:
+        remaining = self._expires_at - time.monotonic()
+        if remaining <= 0:
+            await self.refresh()
+        elif remaining < self._refresh_margin and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._background_refresh())
+        return self._keys
+
+    async def _key_for(self, kid: Optional[str]) -> Dict[str, Any]:
+        keys = await self.keys()
+        if kid in keys:
+            return keys[kid]
+        # Google rotated keys before our copy expired
+        if time.monotonic() - self._last_forced_refresh > FORCED_REFRESH_INTERVAL:
+            self._last_forced_refresh = time.monotonic()
+            await self.refresh(force=True)
+            if kid in self._keys:
+                return self._keys[kid]
+        raise ValueError("Token signed with an unknown key")
+
+    async def verify(self, token: str, audience: str) -> Dict[str, Any]:
+        """Claims of a valid Google ID token; raises ValueError otherwise, GoogleKeysUnavailable when the keys cannot be fetched"""
+        try:
+            header = jwt.get_unverified_header(token)
+        except JWTError as e:
+            raise ValueError(f"Malformed token: {str(e)}")
+        key = await self._key_for(header.get("kid"))
+        try:
+            return jwt.decode(
+                token, key,
+                algorithms=[key.get("alg", "RS256")],
+                audience=audience,
+                issuer=GOOGLE_ISSUERS,
+                options={"verify_at_hash": False, "leeway": CLOCK_SKEW_SECONDS},
+            )
+        except JWTError as e:
+            raise ValueError(str(e))
+
+    def warm_up(self):
+        """Start fetching the keys in the background (called from the lifespan)"""
+        if not self._keys and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._background_refresh())
+
+google_keys = GoogleKeySet()
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+import redis.asyncio as aioredis
+from app.config import settings
+from app.utils.redis_client import redis_client
+from app.services.answer_cache import HEADLINES_NAMESPACE
+from app.utils.metrics import WS_CONNECTIONS, WS_MESSAGES
+
+logger = logging.getLogger(__name__)
+
+VALID_CATEGORIES = {"all", "business", "entertainment", "general", "health", "science", "sports", "technology"}
+CHANNEL_PREFIX = "headlines:updates:"
+SEEN_TTL = 86400
+
+class Subscriber:
+    """One WebSocket connection. The queue is bounded; when it is full the oldest update is dropped."""
+
+    def __init__(self, categories: Set[str], country: str):
+        self.categories = categories
+        self.country = country
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.WS_QUEUE_SIZE)
+
+    def wants(self, category: str, country: str) -> bool:
+        return country == self.country and category in self.categories
+
+    def offer(self, message: str):
+        if self.queue.full():
+            self.queue.get_nowait()
+            WS_MESSAGES.labels("dropped").inc()
+        self.queue.put_nowait(message)
+
+class HeadlineHub:
+    """
+    Fans out new headlines to WebSocket subscribers on every worker.
+
+    Whichever worker refreshes a headline page publishes only the URLs it has
+    not seen before to `headlines:updates:{category}:{country}`. Each worker holds
+    one pattern subscription and hands the already-serialized message to its
+    local subscribers. While anyone is subscribed, one worker per topic refreshes
+    the headline cache every HEADLINES_REFRESH_SECONDS.
+    """
+
+    def __init__(self):
+        self._redis: Optional[aioredis.Redis] = None
+        self._subscribers: Set[Subscriber] = set()
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        if self._redis is None:
+            self._redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+        return self._redis
+
+    @redis.setter
+    def redis(self, value: aioredis.Redis):
+        self._redis = value
+
+    @property
+    def connections(self) -> int:
+        return len(self._subscribers)
+
+    def publish_new(self, category: Optional[str], country: str, articles: List[Dict[str, Any]]):
+        """Publish the articles of a freshly fetched headline page that were not seen before"""
+        articles = [article for article in articles if article.get("url")]
+        if not articles:
+            return
+        category = category or "all"
+        try:
+            seen_key = f"headlines:seen:{category}:{country}"
+            urls = [article["url"] for article in articles]
+            pipe = redis_client.client.pipeline(transaction=False)
+            pipe.smismember(seen_key, urls)
+            pipe.sadd(seen_key, *urls)
+            pipe.expire(seen_key, SEEN_TTL)
+            seen, _, _ = pipe.execute()
+
+            fresh = [article for article, was_seen in zip(articles, seen) if not was_seen]
+            if not fresh:
+                return
+            # Cached first-turn chat answers are tied to this version
+            redis_client.bump_namespace(HEADLINES_NAMESPACE)
+            redis_client.client.publish(f"{CHANNEL_PREFIX}{category}:{country}", json.dumps({
+                "type": "headlines",
+                "category": category,
+                "country": country,
+                "articles": [
+                    {
+                        "url": article["url"],
+                        "title": article.get("title"),
+                        "source": (article.get("source") or {}).get("name"),
+                        "urlToImage": article.get("urlToImage"),
+                        "publishedAt": article.get("publishedAt"),
+                    }
+                    for article in fresh
+                ],
+            }))
+        except Exception as e:
+            logger.warning(f"Failed to publish headline updates for {category}/{country}: {str(e)}")
+
+    def subscribe(self, subscriber: Subscriber):
+        self._subscribers.add(subscriber)
+        WS_CONNECTIONS.inc()
+        self._tasks = [task for task in self._tasks if not task.done()]
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._listen()), asyncio.create_task(self._refresh())]
+
+    def unsubscribe(self, subscriber: Subscriber):
+        if subscriber in self._subscribers:
+            self._subscribers.discard(subscriber)
+            WS_CONNECTIONS.dec()
+
+    def _topics(self) -> Set[Tuple[str, str]]:
+        return {
+            (category, subscriber.country)
+            for subscriber in list(self._subscribers)
+            for category in subscriber.categories
+        }
+
+    async def _listen(self):
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    category, country = message["channel"][len(CHANNEL_PREFIX):].rsplit(":", 1)
+                    for subscriber in list(self._subscribers):
+                        if subscriber.wants(category, country):
+                            subscriber.offer(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Headline subscription lost, reconnecting: {str(e)}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def _refresh(self):
+        from app.services.news_service import news_service
+
+        interval = settings.HEADLINES_REFRESH_SECONDS
+        while True:
+            await asyncio.sleep(interval)
+            for category, country in self._topics():
+                try:
+                    # One worker per topic and interval hits NewsAPI
+                    lock_key = f"headlines:refresh:{category}:{country}"
+                    if redis_client.client.set(lock_key, "1", nx=True, ex=interval):
+                        await news_service.fetch_top_headlines(
+                            None if category == "all" else category, country, refresh=True
+                        )
+                except Exception as e:
+                    logger.warning(f"Headline refresh failed for {category}/{country}: {str(e)}")
+
+    async def aclose(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._redis is not None:
+            await self._redis.aclose()
+
+headline_hub = HeadlineHub()
@@ -1,24 +1,107 @@
+import asyncio
 import httpx
+import logging
+import time
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.config import settings
 from app.models.news import NewsArticle, SavedArticle
 from app.utils.redis_client import redis_client
+from app.utils.metrics import HEADLINES_BULK_CATEGORIES, NEWSAPI_LATENCY, NEWSAPI_RESPONSES
+from app.utils import tracing
+from app.utils.projection import PRECOMPUTED_VIEWS, ArticleView
+from app.services.budget_service import newsapi_budget
+from app.services.demand_service import demand_service
+from app.services.feed_service import feed_service
+from app.services.headline_stream import headline_hub
+from app.services.related_service import related_index
+from app.services.trending_service import trending_service
+from app.services.ttl_policy import ttl_policy
+
+logger = logging.getLogger(__name__)
+
+HEADLINE_CATEGORIES = ("business", "entertainment", "general", "health", "science", "sports", "technology")
 
 class NewsService:
     def __init__(self):
-        self.api_key = settings.NEWS_API_KEY
         self.base_url = settings.NEWS_API_BASE_URL
+        self._client: Optional[httpx.AsyncClient] = None
+        # Upstream headline fetches started by bulk requests, by cache key
+        self._inflight: Dict[str, asyncio.Task] = {}
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # One pooled client per worker, created on first request and closed by the app lifespan
+        if self._client is None or self._client.is_closed:
+            self._client = tracing.async_http_client()
+        return self._client
+    
+    async def aclose(self):
+        for task in list(self._inflight.values()):
+            task.cancel()
+        await asyncio.gather(*self._inflight.values(), return_exceptions=True)
+        self._inflight.clear()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _get(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        status = "error"
+        newsapi_budget.record_call()
+        try:
+            response = await self.client.get(f"{self.base_url}/{endpoint}", params=params)
+            status = str(response.status_code)
+            response.raise_for_status()
+            return response.json()
+        finally:
+            NEWSAPI_LATENCY.labels(endpoint).observe(time.perf_counter() - start)
+            NEWSAPI_RESPONSES.labels(endpoint, status).inc()
+    
+    def _views_tag(self, cache_key: str) -> str:
+        return f"views:{cache_key}"
+    
+    def _cache_page(self, cache_key: str, data: Dict[str, Any], expire: int, tags: List[str] = ()):
+        """Cache a NewsAPI page together with its precomputed projected views"""
+        values = {cache_key: data}
+        values.update((view.cache_key(cache_key), view.apply(data)) for view in PRECOMPUTED_VIEWS)
+        redis_client.set_many(values, expire=expire, tags=tags)
+        # Views built on demand from the previous page would keep serving its articles
+        redis_client.invalidate_tags(self._views_tag(cache_key))
     
-    async def fetch_top_headlines(self, category: Optional[str] = None, country: str = "us", page: int = 1, page_size: int = 20) -> Dict[str, Any]:
-        cache_key = f"news:headlines:{category or 'all'}:{country}:{page}:{page_size}"
+    def _cached_view(self, cache_key: str, view: ArticleView, tags: List[str] = ()) -> Optional[Dict[str, Any]]:
+        projected = redis_client.get(view.cache_key(cache_key))
+        if projected:
+            return projected
         cached = redis_client.get(cache_key)
-        if cached:
-            return cached
+        if not cached:
+            return None
+        projected = view.apply(cached)
+        # A view built from a cached page must not outlive it
+        remaining = redis_client.client.ttl(cache_key)
+        if remaining > 0:
+            # Precomputed views are rewritten with the page; the others are dropped when it is
+            view_tags = list(tags) if view in PRECOMPUTED_VIEWS else [*tags, self._views_tag(cache_key)]
+            redis_client.set(view.cache_key(cache_key), projected, expire=remaining, tags=view_tags)
+        return projected
+    
+    def _headlines_key(self, category: Optional[str], country: str, page: int, page_size: int) -> str:
+        return f"news:headlines:{category or 'all'}:{country}:{page}:{page_size}"
+    
+    async def fetch_top_headlines(self, category: Optional[str] = None, country: str = "us", page: int = 1, page_size: int = 20, refresh: bool = False, view: Optional[ArticleView] = None) -> Dict[str, Any]:
+        cache_key = self._headlines_key(category, country, page, page_size)
+        tags = [f"headlines:{category or 'all'}", f"country:{country}"]
+        ttl_policy.record_request(cache_key)
+        if not refresh:
+            cached = self._cached_view(cache_key, view, tags) if view else redis_client.get(cache_key)
+            if cached:
+                return cached
         
         params = {
-            "apiKey": self.api_key,
+            "apiKey": settings.require("NEWS_API_KEY"),
             "country": country,
             "page": page,
             "pageSize": page_size
@@ -26,22 +109,89 @@ class NewsService:
         if category:
             params["category"] = category
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.base_url}/top-headlines", params=params)
-            response.raise_for_status()
-            data = response.json()
+        data = await self._get("top-headlines", params)
         
-        redis_client.set(cache_key, data, expire=600)  # Cache for 10 minutes
-        return data
+        self._cache_page(cache_key, data, ttl_policy.ttl("news:headlines", cache_key), tags)
+        demand_service.record_headlines(category or "general", data.get("articles", []), offset=(page - 1) * page_size)
+        headline_hub.publish_new(category, country, data.get("articles", []))
+        return view.apply(data) if view else data
     
-    async def search_news(self, query: str, page: int = 1, page_size: int = 20, from_date: Optional[str] = None) -> Dict[str, Any]:
-        cache_key = f"news:search:{query}:{page}:{page_size}:{from_date or 'all'}"
-        cached = redis_client.get(cache_key)
+    def _fetch_once(self, cache_key: str, category: str, country: str, page_size: int) -> asyncio.Task:
+        """Upstream fetch of page 1 of a category, shared by concurrent bulk requests"""
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(self.fetch_top_headlines(category, country, 1, page_size, refresh=True))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda done: self._fetch_done(cache_key, done))
+        return task
+    
+    def _fetch_done(self, cache_key: str, task: asyncio.Task):
+        self._inflight.pop(cache_key, None)
+        # Fetches can outlive the request that started them, so their errors are logged here
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Headline fetch for {cache_key} failed: {str(task.exception())}")
+    
+    async def fetch_headlines_bulk(self, categories: Optional[List[str]] = None, country: str = "us", page_size: int = 20, view: Optional[ArticleView] = None) -> Dict[str, Any]:
+        """
+        Page 1 of several categories. Every cached page is read with one MGET and
+        only the misses go upstream, concurrently over the shared client. A category
+        not fetched within BULK_HEADLINES_DEADLINE_SECONDS is listed in `missing`
+        instead of failing the whole response; its fetch keeps running and fills
+        the cache for the next request.
+        """
+        categories = list(dict.fromkeys(categories or HEADLINE_CATEGORIES))
+        unknown = [category for category in categories if category not in HEADLINE_CATEGORIES]
+        if unknown:
+            raise ValueError(f"Unknown categories: {', '.join(unknown)}. Use {', '.join(HEADLINE_CATEGORIES)}")
+        
+        keys = [self._headlines_key(category, country, 1, page_size) for category in categories]
+        # With a view, its cached variant is preferred and the full page is the fallback
+        lookup = [view.cache_key(key) for key in keys] + keys if view else keys
+        values = redis_client.mget(lookup)
+        
+        results: Dict[str, Any] = {}
+        pending: Dict[str, asyncio.Task] = {}
+        for index, (category, key) in enumerate(zip(categories, keys)):
+            ttl_policy.record_request(key)
+            data = values[index]
+            if not data and view and values[len(keys) + index]:
+                data = view.apply(values[len(keys) + index])
+            if data:
+                results[category] = data
+                HEADLINES_BULK_CATEGORIES.labels("cache").inc()
+            else:
+                pending[category] = self._fetch_once(key, category, country, page_size)
+        
+        missing: Dict[str, str] = {}
+        if pending:
+            done, _ = await asyncio.wait(pending.values(), timeout=settings.BULK_HEADLINES_DEADLINE_SECONDS)
+            for category, task in pending.items():
+                if task not in done:
+                    missing[category] = "timeout"
+                elif task.cancelled() or task.exception() is not None:
+                    missing[category] = "error"
+                else:
+                    results[category] = view.apply(task.result()) if view else task.result()
+                    HEADLINES_BULK_CATEGORIES.labels("upstream").inc()
+                    continue
+                HEADLINES_BULK_CATEGORIES.labels(missing[category]).inc()
+        
+        return {
+            "country": country,
+            "categories": {category: results[category] for category in categories if category in results},
+            "missing": missing,
+        }
+    
+    async def search_news(self, query: str, page: int = 1, page_size: int = 20, from_date: Optional[str] = None, view: Optional[ArticleView] = None) -> Dict[str, Any]:
+        # Search keys are unbounded; bumping the namespace version drops them all at once
+        cache_key = redis_client.versioned_key("news:search", f"{query}:{page}:{page_size}:{from_date or 'all'}")
+        ttl_policy.record_request(cache_key)
+        cached = self._cached_view(cache_key, view) if view else redis_client.get(cache_key)
         if cached:
             return cached
         
         params = {
-            "apiKey": self.api_key,
+            "apiKey": settings.require("NEWS_API_KEY"),
             "q": query,
             "page": page,
             "pageSize": page_size,
@@ -50,16 +200,21 @@ class NewsService:
         if from_date:
             params["from"] = from_date
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.base_url}/everything", params=params)
-            response.raise_for_status()
-            data = response.json()
+        data = await self._get("everything", params)
         
-        redis_client.set(cache_key, data, expire=600)
-        return data
+        self._cache_page(cache_key, data, ttl_policy.ttl("news:search", cache_key))
+        return view.apply(data) if view else data
     
     def save_article_to_db(self, db: Session, article_data: Dict[str, Any]) -> NewsArticle:
-        existing = db.query(NewsArticle).filter(NewsArticle.url == article_data["url"]).first()
+        """
+        The stored article for the url, inserted if new. The table is only unique on
+        (url, published_at), so on PostgreSQL inserts of one url are serialized with
+        an advisory lock; a concurrent insert that still wins is looked up again.
+        """
+        url = article_data["url"]
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:url))"), {"url": url})
+        existing = db.query(NewsArticle).filter(NewsArticle.url == url).first()
         if existing:
             return existing
         
@@ -69,15 +224,25 @@ class NewsService:
             author=article_data.get("author"),
             title=article_data["title"],
             description=article_data.get("description"),
-            url=article_data["url"],
+            url=url,
             url_to_image=article_data.get("urlToImage"),
-            published_at=datetime.fromisoformat(article_data["publishedAt"].replace("Z", "+00:00")) if article_data.get("publishedAt") else None,
+            published_at=datetime.fromisoformat(article_data["publishedAt"].replace("Z", "+00:00")) if article_data.get("publishedAt") else datetime.utcnow(),
             content=article_data.get("content"),
             category=article_data.get("category")
         )
         db.add(article)
-        db.commit()
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another request stored the same article between the lookup and the insert
+            db.rollback()
+            existing = db.query(NewsArticle).filter(NewsArticle.url == url).first()
+            if existing:
+                return existing
+            raise
         db.refresh(article)
+        feed_service.on_article_ingested(article)
+        related_index.add(article)
         return article
     
     def save_user_article(self, db: Session, user_id: int, article_id: int) -> SavedArticle:
@@ -92,8 +257,26 @@ class NewsService:
         db.add(saved)
         db.commit()
         db.refresh(saved)
+        feed_service.on_user_saved(db, user_id, saved.article)
+        trending_service.on_saved(saved)
         return saved
     
+    def remove_saved_article(self, db: Session, user_id: int, article_id: int) -> bool:
+        saved = db.query(SavedArticle).filter(
+            SavedArticle.user_id == user_id,
+            SavedArticle.article_id == article_id
+        ).first()
+        if not saved:
+            return False
+        
+        article = saved.article
+        db.delete(saved)
+        db.commit()
+        if article is not None:
+            feed_service.on_user_unsaved(db, user_id, article)
+        trending_service.on_unsaved(saved)
+        return True
+    
     def get_user_saved_articles(self, db: Session, user_id: int, skip: int = 0, limit: int = 20) -> List[SavedArticle]:
         return db.query(SavedArticle).filter(SavedArticle.user_id == user_id).offset(skip).limit(limit).all()
 
@@ -0,0 +1,250 @@
+import fcntl
+import logging
+import os
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from app.config import settings
+from app.models.news import NewsArticle
+from app.utils.text import tokenize
+
+# numpy takes ~100 ms to import, so it is imported where it is used, off the startup path
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Header slots in state.i64
+COUNT, CAPACITY, DIM = 0, 1, 2
+INITIAL_CAPACITY = 1024
+TITLE_WEIGHT = 2
+
+class ArticleIndex:
+    """
+    Hashed TF-IDF vectors of article titles and descriptions, one row per article.
+
+    Everything lives in memory-mapped files under RELATED_INDEX_DIR, so every
+    worker maps the same pages and a restart does not rebuild anything:
+    - state.i64    [count, capacity, dim]
+    - vectors.f32  capacity x dim, L2-normalised rows
+    - ids.i64      article id of each row
+    - df.i64       document frequency per hash bucket
+
+    Appends take an exclusive flock. IDF weights are fixed when a row is written,
+    so early rows drift slightly as the corpus grows; `python -m app.jobs.index_articles
+    --rebuild` recomputes them. Past RELATED_INDEX_MAX_ARTICLES the oldest rows are reused.
+    """
+
+    def __init__(self):
+        self._root: Optional[Path] = None
+        self._state: Optional["np.memmap"] = None
+        self._vectors: Optional["np.memmap"] = None
+        self._ids: Optional["np.memmap"] = None
+        self._df: Optional["np.memmap"] = None
+        self._mapped_capacity = 0
+        self._rows: Dict[int, int] = {}
+        self._seen = 0
+
+    @property
+    def dim(self) -> int:
+        return settings.RELATED_INDEX_DIM
+
+    def _open(self):
+        if self._state is not None:
+            return
+        import numpy as np
+        self._root = Path(settings.RELATED_INDEX_DIR)
+        self._root.mkdir(parents=True, exist_ok=True)
+        with self._locked():
+            state_path = self._root / "state.i64"
+            if not state_path.exists():
+                self._create(state_path)
+            self._state = np.memmap(state_path, dtype=np.int64, mode="r+", shape=(4,))
+            if int(self._state[DIM]) != self.dim:
+                raise ValueError(
+                    f"Related index at {self._root} has dim {int(self._state[DIM])}, "
+                    f"expected {self.dim}; rebuild it with --rebuild"
+                )
+            self._df = np.memmap(self._root / "df.i64", dtype=np.int64, mode="r+", shape=(self.dim,))
+            self._remap()
+
+    def _create(self, state_path: Path):
+        import numpy as np
+        for name, dtype, shape in (
+            ("vectors.f32", np.float32, (INITIAL_CAPACITY, self.dim)),
+            ("ids.i64", np.int64, (INITIAL_CAPACITY,)),
+            ("df.i64", np.int64, (self.dim,)),
+        ):
+            np.memmap(self._root / name, dtype=dtype, mode="w+", shape=shape).flush()
+        state = np.memmap(state_path, dtype=np.int64, mode="w+", shape=(4,))
+        state[:] = (0, INITIAL_CAPACITY, self.dim, 0)
+        state.flush()
+
+    def _remap(self):
+        import numpy as np
+        capacity = int(self._state[CAPACITY])
+        self._vectors = np.memmap(self._root / "vectors.f32", dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self._ids = np.memmap(self._root / "ids.i64", dtype=np.int64, mode="r+", shape=(capacity,))
+        self._mapped_capacity = capacity
+        self._rows.clear()
+        self._seen = 0
+
+    def _sync(self):
+        """Pick up rows appended (or a resize done) by other workers"""
+        self._open()
+        if int(self._state[CAPACITY]) != self._mapped_capacity:
+            self._remap()
+        count = int(self._state[COUNT])
+        if count == self._seen:
+            return
+        if count - self._seen >= self._mapped_capacity:
+            self._rows = {int(article_id): row for row, article_id in enumerate(self._ids[:min(count, self._mapped_capacity)]) if article_id}
+        else:
+            for position in range(self._seen, count):
+                row = position % self._mapped_capacity
+                self._rows[int(self._ids[row])] = row
+        self._seen = count
+
+    def _row_of(self, article_id: int) -> Optional[int]:
+        row = self._rows.get(article_id)
+        if row is not None and int(self._ids[row]) != article_id:
+            # Reused by a newer article since we last looked
+            del self._rows[article_id]
+            return None
+        return row
+
+    @contextmanager
+    def _locked(self):
+        with open(self._root / "index.lock", "a+") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _grow(self):
+        capacity = int(self._state[CAPACITY])
+        new_capacity = min(capacity * 2, settings.RELATED_INDEX_MAX_ARTICLES)
+        if new_capacity <= capacity:
+            return
+        for name, row_bytes in (("vectors.f32", self.dim * 4), ("ids.i64", 8)):
+            with open(self._root / name, "r+b") as f:
+                f.truncate(new_capacity * row_bytes)
+        self._state[CAPACITY] = new_capacity
+        self._remap()
+
+    def _hashed(self, text: str, weight: int = 1) -> Dict[int, float]:
+        counts: Dict[int, float] = {}
+        for token in tokenize(text):
+            h = zlib.crc32(token.encode())
+            bucket = h & (self.dim - 1)
+            # Signed hashing keeps collisions from only ever adding up
+            counts[bucket] = counts.get(bucket, 0.0) + (weight if h & 0x80000000 else -weight)
+        return counts
+
+    def vectorize(self, text: str, title: str = "") -> Optional["np.ndarray"]:
+        """Normalised query vector, weighted by the current document frequencies"""
+        import numpy as np
+        self._sync()
+        counts = self._hashed(text)
+        for bucket, value in self._hashed(title, TITLE_WEIGHT).items():
+            counts[bucket] = counts.get(bucket, 0.0) + value
+        counts = {bucket: value for bucket, value in counts.items() if value}
+        if not counts:
+            return None
+        buckets = np.fromiter(counts, dtype=np.int64)
+        tf = np.fromiter(counts.values(), dtype=np.float32)
+        documents = max(int(self._state[COUNT]), 1)
+        idf = np.log((1 + documents) / (1 + self._df[buckets])) + 1.0
+        vector = np.zeros(self.dim, dtype=np.float32)
+        vector[buckets] = np.sign(tf) * (1 + np.log(np.abs(tf))) * idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def add(self, article: NewsArticle) -> bool:
+        """Index a new article. Returns False if it was already indexed or has no usable text."""
+        try:
+            self._sync()
+            if self._row_of(article.id) is not None:
+                return False
+            with self._locked():
+                self._sync()
+                if self._row_of(article.id) is not None:
+                    return False
+                buckets = list({
+                    *self._hashed(article.title or "", TITLE_WEIGHT),
+                    *self._hashed(article.description or ""),
+                })
+                if not buckets:
+                    return False
+                self._df[buckets] += 1
+                vector = self.vectorize(article.description or "", article.title or "")
+                if vector is None:
+                    return False
+
+                count = int(self._state[COUNT])
+                if count >= self._mapped_capacity:
+                    self._grow()
+                    self._sync()
+                row = count % self._mapped_capacity
+                replaced = int(self._ids[row])
+                self._vectors[row] = vector
+                self._ids[row] = article.id
+                self._state[COUNT] = count + 1
+                self._rows.pop(replaced, None)
+                self._rows[article.id] = row
+                self._seen = count + 1
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to index article {article.id} for related search: {str(e)}")
+            return False
+
+    def search(self, vector: "np.ndarray", limit: int, exclude: Tuple[int, ...] = ()) -> List[Tuple[int, float]]:
+        """(article_id, cosine score) of the closest rows, best first"""
+        import numpy as np
+        self._sync()
+        rows = min(int(self._state[COUNT]), self._mapped_capacity)
+        if not rows:
+            return []
+        scores = self._vectors[:rows] @ vector
+        wanted = min(limit + len(exclude), rows)
+        top = np.argpartition(-scores, wanted - 1)[:wanted]
+        results = []
+        for row in top[np.argsort(-scores[top])]:
+            article_id, score = int(self._ids[row]), float(scores[row])
+            if article_id and article_id not in exclude and score >= settings.RELATED_MIN_SCORE:
+                results.append((article_id, score))
+        return results[:limit]
+
+    def related(self, article: NewsArticle, limit: int = 10) -> List[Tuple[int, float]]:
+        """Articles closest to `article`, indexing it first if needed"""
+        import numpy as np
+        self._sync()
+        if self._row_of(article.id) is None:
+            self.add(article)
+        row = self._row_of(article.id)
+        if row is None:
+            return []
+        return self.search(np.array(self._vectors[row]), limit, exclude=(article.id,))
+
+    def reset(self):
+        """Drop the on-disk index (used by --rebuild; restart workers afterwards)"""
+        self._open()
+        with self._locked():
+            for name in ("vectors.f32", "ids.i64", "df.i64", "state.i64"):
+                try:
+                    os.remove(self._root / name)
+                except FileNotFoundError:
+                    pass
+        self._state = self._vectors = self._ids = self._df = None
+        self._rows.clear()
+        self._seen = 0
+        self._open()
+
+    @property
+    def size(self) -> int:
+        self._sync()
+        return min(int(self._state[COUNT]), self._mapped_capacity)
+
+related_index = ArticleIndex()
@@ -0,0 +1,108 @@
+import logging
+import time
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.news import NewsArticle
+from app.services.related_service import related_index
+from app.utils.redis_client import redis_client
+from app.utils.metrics import CHAT_RETRIEVAL_LATENCY
+from app.utils.text import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Rough size of a token for the context budget (same estimate as the Gemini token metrics)
+CHARS_PER_TOKEN = 4
+ITEM_MAX_CHARS = 400
+# A single hashed word matches too much by accident ("tell me more")
+MIN_QUERY_TERMS = 2
+
+class NewsRetriever:
+    """
+    Finds stored articles relevant to a chat message.
+
+    The lookup is a query against the shared related-articles index plus one
+    MGET for the cached feed payloads and one for the cached summaries; the
+    database is only hit for articles whose payload is not in Redis.
+    """
+
+    def retrieve(self, query: str, limit: int, db: Optional[Session] = None) -> List[Dict[str, Any]]:
+        if len(set(tokenize(query))) < MIN_QUERY_TERMS:
+            return []
+        vector = related_index.vectorize(query)
+        if vector is None:
+            return []
+        # Fetch extra candidates so duplicates of the same story can be dropped
+        matches = [
+            (article_id, score) for article_id, score in related_index.search(vector, limit * 2)
+            if score >= settings.CHAT_CONTEXT_MIN_SCORE
+        ]
+        if not matches:
+            return []
+
+        article_ids = [article_id for article_id, _ in matches]
+        payloads = redis_client.mget([f"feed:article:{article_id}" for article_id in article_ids])
+        summaries = redis_client.mget([f"summary:article:{article_id}" for article_id in article_ids])
+
+        missing = [article_id for article_id, payload in zip(article_ids, payloads) if not payload]
+        loaded: Dict[int, Dict[str, Any]] = {}
+        if missing and db is not None:
+            for article in db.query(NewsArticle).filter(NewsArticle.id.in_(missing)).all():
+                loaded[article.id] = {
+                    "title": article.title,
+                    "description": article.description,
+                    "source_name": article.source_name,
+                    "published_at": article.published_at.isoformat() if article.published_at else None,
+                }
+
+        results = []
+        seen_titles = set()
+        for article_id, payload, summary in zip(article_ids, payloads, summaries):
+            payload = payload or loaded.get(article_id)
+            if not payload or (payload.get("title") or "").lower() in seen_titles:
+                continue
+            seen_titles.add((payload.get("title") or "").lower())
+            if isinstance(summary, dict):
+                summary = summary.get("summary")
+            results.append({
+                "id": article_id,
+                "title": payload.get("title"),
+                "source": payload.get("source_name"),
+                "published_at": payload.get("published_at"),
+                "text": summary or payload.get("description") or "",
+            })
+        return results[:limit]
+
+    def context_block(self, query: str, db: Optional[Session] = None) -> str:
+        """Numbered list of relevant articles, capped at CHAT_CONTEXT_MAX_TOKENS; empty if nothing matches"""
+        if settings.CHAT_CONTEXT_ARTICLES <= 0:
+            return ""
+        start = time.perf_counter()
+        try:
+            articles = self.retrieve(query, settings.CHAT_CONTEXT_ARTICLES, db)
+        except Exception as e:
+            logger.warning(f"Chat retrieval failed: {str(e)}")
+            articles = []
+        finally:
+            CHAT_RETRIEVAL_LATENCY.observe(time.perf_counter() - start)
+        if not articles:
+            return ""
+
+        budget = settings.CHAT_CONTEXT_MAX_TOKENS * CHARS_PER_TOKEN
+        lines = []
+        for number, article in enumerate(articles, 1):
+            date = (article["published_at"] or "")[:10]
+            source = ", ".join(part for part in (article["source"], date) if part)
+            text = " ".join(article["text"].split())
+            if len(text) > ITEM_MAX_CHARS:
+                text = text[:ITEM_MAX_CHARS].rsplit(" ", 1)[0] + "…"
+            line = f"[{number}] {article['title']}" + (f" ({source})" if source else "") + (f": {text}" if text else "")
+            if len(line) > budget:
+                break
+            lines.append(line)
+            budget -= len(line) + 1
+        if not lines:
+            return ""
+        return "Recent articles from ThinkFeed that may be relevant (cite them by number when you use them):\n" + "\n".join(lines)
+
+news_retriever = NewsRetriever()
@@ -0,0 +1,129 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.news import SavedArticle
+from app.services.feed_service import feed_service
+from app.utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+BUCKET_FORMAT = "%Y%m%d%H"
+
+class TrendingService:
+    """
+    Most-saved articles from hourly Redis counters.
+
+    Keys:
+    - trending:saves:{YYYYMMDDHH}         ZSET article_id -> saves made in that (UTC) hour
+    - trending:window:{hours}:{YYYYMMDDHH} ZUNIONSTORE of the last `hours` buckets,
+                                          cached for TRENDING_CACHE_SECONDS
+
+    A save increments the bucket of its `saved_at` hour and removing it decrements
+    the same bucket, so a bucket always equals the rows in saved_articles saved in
+    that hour. Counters are updated after the database commit; increments lost to a
+    Redis failure are repaired by `python -m app.jobs.trending`.
+    """
+
+    def _bucket(self, moment: datetime) -> str:
+        return moment.strftime(BUCKET_FORMAT)
+
+    def _bucket_key(self, moment: datetime) -> str:
+        return f"trending:saves:{self._bucket(moment)}"
+
+    def _bucket_ttl(self, moment: datetime) -> int:
+        """Seconds until the bucket falls out of the longest window"""
+        hour = moment.replace(minute=0, second=0, microsecond=0)
+        expires = hour + timedelta(hours=settings.TRENDING_MAX_HOURS + 1)
+        return int((expires - datetime.utcnow()).total_seconds())
+
+    def _record(self, saved: SavedArticle, delta: int):
+        saved_at = saved.saved_at or datetime.utcnow()
+        ttl = self._bucket_ttl(saved_at)
+        if ttl <= 0:
+            return
+        try:
+            key = self._bucket_key(saved_at)
+            pipe = redis_client.client.pipeline()
+            pipe.zincrby(key, delta, saved.article_id)
+            if delta < 0:
+                pipe.zremrangebyscore(key, "-inf", 0)
+            pipe.expire(key, ttl)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to update trending counters for article {saved.article_id}: {str(e)}")
+
+    def on_saved(self, saved: SavedArticle):
+        self._record(saved, 1)
+
+    def on_unsaved(self, saved: SavedArticle):
+        self._record(saved, -1)
+
+    def _window_key(self, hours: int) -> str:
+        client = redis_client.client
+        now = datetime.utcnow()
+        key = f"trending:window:{hours}:{self._bucket(now)}"
+        if client.exists(key):
+            return key
+        buckets = [self._bucket_key(now - timedelta(hours=offset)) for offset in range(hours)]
+        pipe = client.pipeline()
+        pipe.zunionstore(key, buckets)
+        pipe.expire(key, settings.TRENDING_CACHE_SECONDS)
+        pipe.execute()
+        return key
+
+    def get_trending(self, hours: Optional[int] = None, limit: int = 20, db: Optional[Session] = None) -> List[Dict[str, Any]]:
+        """Articles with the most saves in the last `hours` hours, with their save counts"""
+        hours = hours or settings.TRENDING_DEFAULT_HOURS
+        if not 1 <= hours <= settings.TRENDING_MAX_HOURS:
+            raise ValueError(f"hours must be between 1 and {settings.TRENDING_MAX_HOURS}")
+
+        ranked = redis_client.client.zrevrangebyscore(
+            self._window_key(hours), "+inf", "(0", start=0, num=limit, withscores=True
+        )
+        if not ranked:
+            return []
+        payloads = feed_service.article_payloads([int(article_id) for article_id, _ in ranked], db)
+        return [
+            {**payloads[int(article_id)], "saves": int(saves)}
+            for article_id, saves in ranked
+            if int(article_id) in payloads
+        ]
+
+    def reconcile(self, db: Session, hours: Optional[int] = None) -> Dict[str, int]:
+        """
+        Rewrite the last `hours` buckets from saved_articles. Returns the number of
+        buckets whose counters had drifted.
+        """
+        hours = hours or settings.TRENDING_MAX_HOURS
+        client = redis_client.client
+        current = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        drifted = 0
+        for offset in range(hours):
+            start = current - timedelta(hours=offset)
+            key = self._bucket_key(start)
+            counts = {
+                str(article_id): count
+                for article_id, count in (
+                    db.query(SavedArticle.article_id, func.count(SavedArticle.id))
+                    .filter(SavedArticle.saved_at >= start, SavedArticle.saved_at < start + timedelta(hours=1))
+                    .group_by(SavedArticle.article_id)
+                    .all()
+                )
+            }
+            stored = {article_id: int(score) for article_id, score in client.zrange(key, 0, -1, withscores=True)}
+            if stored == counts:
+                continue
+            drifted += 1
+            logger.info(f"Trending bucket {self._bucket(start)} drifted: {len(stored)} stored vs {len(counts)} articles saved")
+            pipe = client.pipeline()
+            pipe.delete(key)
+            if counts:
+                pipe.zadd(key, counts)
+                pipe.expire(key, max(self._bucket_ttl(start), 1))
+            pipe.execute()
+        return {"buckets": hours, "drifted": drifted}
+
+trending_service = TrendingService()
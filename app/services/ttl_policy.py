@@ -0,0 +1,103 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+from app.config import settings
+from app.services.budget_service import newsapi_budget
+from app.utils.metrics import CACHE_EFFECTIVE_TTL
+
+# Base TTL setting per cache namespace
+NAMESPACE_TTLS = {
+    "news:headlines": "HEADLINES_CACHE_SECONDS",
+    "news:search": "SEARCH_CACHE_SECONDS",
+}
+POPULARITY_WINDOW = 300.0
+MAX_TRACKED_KEYS = 10_000
+RARE_KEY_FACTOR = 2.0
+MIN_HOT_FACTOR = 0.25
+
+class TTLPolicy:
+    """
+    TTLs for upstream-backed cache entries:
+
+        ttl = base(namespace) * budget pressure * popularity factor
+
+    clamped to [CACHE_TTL_MIN_SECONDS, CACHE_TTL_MAX_SECONDS]. Budget pressure
+    (see UpstreamBudget) stretches every TTL when the NewsAPI quota is running
+    out faster than the day. Keys requested at least CACHE_HOT_KEY_RPM times a
+    minute get proportionally shorter TTLs so busy pages stay fresh, and keys
+    seen only once get RARE_KEY_FACTOR longer ones. Popularity is counted per
+    worker over a sliding POPULARITY_WINDOW, which needs no Redis round trip.
+    """
+
+    def __init__(self):
+        # key -> (window start, requests in current window, requests in previous window)
+        self._requests: "OrderedDict[str, Tuple[float, int, int]]" = OrderedDict()
+        self._last_ttl: Dict[str, int] = {}
+
+    def record_request(self, key: str):
+        now = time.monotonic()
+        started, current, previous = self._requests.pop(key, (now, 0, 0))
+        elapsed = now - started
+        if elapsed >= 2 * POPULARITY_WINDOW:
+            started, current, previous = now, 0, 0
+        elif elapsed >= POPULARITY_WINDOW:
+            started, current, previous = started + POPULARITY_WINDOW, 0, current
+        self._requests[key] = (started, current + 1, previous)
+        if len(self._requests) > MAX_TRACKED_KEYS:
+            self._requests.popitem(last=False)
+
+    def requests_per_minute(self, key: str) -> float:
+        entry = self._requests.get(key)
+        if entry is None:
+            return 0.0
+        started, current, previous = entry
+        elapsed = time.monotonic() - started
+        if elapsed >= 2 * POPULARITY_WINDOW:
+            return 0.0
+        if elapsed >= POPULARITY_WINDOW:
+            started, current, previous = started + POPULARITY_WINDOW, 0, current
+            elapsed -= POPULARITY_WINDOW
+        # Sliding window: the previous window counts for the part still covered
+        weighted = current + previous * (1 - elapsed / POPULARITY_WINDOW)
+        return weighted * 60 / POPULARITY_WINDOW
+
+    def popularity_factor(self, key: str) -> float:
+        rpm = self.requests_per_minute(key)
+        if rpm * POPULARITY_WINDOW / 60 <= 1:
+            return RARE_KEY_FACTOR
+        if rpm >= settings.CACHE_HOT_KEY_RPM:
+            return max(settings.CACHE_HOT_KEY_RPM / rpm, MIN_HOT_FACTOR)
+        return 1.0
+
+    def base_ttl(self, namespace: str) -> int:
+        return getattr(settings, NAMESPACE_TTLS[namespace])
+
+    def _clamp(self, ttl: float) -> int:
+        return int(min(max(ttl, settings.CACHE_TTL_MIN_SECONDS), settings.CACHE_TTL_MAX_SECONDS))
+
+    def ttl(self, namespace: str, key: str) -> int:
+        ttl = self._clamp(self.base_ttl(namespace) * newsapi_budget.pressure() * self.popularity_factor(key))
+        self._last_ttl[namespace] = ttl
+        CACHE_EFFECTIVE_TTL.labels(namespace).set(ttl)
+        return ttl
+
+    def describe(self) -> Dict[str, Any]:
+        """Effective TTLs per namespace for the admin endpoint"""
+        pressure = newsapi_budget.pressure()
+        hot = sum(1 for key in self._requests if self.requests_per_minute(key) >= settings.CACHE_HOT_KEY_RPM)
+        return {
+            "budget_pressure": pressure,
+            "tracked_keys": len(self._requests),
+            "hot_keys": hot,
+            "namespaces": {
+                namespace: {
+                    "base": self.base_ttl(namespace),
+                    "effective": self._clamp(self.base_ttl(namespace) * pressure),
+                    "effective_rare": self._clamp(self.base_ttl(namespace) * pressure * RARE_KEY_FACTOR),
+                    "last_set": self._last_ttl.get(namespace),
+                }
+                for namespace in NAMESPACE_TTLS
+            },
+        }
+
+ttl_policy = TTLPolicy()
@@ -0,0 +1,106 @@
+"""
+Binary encoding for cached values.
+
+Encoded values start with a 4-byte header: MAGIC (2 bytes), format version, and
+a flags byte (low nibble serializer, high nibble compression). 0xC1 never starts
+valid UTF-8 or msgpack, so values written before the codec existed (plain JSON
+or text) are recognised by the missing header and still decode.
+
+msgpack and zstandard are optional; without them values fall back to JSON and zlib.
+"""
+import json
+import logging
+import time
+import zlib
+from typing import Any
+from app.config import settings
+from app.utils.metrics import CACHE_CODEC_BYTES, CACHE_CODEC_SECONDS, cache_namespace
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"\xc1\xfe"
+FORMAT_VERSION = 1
+
+SERIALIZER_JSON = 1
+SERIALIZER_MSGPACK = 2
+SERIALIZER_TEXT = 3
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+
+def _serialize(value: Any):
+    if isinstance(value, str):
+        return SERIALIZER_TEXT, value.encode("utf-8")
+    if settings.CACHE_CODEC == "msgpack" and msgpack is not None:
+        return SERIALIZER_MSGPACK, msgpack.packb(value, use_bin_type=True)
+    return SERIALIZER_JSON, json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+def _compress(payload: bytes):
+    if len(payload) < settings.CACHE_COMPRESSION_THRESHOLD:
+        return COMPRESSION_NONE, payload
+    if settings.CACHE_COMPRESSION == "zstd" and zstandard is not None:
+        compressed, method = zstandard.compress(payload, settings.CACHE_COMPRESSION_LEVEL), COMPRESSION_ZSTD
+    else:
+        compressed, method = zlib.compress(payload, min(settings.CACHE_COMPRESSION_LEVEL, 9)), COMPRESSION_ZLIB
+    if len(compressed) >= len(payload):
+        return COMPRESSION_NONE, payload
+    return method, compressed
+
+def _legacy(data: bytes) -> Any:
+    text = data.decode("utf-8")
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+def encode(key: str, value: Any) -> bytes:
+    start = time.perf_counter()
+    serializer, payload = _serialize(value)
+    compression, body = _compress(payload)
+    data = MAGIC + bytes((FORMAT_VERSION, serializer | compression << 4)) + body
+
+    namespace = cache_namespace(key)
+    CACHE_CODEC_SECONDS.labels(namespace, "encode").observe(time.perf_counter() - start)
+    CACHE_CODEC_BYTES.labels(namespace, "raw").inc(len(payload))
+    CACHE_CODEC_BYTES.labels(namespace, "stored").inc(len(data))
+    return data
+
+def decode(key: str, data: bytes) -> Any:
+    if not data.startswith(MAGIC):
+        return _legacy(data)
+
+    start = time.perf_counter()
+    version, flags = data[2], data[3]
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Unsupported cache format version {version}")
+    serializer, compression = flags & 0x0F, flags >> 4
+
+    body = data[4:]
+    if compression == COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise ValueError("Cached value is zstd-compressed but zstandard is not installed")
+        body = zstandard.decompress(body)
+    elif compression == COMPRESSION_ZLIB:
+        body = zlib.decompress(body)
+
+    if serializer == SERIALIZER_MSGPACK:
+        if msgpack is None:
+            raise ValueError("Cached value is msgpack-encoded but msgpack is not installed")
+        value = msgpack.unpackb(body, raw=False)
+    else:
+        # Text keeps the pre-codec behaviour of `RedisClient.get`: JSON if it parses
+        value = _legacy(body)
+
+    CACHE_CODEC_SECONDS.labels(cache_namespace(key), "decode").observe(time.perf_counter() - start)
+    return value
@@ -0,0 +1,121 @@
+"""
+Event-loop lag watchdog.
+
+A heartbeat task wakes every LOOP_WATCHDOG_INTERVAL_MS and records how late it
+woke up (`event_loop_lag_seconds`). A monitor thread checks the heartbeat; when the
+loop has not run it for LOOP_WATCHDOG_THRESHOLD_MS it captures the loop thread's
+stack while it is still blocked, which shows the blocking call itself (sync Redis,
+SQLAlchemy, Gemini, bcrypt, ...), logs it and counts it in `event_loop_blocks_total`
+labelled with the innermost frame from the app package.
+
+The benchmark runner's `--strict-loop` uses `raise_if_blocked()` to fail on any
+block above the threshold.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Deque, List, Optional
+from app.config import settings
+from app.utils.metrics import EVENT_LOOP_BLOCKS, EVENT_LOOP_LAG
+
+logger = logging.getLogger(__name__)
+
+STACK_DEPTH = 40
+MAX_REPORTS = 100
+APP_ROOT = str(Path(__file__).resolve().parents[1])
+
+class LoopBlockedError(RuntimeError):
+    pass
+
+@dataclass
+class BlockReport:
+    site: str
+    blocked_ms: float  # how long the loop had been stuck when the stack was taken
+    stack: str
+
+class LoopWatchdog:
+    def __init__(self):
+        self.reports: Deque[BlockReport] = deque(maxlen=MAX_REPORTS)
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._reported_beat = 0.0
+
+    @property
+    def interval(self) -> float:
+        return settings.LOOP_WATCHDOG_INTERVAL_MS / 1000
+
+    @property
+    def threshold(self) -> float:
+        return settings.LOOP_WATCHDOG_THRESHOLD_MS / 1000
+
+    def start(self):
+        """Start watching the running event loop (call from the loop, e.g. the lifespan)"""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"Event-loop watchdog started (threshold {settings.LOOP_WATCHDOG_THRESHOLD_MS} ms)")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stop.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._thread.join(timeout=1)
+        self._task = self._thread = None
+
+    async def _heartbeat(self):
+        interval = self.interval
+        while True:
+            beat = time.monotonic()
+            self._last_beat = beat
+            await asyncio.sleep(interval)
+            EVENT_LOOP_LAG.observe(max(time.monotonic() - beat - interval, 0.0))
+
+    def _monitor(self):
+        while not self._stop.wait(self.interval / 2):
+            beat = self._last_beat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.threshold or beat == self._reported_beat:
+                continue
+            # One report per stall, taken while the loop thread is still inside it
+            self._reported_beat = beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._report(frame, blocked)
+
+    def _report(self, frame, blocked: float):
+        summary = traceback.extract_stack(frame, limit=STACK_DEPTH)
+        site = next(
+            (f"{Path(entry.filename).name}:{entry.name}" for entry in reversed(summary) if entry.filename.startswith(APP_ROOT)),
+            "unknown"
+        )
+        report = BlockReport(site=site, blocked_ms=round(blocked * 1000, 1), stack="".join(summary.format()))
+        self.reports.append(report)
+        EVENT_LOOP_BLOCKS.labels(site).inc()
+        logger.warning(f"Event loop blocked for {report.blocked_ms}+ ms in {site}:\n{report.stack}")
+
+    def raise_if_blocked(self):
+        """Strict mode: raise if any block above the threshold was seen since the last call"""
+        reports: List[BlockReport] = list(self.reports)
+        self.reports.clear()
+        if reports:
+            sites = ", ".join(sorted({report.site for report in reports}))
+            raise LoopBlockedError(f"Event loop blocked {len(reports)} time(s) in: {sites}")
+
+loop_watchdog = LoopWatchdog()
@@ -0,0 +1,209 @@
+import time
+from typing import Any, Optional
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+from app.utils import tracing
+
+# HTTP
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUESTS_TOTAL = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+)
+
+# Redis cache
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Redis cache lookups by key namespace and result",
+    ["namespace", "result"],
+)
+CACHE_CODEC_SECONDS = Histogram(
+    "cache_codec_duration_seconds",
+    "Time to encode/decode cached values by key namespace",
+    ["namespace", "operation"],
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05),
+)
+CACHE_CODEC_BYTES = Counter(
+    "cache_codec_bytes_total",
+    "Cached value bytes before ('raw') and after ('stored') compression; raw/stored is the compression ratio",
+    ["namespace", "stage"],
+)
+
+CACHE_EFFECTIVE_TTL = Gauge(
+    "cache_effective_ttl_seconds",
+    "TTL most recently chosen by the adaptive TTL policy, by namespace",
+    ["namespace"],
+)
+
+# Headline WebSocket
+WS_CONNECTIONS = Gauge(
+    "ws_headline_connections",
+    "Open /ws/headlines connections on this worker",
+)
+WS_MESSAGES = Counter(
+    "ws_headline_messages_total",
+    "Headline updates by outcome ('dropped' when a connection queue is full)",
+    ["outcome"],
+)
+
+# NewsAPI
+NEWSAPI_LATENCY = Histogram(
+    "newsapi_request_duration_seconds",
+    "NewsAPI request latency",
+    ["endpoint"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10),
+)
+HEADLINES_BULK_CATEGORIES = Counter(
+    "headlines_bulk_categories_total",
+    "Categories requested from /news/headlines/bulk by source (cache, upstream, timeout or error)",
+    ["source"],
+)
+NEWSAPI_RESPONSES = Counter(
+    "newsapi_responses_total",
+    "NewsAPI responses by status code ('error' for transport failures)",
+    ["endpoint", "status"],
+)
+
+# Gemini
+GEMINI_LATENCY = Histogram(
+    "gemini_request_duration_seconds",
+    "Gemini call latency by feature",
+    ["feature", "outcome"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+GEMINI_TOKENS = Counter(
+    "gemini_tokens_total",
+    "Gemini tokens by feature and kind (usage metadata when reported, otherwise ~4 chars/token)",
+    ["feature", "kind"],
+)
+
+GEMINI_CALLS_SAVED = Counter(
+    "gemini_calls_saved_total",
+    "Gemini calls answered from a cache instead, by feature",
+    ["feature"],
+)
+CHAT_ANSWER_CACHE = Counter(
+    "chat_answer_cache_requests_total",
+    "First-turn chat answer cache lookups by result (exact, similar, miss or uncacheable)",
+    ["result"],
+)
+
+CHAT_RETRIEVAL_LATENCY = Histogram(
+    "chat_retrieval_duration_seconds",
+    "Time to build the article context block for a chat turn",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+SUMMARIES_GENERATED = Counter(
+    "summaries_generated_total",
+    "New article summaries by method (extractive or gemini)",
+    ["method"],
+)
+
+PROFILES_CAPTURED = Counter(
+    "request_profiles_total",
+    "Requests profiled by the profiling middleware, by trigger (header or sampled)",
+    ["trigger"],
+)
+
+# Event loop
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the watchdog heartbeat woke up",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+EVENT_LOOP_BLOCKS = Counter(
+    "event_loop_blocks_total",
+    "Event loop stalls above LOOP_WATCHDOG_THRESHOLD_MS by innermost app frame",
+    ["site"],
+)
+
+# Background jobs
+PRESUMMARIZE_RESULTS = Counter(
+    "presummarize_articles_total",
+    "Articles handled by the pre-summarization job by outcome",
+    ["outcome"],
+)
+
+
+def cache_namespace(key: str) -> str:
+    """Return the first two segments of a cache key, e.g. ``news:headlines``."""
+    return ":".join(key.split(":", 2)[:2])
+
+
+def record_cache_lookup(key: str, hit: bool):
+    CACHE_REQUESTS.labels(cache_namespace(key), "hit" if hit else "miss").inc()
+
+
+def _estimate_tokens(text: Optional[str]) -> int:
+    return max(1, len(text) // 4) if text else 0
+
+
+def record_gemini_call(feature: str, started: float, prompt: str, response: Any = None, outcome: str = "ok"):
+    """Record latency and token usage for a Gemini call started at ``started`` (perf_counter)."""
+    GEMINI_LATENCY.labels(feature, outcome).observe(time.perf_counter() - started)
+    if response is None:
+        tracing.record_span(f"gemini.{feature}", started, {"gemini.feature": feature, "gemini.prompt_chars": len(prompt or "")}, error=outcome != "ok")
+        return
+
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        prompt_tokens = getattr(usage, "prompt_token_count", 0)
+        completion_tokens = getattr(usage, "candidates_token_count", 0)
+    else:
+        prompt_tokens = _estimate_tokens(prompt)
+        try:
+            completion_tokens = _estimate_tokens(response.text)
+        except Exception:
+            completion_tokens = 0
+
+    GEMINI_TOKENS.labels(feature, "prompt").inc(prompt_tokens)
+    GEMINI_TOKENS.labels(feature, "completion").inc(completion_tokens)
+    tracing.record_span(f"gemini.{feature}", started, {
+        "gemini.feature": feature,
+        "gemini.prompt_chars": len(prompt or ""),
+        "gemini.prompt_tokens": prompt_tokens,
+        "gemini.completion_tokens": completion_tokens,
+    }, error=outcome != "ok")
+
+
+class SQLAlchemyPoolCollector:
+    """Reads pool state from the engine at scrape time instead of on every checkout."""
+
+    def collect(self):
+        from app.database import peek_engine
+
+        engine = peek_engine()
+        if engine is None:
+            return
+        pool = engine.pool
+        checked_out = GaugeMetricFamily(
+            "db_pool_checked_out_connections", "Connections currently checked out of the pool"
+        )
+        overflow = GaugeMetricFamily(
+            "db_pool_overflow_connections", "Connections open beyond the configured pool size"
+        )
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size")
+
+        if hasattr(pool, "checkedout"):
+            checked_out.add_metric([], pool.checkedout())
+        if hasattr(pool, "overflow"):
+            overflow.add_metric([], max(pool.overflow(), 0))
+        if hasattr(pool, "size"):
+            size.add_metric([], pool.size())
+
+        yield checked_out
+        yield overflow
+        yield size
+
+
+REGISTRY.register(SQLAlchemyPoolCollector())
@@ -0,0 +1,59 @@
+"""
+Field projection for NewsAPI article lists.
+
+`ArticleView` describes what a client wants from a headline or search page: a
+subset of the article fields, optionally in the compact columnar layout
+
+    {"status": ..., "totalResults": ..., "fields": ["title", "url", ...],
+     "articles": [["Some title", "https://...", ...], ...]}
+
+where `source` is flattened to the source name. Each view has its own cache key
+suffix so projected pages can be cached next to the full slab.
+"""
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+ARTICLE_FIELDS = ("source", "author", "title", "description", "url", "urlToImage", "publishedAt", "content")
+# What the list views render
+COMPACT_FIELDS = ("title", "url", "source", "urlToImage", "publishedAt")
+
+@dataclass(frozen=True)
+class ArticleView:
+    fields: Tuple[str, ...]
+    columnar: bool = False
+
+    @classmethod
+    def parse(cls, fields: Optional[str], compact: bool = False) -> Optional["ArticleView"]:
+        """View for the `fields` / `compact` query parameters; None for the full articles"""
+        if not fields:
+            return cls(COMPACT_FIELDS, columnar=True) if compact else None
+        requested = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in requested if name not in ARTICLE_FIELDS]
+        if unknown or not requested:
+            raise ValueError(f"Unknown article fields: {', '.join(unknown) or fields}. Use {', '.join(ARTICLE_FIELDS)}")
+        return cls(requested, columnar=compact)
+
+    def cache_key(self, base_key: str) -> str:
+        digest = hashlib.sha1(",".join(self.fields).encode()).hexdigest()[:12]
+        return f"{base_key}:view:{'c' if self.columnar else 'o'}{digest}"
+
+    def apply(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        articles = data.get("articles") or []
+        projected = {key: value for key, value in data.items() if key != "articles"}
+        if self.columnar:
+            projected["fields"] = list(self.fields)
+            projected["articles"] = [[self._compact(article, name) for name in self.fields] for article in articles]
+        else:
+            projected["articles"] = [{name: article.get(name) for name in self.fields} for article in articles]
+        return projected
+
+    @staticmethod
+    def _compact(article: Dict[str, Any], name: str) -> Any:
+        value = article.get(name)
+        if name == "source" and isinstance(value, dict):
+            return value.get("name")
+        return value
+
+# Computed and cached whenever a page is fetched from NewsAPI
+PRECOMPUTED_VIEWS = (ArticleView(COMPACT_FIELDS, columnar=True),)
@@ -1,25 +1,116 @@
 import redis
 import json
-from typing import Optional, Any
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Any, Tuple
 from app.config import settings
+from app.utils.metrics import cache_namespace, record_cache_lookup
+from app.utils import codec, tracing
+
+logger = logging.getLogger(__name__)
+
+# Batch size for SCAN/SSCAN and UNLINK during invalidation
+SCAN_BATCH = 500
+# How long a worker trusts its copy of a namespace version
+NAMESPACE_VERSION_TTL = 1.0
 
 class RedisClient:
     def __init__(self):
-        self.client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        self._client: Optional[redis.Redis] = None
+        self._raw: Optional[redis.Redis] = None
+        self._namespace_versions: Dict[str, Tuple[int, float]] = {}
+    
+    @property
+    def client(self) -> redis.Redis:
+        # Connection pool is created on first use, not at import
+        if self._client is None:
+            self._client = tracing.redis_class().from_url(settings.REDIS_URL, decode_responses=True)
+        return self._client
+    
+    @client.setter
+    def client(self, value: redis.Redis):
+        self._client = value
+        self._raw = None
+    
+    @property
+    def raw(self) -> redis.Redis:
+        """Bytes client for encoded cache values, with the same connection settings as `client`"""
+        if self._raw is None:
+            pool = self.client.connection_pool
+            kwargs = {**pool.connection_kwargs, "decode_responses": False}
+            self._raw = type(self.client)(connection_pool=type(pool)(connection_class=pool.connection_class, **kwargs))
+        return self._raw
+    
+    def close(self):
+        # Drops pooled connections; the pools reconnect if used again
+        if self._client is not None:
+            self._client.close()
+        if self._raw is not None:
+            self._raw.close()
     
     def get(self, key: str) -> Optional[Any]:
-        value = self.client.get(key)
-        if value:
-            try:
-                return json.loads(value)
-            except json.JSONDecodeError:
-                return value
-        return None
-    
-    def set(self, key: str, value: Any, expire: int = 3600):
-        if isinstance(value, (dict, list)):
-            value = json.dumps(value)
-        self.client.setex(key, expire, value)
+        with tracing.span("cache.get", {"cache.namespace": cache_namespace(key)}) as current:
+            value = self.raw.get(key)
+            record_cache_lookup(key, bool(value))
+            tracing.set_attributes(current, **{"cache.hit": bool(value), "cache.bytes": len(value) if value else 0})
+            if value:
+                try:
+                    return codec.decode(key, value)
+                except Exception as e:
+                    logger.warning(f"Dropping undecodable cache entry {key}: {str(e)}")
+            return None
+    
+    def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Decoded values for many keys in one round trip (None for misses)"""
+        if not keys:
+            return []
+        with tracing.span("cache.mget", {"cache.namespace": cache_namespace(keys[0]), "cache.keys": len(keys)}) as current:
+            raw_values = self.raw.mget(keys)
+            values = []
+            for key, value in zip(keys, raw_values):
+                record_cache_lookup(key, bool(value))
+                try:
+                    values.append(codec.decode(key, value) if value else None)
+                except Exception as e:
+                    logger.warning(f"Dropping undecodable cache entry {key}: {str(e)}")
+                    values.append(None)
+            tracing.set_attributes(
+                current,
+                **{"cache.hits": sum(1 for value in raw_values if value), "cache.bytes": sum(len(value) for value in raw_values if value)}
+            )
+            return values
+    
+    def _encode(self, key: str, value: Any) -> Any:
+        if settings.CACHE_CODEC == "off":
+            return json.dumps(value) if isinstance(value, (dict, list)) else value
+        return codec.encode(key, value)
+    
+    def set(self, key: str, value: Any, expire: int = 3600, tags: Iterable[str] = ()):
+        """Store a value; `tags` register the key so `invalidate_tags` can drop it later"""
+        self.set_many({key: value}, expire=expire, tags=tags)
+    
+    def set_many(self, values: Dict[str, Any], expire: int = 3600, tags: Iterable[str] = ()):
+        """Store several values with the same TTL and tags in one round trip"""
+        if not values:
+            return
+        first = next(iter(values))
+        with tracing.span("cache.set", {"cache.namespace": cache_namespace(first), "cache.ttl": expire, "cache.keys": len(values)}) as current:
+            encoded = {key: self._encode(key, value) for key, value in values.items()}
+            tracing.set_attributes(current, **{"cache.bytes": sum(len(value) for value in encoded.values() if isinstance(value, (bytes, str)))})
+            tags = list(tags)
+            if not tags and len(encoded) == 1:
+                self.raw.setex(first, expire, encoded[first])
+                return
+            pipe = self.raw.pipeline(transaction=False)
+            for key, value in encoded.items():
+                pipe.setex(key, expire, value)
+            for tag in tags:
+                tag_key = f"tag:{tag}"
+                pipe.sadd(tag_key, *encoded)
+                # A tag set lives as long as its longest-lived member
+                pipe.expire(tag_key, expire, nx=True)
+                pipe.expire(tag_key, expire, gt=True)
+            pipe.execute()
     
     def delete(self, key: str):
         self.client.delete(key)
@@ -27,9 +118,54 @@ class RedisClient:
     def exists(self, key: str) -> bool:
         return self.client.exists(key) > 0
     
-    def clear_pattern(self, pattern: str):
-        keys = self.client.keys(pattern)
-        if keys:
-            self.client.delete(*keys)
+    def invalidate_tags(self, *tags: str) -> int:
+        """Unlink every key registered under the tags. O(tagged keys), never blocks Redis."""
+        removed = 0
+        for tag in tags:
+            tag_key = f"tag:{tag}"
+            batch = []
+            for key in self.client.sscan_iter(tag_key, count=SCAN_BATCH):
+                batch.append(key)
+                if len(batch) >= SCAN_BATCH:
+                    removed += self.client.unlink(*batch)
+                    batch = []
+            if batch:
+                removed += self.client.unlink(*batch)
+            self.client.unlink(tag_key)
+        return removed
+    
+    def namespace_version(self, namespace: str) -> int:
+        cached = self._namespace_versions.get(namespace)
+        if cached and time.monotonic() - cached[1] < NAMESPACE_VERSION_TTL:
+            return cached[0]
+        version = int(self.client.get(f"ns:{namespace}:version") or 0)
+        self._namespace_versions[namespace] = (version, time.monotonic())
+        return version
+    
+    def versioned_key(self, namespace: str, suffix: str) -> str:
+        return f"{namespace}:v{self.namespace_version(namespace)}:{suffix}"
+    
+    def bump_namespace(self, namespace: str) -> int:
+        """
+        Invalidate everything under a versioned namespace in O(1). Old entries are
+        no longer addressed and expire on their own TTL; other workers notice the
+        new version within NAMESPACE_VERSION_TTL.
+        """
+        version = self.client.incr(f"ns:{namespace}:version")
+        self._namespace_versions[namespace] = (version, time.monotonic())
+        return version
+    
+    def clear_pattern(self, pattern: str) -> int:
+        """Bulk cleanup by pattern with incremental SCAN + UNLINK instead of KEYS"""
+        removed = 0
+        batch = []
+        for key in self.client.scan_iter(match=pattern, count=SCAN_BATCH):
+            batch.append(key)
+            if len(batch) >= SCAN_BATCH:
+                removed += self.client.unlink(*batch)
+                batch = []
+        if batch:
+            removed += self.client.unlink(*batch)
+        return removed
 
 redis_client = RedisClient()
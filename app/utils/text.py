@@ -0,0 +1,28 @@
+import re
+from typing import List
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])[\"'”’)\]]*\s+(?=[\"'“‘(\[]?[A-Z0-9])")
+WORD = re.compile(r"[a-z0-9][a-z0-9'’-]*")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most my
+myself no nor not now of off on once only or other our ours ourselves out over own said same she should
+so some such than that the their theirs them themselves then there these they this those through to too
+under until up very was we were what when where which while who whom why will with would you your yours
+yourself yourselves says say new one two its it's
+""".split())
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences of a plain-text article; paragraph breaks always end a sentence"""
+    sentences = []
+    for paragraph in re.split(r"\n\s*\n|\n", text or ""):
+        paragraph = " ".join(paragraph.split())
+        if paragraph:
+            sentences.extend(part.strip() for part in SENTENCE_BOUNDARY.split(paragraph) if part.strip())
+    return sentences
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased content words without stopwords"""
+    return [word for word in WORD.findall((text or "").lower()) if len(word) > 1 and word not in STOPWORDS]
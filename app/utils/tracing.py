@@ -0,0 +1,260 @@
+"""
+Distributed tracing with OpenTelemetry (an optional dependency).
+
+With TRACING_ENABLED the app lifespan calls `configure_tracing()`, which installs a
+tracer provider with parent-based head sampling (TRACING_SAMPLE_RATE of new traces,
+and whatever the caller decided for requests carrying a W3C `traceparent`), and
+exports spans over OTLP/HTTP or to a JSON-lines file. Spans come from:
+
+- TracingMiddleware      one server span per HTTP request, continuing the caller's trace
+- TracedRedis            every Redis command and pipeline
+- RedisClient            cache get/mget/set with namespace, hit/miss and payload bytes
+- SQLAlchemy events      every statement on every engine (primary and replicas)
+- async_http_client()    outgoing httpx requests, with `traceparent` injected
+- record_gemini_call()   every Gemini call, with token counts
+
+Everything here is a no-op until tracing is configured, so call sites do not
+need to check whether it is enabled.
+"""
+import importlib.util
+import logging
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, Optional
+import httpx
+import redis
+import redis.client
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_STATEMENT_LENGTH = 1000
+
+_tracer = None
+_provider = None
+_exporter_file = None
+# Bound by configure_tracing(); opentelemetry is only imported when tracing is on
+propagate = SpanKind = Status = StatusCode = None
+
+def _sdk_installed() -> bool:
+    return importlib.util.find_spec("opentelemetry") is not None and importlib.util.find_spec("opentelemetry.sdk") is not None
+
+def configure_tracing() -> bool:
+    """Install the tracer provider. Returns False when tracing stays off."""
+    global _tracer, _provider, _exporter_file, propagate, SpanKind, Status, StatusCode
+    if _tracer is not None:
+        return True
+    try:
+        from opentelemetry import propagate
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+        from opentelemetry.trace import SpanKind, Status, StatusCode
+    except ImportError:
+        logger.warning("TRACING_ENABLED is set but opentelemetry-sdk is not installed; tracing is off")
+        return False
+
+    if settings.TRACING_EXPORTER == "file":
+        _exporter_file = open(settings.TRACING_FILE, "a")
+        exporter = ConsoleSpanExporter(
+            out=_exporter_file, formatter=lambda span: span.to_json(indent=None) + "\n"
+        )
+    elif settings.TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+    else:
+        raise ValueError(f"Unknown TRACING_EXPORTER '{settings.TRACING_EXPORTER}'. Use otlp or file")
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATE)),
+    )
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    _tracer = _provider.get_tracer("app")
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    logger.info(
+        f"Tracing enabled: {settings.TRACING_EXPORTER} exporter, sample rate {settings.TRACING_SAMPLE_RATE}"
+    )
+    return True
+
+def shutdown_tracing():
+    """Flush pending spans and turn the hooks back into no-ops"""
+    global _tracer, _provider, _exporter_file
+    if _provider is None:
+        return
+    event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.remove(Engine, "handle_error", _handle_error)
+    _provider.shutdown()
+    if _exporter_file is not None:
+        _exporter_file.close()
+    _tracer = _provider = _exporter_file = None
+
+def span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """Context manager yielding the active span, or None when tracing is off"""
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+def set_attributes(current, **attributes):
+    """Set attributes on a span from `span()`; skips the work when it is not recording"""
+    if current is not None and current.is_recording():
+        current.set_attributes({key: value for key, value in attributes.items() if value is not None})
+
+def record_span(name: str, started: float, attributes: Dict[str, Any], error: bool = False):
+    """Record an already finished operation that started at `started` (perf_counter)"""
+    if _tracer is None:
+        return
+    elapsed_ns = int((time.perf_counter() - started) * 1e9)
+    end = time.time_ns()
+    current = _tracer.start_span(name, start_time=end - elapsed_ns, attributes=attributes)
+    if error:
+        current.set_status(Status(StatusCode.ERROR))
+    current.end(end_time=end)
+
+# SQLAlchemy
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _tracer is None:
+        return
+    operation = statement.split(None, 1)[0].upper() if statement else "SQL"
+    context._tracing_span = _tracer.start_span(
+        f"db.{operation}",
+        kind=SpanKind.CLIENT,
+        attributes={
+            "db.system": conn.engine.dialect.name,
+            "db.name": conn.engine.url.database or "",
+            "net.peer.name": conn.engine.url.host or "",
+            "db.statement": statement[:MAX_STATEMENT_LENGTH],
+        },
+    )
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    current = getattr(context, "_tracing_span", None)
+    if current is not None:
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            current.set_attribute("db.rows", cursor.rowcount)
+        current.end()
+        context._tracing_span = None
+
+def _handle_error(exception_context):
+    context = exception_context.execution_context
+    current = getattr(context, "_tracing_span", None) if context is not None else None
+    if current is not None:
+        current.record_exception(exception_context.original_exception)
+        current.set_status(Status(StatusCode.ERROR))
+        current.end()
+        context._tracing_span = None
+
+# Redis
+
+class TracedPipeline(redis.client.Pipeline):
+    def execute(self, raise_on_error=True):
+        if _tracer is None:
+            return super().execute(raise_on_error)
+        commands = [args[0] for args, _ in self.command_stack]
+        with _tracer.start_as_current_span("redis.pipeline", kind=SpanKind.CLIENT, attributes={
+            "db.system": "redis",
+            "db.operation": "PIPELINE",
+            "db.redis.commands": len(commands),
+            "db.statement": " ".join(str(command) for command in commands[:20]),
+        }):
+            return super().execute(raise_on_error)
+
+class TracedRedis(redis.Redis):
+    """redis.Redis with a client span around every command and pipeline"""
+
+    def execute_command(self, *args, **options):
+        if _tracer is None:
+            return super().execute_command(*args, **options)
+        with _tracer.start_as_current_span(f"redis.{args[0]}", kind=SpanKind.CLIENT, attributes={
+            "db.system": "redis",
+            "db.operation": str(args[0]),
+            "db.redis.key_count": max(len(args) - 1, 0),
+        }):
+            return super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return TracedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+def redis_class() -> type:
+    return TracedRedis if settings.TRACING_ENABLED and _sdk_installed() else redis.Redis
+
+# httpx
+
+class TracedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if _tracer is None:
+            return await self._transport.handle_async_request(request)
+        with _tracer.start_as_current_span(f"HTTP {request.method}", kind=SpanKind.CLIENT, attributes={
+            "http.method": request.method,
+            "http.url": str(request.url.copy_remove_param("apiKey")),
+            "net.peer.name": request.url.host,
+        }) as current:
+            carrier: Dict[str, str] = {}
+            propagate.inject(carrier)
+            request.headers.update(carrier)
+            response = await self._transport.handle_async_request(request)
+            current.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                current.set_status(Status(StatusCode.ERROR))
+            return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+def async_http_client(transport: Optional[httpx.AsyncBaseTransport] = None, **kwargs) -> httpx.AsyncClient:
+    """httpx.AsyncClient whose requests are traced while tracing is configured"""
+    if _tracer is None:
+        return httpx.AsyncClient(transport=transport, **kwargs)
+    if transport is None:
+        transport = httpx.AsyncHTTPTransport(limits=kwargs.pop("limits", httpx.Limits(max_connections=100, max_keepalive_connections=20)))
+    return httpx.AsyncClient(transport=TracedTransport(transport), **kwargs)
+
+# ASGI
+
+class TracingMiddleware:
+    """Pure ASGI middleware: one server span per request, continuing an incoming W3C trace."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _tracer is None:
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope.get("headers", ())}
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        method = scope["method"]
+        with _tracer.start_as_current_span(
+            f"{method} {scope['path']}",
+            context=propagate.extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={"http.method": method, "http.target": scope["path"]},
+        ) as current:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    current.update_name(f"{method} {route}")
+                    current.set_attribute("http.route", route)
+                current.set_attribute("http.status_code", status_code)
+                if status_code >= 500:
+                    current.set_status(Status(StatusCode.ERROR))
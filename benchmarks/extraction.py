@@ -0,0 +1,119 @@
+"""
+Full-text extraction throughput against local stub publisher sites.
+
+Starts several stub HTTP servers (one per "host"), stores articles pointing at
+them with NewsAPI-style truncated content, then runs the extraction job twice:
+the cold pass fetches every page, the warm pass must be served entirely from
+the content-addressed page cache.
+
+    python -m benchmarks.extraction [--articles 120] [--hosts 6] [--latency 0.05]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+
+from starlette.applications import Starlette
+from starlette.responses import HTMLResponse
+from starlette.routing import Route
+
+from benchmarks.fakes import ARTICLE_BODY, FakeNewsAPI
+from benchmarks.harness import BenchConfig, BenchEnvironment
+
+PAGE_TEMPLATE = """<html><head><title>{title}</title><script>var tracking = 1;</script></head>
+<body><nav><a href="/">Home</a> <a href="/world">World</a></nav>
+<header><p>Subscribe to our newsletter for the latest updates every morning.</p></header>
+<main><article><h1>{title}</h1>{paragraphs}</article></main>
+<aside><p>Related: ten other stories you might like to read this afternoon.</p></aside>
+<footer><p>Copyright 2024 Example Publishing Group. All rights reserved worldwide.</p></footer>
+</body></html>"""
+
+
+class StubPublisher(FakeNewsAPI):
+    """Serves article pages at /articles/{n} with fixed latency"""
+
+    async def _page(self, request):
+        self.calls["page"] += 1
+        await asyncio.sleep(self.latency)
+        n = request.path_params["n"]
+        paragraphs = "".join(f"<p>{sentence.strip()}.</p>" for sentence in (ARTICLE_BODY * 3).split(".") if sentence.strip())
+        return HTMLResponse(PAGE_TEMPLATE.format(title=f"Article {n}", paragraphs=paragraphs))
+
+    def start(self):
+        import threading
+        import uvicorn
+        app = Starlette(routes=[Route("/articles/{n}", self._page)])
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="error", access_log=False)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+
+
+async def run(env: BenchEnvironment, articles: int, hosts: int, latency: float) -> dict:
+    from app.database import SessionLocal
+    from app.jobs import extract
+    from app.services.extraction_service import extraction_service
+    from app.services.news_service import news_service
+
+    publishers = [StubPublisher(latency=latency) for _ in range(hosts)]
+    for publisher in publishers:
+        publisher.start()
+    try:
+        db = SessionLocal()
+        try:
+            for i in range(articles):
+                publisher = publishers[i % hosts]
+                news_service.save_article_to_db(db, {
+                    "title": f"Extraction article {i}",
+                    "url": f"{publisher.base_url}/articles/{i}",
+                    "content": ARTICLE_BODY[:190] + "… [+2400 chars]",
+                })
+        finally:
+            db.close()
+
+        results = {}
+        for name, refresh in (("cold", False), ("warm", True)):
+            extraction_service.fetches = extraction_service.cache_hits = 0
+            start = time.perf_counter()
+            stats = await extract.run(articles, refresh=refresh)
+            elapsed = time.perf_counter() - start
+            results[name] = {
+                **stats,
+                "seconds": round(elapsed, 3),
+                "pages_per_second": round(articles / elapsed, 1),
+            }
+        results["upstream_page_requests"] = sum(sum(p.calls.values()) for p in publishers)
+        return results
+    finally:
+        for publisher in publishers:
+            publisher.stop()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Extraction throughput benchmark")
+    parser.add_argument("--articles", type=int, default=120)
+    parser.add_argument("--hosts", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--politeness-delay", type=float, default=0.0)
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    import os
+    os.environ["EXTRACTION_POLITENESS_DELAY_SECONDS"] = str(args.politeness_delay)
+    # The stub publishers listen on 127.0.0.1
+    os.environ["EXTRACTION_ALLOW_PRIVATE_HOSTS"] = "true"
+    env = BenchEnvironment(BenchConfig()).start()
+    try:
+        results = asyncio.run(run(env, args.articles, args.hosts, args.latency))
+    finally:
+        env.stop()
+    print(json.dumps(results, indent=2))
+    return 0 if results["warm"]["fetched"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
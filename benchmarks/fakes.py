@@ -0,0 +1,178 @@
+"""
+Local stand-ins for the upstream services used by the benchmark suite.
+
+- FakeNewsAPI: a real HTTP server (uvicorn in a background thread) that serves
+  /top-headlines and /everything with configurable latency and error rate.
+- FakeGeminiModel: an in-process replacement for genai.GenerativeModel that
+  sleeps synchronously like the real SDK does and counts calls.
+"""
+import asyncio
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+from typing import Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+CATEGORIES = ["business", "entertainment", "general", "health", "science", "sports", "technology"]
+
+ARTICLE_BODY = (
+    "Officials confirmed on Tuesday that the new policy will take effect next month. "
+    "Analysts expect the change to affect thousands of companies across the region. "
+    "Critics argue the timeline is too short for smaller firms to adapt. "
+    "Supporters say the measure addresses long-standing concerns raised by consumers. "
+    "The announcement follows months of negotiation between industry groups and regulators. "
+)
+# What NewsAPI sends for most articles: ~200 chars cut mid-word plus the remaining length
+TRUNCATED_BODY = ARTICLE_BODY[:180] + "… [+2345 chars]"
+
+
+def make_article(seed: str, index: int, category: Optional[str] = None) -> dict:
+    return {
+        "source": {"id": f"source-{index % 9}", "name": f"Source {index % 9}"},
+        "author": f"Reporter {index % 13}",
+        "title": f"{seed.title()} story number {index}",
+        "description": f"Description for {seed} story {index}. " * 3,
+        "url": f"https://news.example.com/{seed}/{index}",
+        "urlToImage": f"https://img.example.com/{seed}/{index}.jpg",
+        "publishedAt": "2024-01-15T10:%02d:00Z" % (index % 60),
+        # Every fifth article only has NewsAPI's truncated stub
+        "content": TRUNCATED_BODY if index % 5 == 4 else ARTICLE_BODY * 2,
+        "category": category,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeNewsAPI:
+    """NewsAPI-compatible HTTP server with injectable latency and failures."""
+
+    def __init__(self, latency: float = 0.05, error_rate: float = 0.0, seed: int = 1234):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = Counter()
+        self._random = random.Random(seed)
+        self.port = _free_port()
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def reset(self):
+        self.calls.clear()
+
+    async def _respond(self, endpoint: str, request, seed: str):
+        self.calls[endpoint] += 1
+        await asyncio.sleep(self.latency)
+        if self.error_rate and self._random.random() < self.error_rate:
+            return JSONResponse({"status": "error", "code": "rateLimited"}, status_code=429)
+
+        page_size = int(request.query_params.get("pageSize", 20))
+        page = int(request.query_params.get("page", 1))
+        offset = (page - 1) * page_size
+        category = request.query_params.get("category")
+        articles = [make_article(seed, offset + i, category) for i in range(page_size)]
+        return JSONResponse({"status": "ok", "totalResults": 500, "articles": articles})
+
+    async def _top_headlines(self, request):
+        return await self._respond("top-headlines", request, request.query_params.get("category", "general"))
+
+    async def _everything(self, request):
+        return await self._respond("everything", request, request.query_params.get("q", "query").replace(" ", "-"))
+
+    def start(self):
+        app = Starlette(routes=[
+            Route("/top-headlines", self._top_headlines),
+            Route("/everything", self._everything),
+        ])
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="error", access_log=False)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Fake NewsAPI server did not start")
+            time.sleep(0.01)
+
+    def stop(self):
+        if self._server:
+            self._server.should_exit = True
+            self._thread.join(timeout=5)
+
+
+class _FakePart:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _FakeMessage:
+    def __init__(self, role: str, text: str):
+        self.role = role
+        self.parts = [_FakePart(text)]
+
+
+class _FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+        self.usage_metadata = None
+
+
+class _FakeChat:
+    def __init__(self, model: "FakeGeminiModel", history: list):
+        self._model = model
+        self.history = [
+            _FakeMessage(item["role"], " ".join(item["parts"])) if isinstance(item, dict) else item
+            for item in history
+        ]
+
+    def send_message(self, message: str):
+        response = self._model._call("chat", message)
+        self.history.append(_FakeMessage("user", message))
+        self.history.append(_FakeMessage("model", response.text))
+        return response
+
+
+class FakeGeminiModel:
+    """Stand-in for genai.GenerativeModel with the same blocking call shape."""
+
+    def __init__(self, latency: float = 0.2, error_rate: float = 0.0, seed: int = 4321):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def reset(self):
+        self.calls.clear()
+
+    def _call(self, kind: str, prompt: str) -> _FakeResponse:
+        with self._lock:
+            self.calls[kind] += 1
+            fail = self.error_rate and self._random.random() < self.error_rate
+        time.sleep(self.latency)
+        if fail:
+            raise RuntimeError("429 Resource has been exhausted (e.g. check quota).")
+        words = prompt.split()[:60]
+        return _FakeResponse("Summary: " + " ".join(words[-40:]) + ".")
+
+    def generate_content(self, prompt: str):
+        return self._call("generate_content", prompt)
+
+    def start_chat(self, history: Optional[list] = None):
+        return _FakeChat(self, history or [])
+
+    def count_tokens(self, prompt: str):
+        return SimpleNamespace(total_tokens=max(1, len(prompt) // 4))
@@ -0,0 +1,85 @@
+"""
+Micro-benchmarks for the hot helpers: RedisClient, the cached NewsService path
+and get_current_user.
+"""
+import asyncio
+import time
+
+from benchmarks.fakes import make_article
+from benchmarks.harness import BenchEnvironment
+from benchmarks.scenarios import _auth_headers, _ensure_user
+from benchmarks.stats import ScenarioResult
+
+
+def _measure(name: str, func, iterations: int) -> ScenarioResult:
+    result = ScenarioResult(name)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        op_start = time.perf_counter()
+        func()
+        result.latencies.append(time.perf_counter() - op_start)
+    result.duration = time.perf_counter() - start
+    return result
+
+
+def _headline_payload(size: int = 100) -> dict:
+    return {
+        "status": "ok",
+        "totalResults": size,
+        "articles": [make_article("micro", i, "technology") for i in range(size)],
+    }
+
+
+def redis_get(env: BenchEnvironment, scale: float = 1.0) -> ScenarioResult:
+    from app.utils.redis_client import redis_client
+    redis_client.set("news:headlines:micro", _headline_payload(), expire=600)
+    return _measure("micro_redis_get", lambda: redis_client.get("news:headlines:micro"), int(2000 * scale))
+
+
+def redis_set(env: BenchEnvironment, scale: float = 1.0) -> ScenarioResult:
+    from app.utils.redis_client import redis_client
+    payload = _headline_payload()
+    return _measure("micro_redis_set", lambda: redis_client.set("news:headlines:micro", payload, expire=600),
+                    int(2000 * scale))
+
+
+def cached_headlines(env: BenchEnvironment, scale: float = 1.0) -> ScenarioResult:
+    from app.services.news_service import news_service
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(news_service.fetch_top_headlines("technology", "us", 1, 100))
+        env.reset_counters()
+        result = _measure("micro_cached_headlines",
+                          lambda: loop.run_until_complete(news_service.fetch_top_headlines("technology", "us", 1, 100)),
+                          int(2000 * scale))
+    finally:
+        loop.run_until_complete(news_service.aclose())
+        loop.close()
+    result.upstream_calls = env.upstream_calls()
+    return result
+
+
+def current_user(env: BenchEnvironment, scale: float = 1.0) -> ScenarioResult:
+    from app.database import SessionLocal
+    from app.utils.security import get_current_user
+
+    user_id = _ensure_user("micro@bench.example.com", "micro")
+    token = _auth_headers(user_id)["Authorization"].split(" ", 1)[1]
+    loop = asyncio.new_event_loop()
+    db = SessionLocal()
+    try:
+        result = _measure("micro_get_current_user",
+                          lambda: loop.run_until_complete(get_current_user(token=token, db=db)),
+                          int(2000 * scale))
+    finally:
+        db.close()
+        loop.close()
+    return result
+
+
+MICRO_BENCHMARKS = {
+    "micro_redis_get": redis_get,
+    "micro_redis_set": redis_set,
+    "micro_cached_headlines": cached_headlines,
+    "micro_get_current_user": current_user,
+}
@@ -0,0 +1,131 @@
+"""
+Run the offline benchmark suite.
+
+    python -m benchmarks.run                      # all scenarios + micro-benchmarks
+    python -m benchmarks.run -s headline_burst    # a single scenario
+    python -m benchmarks.run --save-baseline      # overwrite benchmarks/baseline.json
+    python -m benchmarks.run --fail-on-regression # exit 1 when worse than baseline
+    python -m benchmarks.run --strict-loop        # exit 1 when a scenario blocks the event loop
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+from benchmarks.harness import BenchConfig, BenchEnvironment
+from benchmarks.micro import MICRO_BENCHMARKS
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.stats import compare
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="ThinkFeed offline benchmarks")
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted({**SCENARIOS, **MICRO_BENCHMARKS}),
+                        help="Scenario to run (repeatable). Defaults to all.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply request counts")
+    parser.add_argument("--newsapi-latency", type=float, default=0.05, help="Fake NewsAPI latency in seconds")
+    parser.add_argument("--newsapi-error-rate", type=float, default=0.0)
+    parser.add_argument("--gemini-latency", type=float, default=0.2, help="Fake Gemini latency in seconds")
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--strict-loop", action="store_true",
+                        help="Fail when the event-loop watchdog sees a block above the threshold")
+    parser.add_argument("--loop-threshold-ms", type=float, help="Watchdog threshold (default LOOP_WATCHDOG_THRESHOLD_MS)")
+    return parser.parse_args(argv)
+
+
+async def run_scenario(env: BenchEnvironment, scenario, scale: float):
+    async with env.lifespan():
+        return await scenario(env, scale)
+
+
+def print_table(results: dict):
+    header = f"{'scenario':<26}{'reqs':>7}{'errs':>6}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  upstream"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        upstream = ", ".join(f"{k}={v}" for k, v in r["upstream_calls"].items())
+        print(f"{name:<26}{r['requests']:>7}{r['errors']:>6}{r['throughput_rps']:>10}"
+              f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}  {upstream}")
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.disable(logging.WARNING)
+    selected = args.scenario or list(SCENARIOS) + list(MICRO_BENCHMARKS)
+
+    env = BenchEnvironment(BenchConfig(
+        newsapi_latency=args.newsapi_latency,
+        newsapi_error_rate=args.newsapi_error_rate,
+        gemini_latency=args.gemini_latency,
+        gemini_error_rate=args.gemini_error_rate,
+    )).start()
+
+    from app.config import settings
+    from app.utils.loop_watchdog import LoopBlockedError, loop_watchdog
+    if args.strict_loop:
+        settings.LOOP_WATCHDOG_ENABLED = True
+        if args.loop_threshold_ms:
+            settings.LOOP_WATCHDOG_THRESHOLD_MS = args.loop_threshold_ms
+
+    results = {}
+    blocked = {}
+    try:
+        for name in selected:
+            if name in SCENARIOS:
+                result = asyncio.run(run_scenario(env, SCENARIOS[name], args.scale))
+                reports = list(loop_watchdog.reports)
+                try:
+                    loop_watchdog.raise_if_blocked()
+                except LoopBlockedError as e:
+                    blocked[name] = (str(e), reports)
+            else:
+                result = MICRO_BENCHMARKS[name](env, args.scale)
+            results[name] = result.summary()
+    finally:
+        env.stop()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+    if args.strict_loop and blocked:
+        print(f"\nEvent loop blocked above {settings.LOOP_WATCHDOG_THRESHOLD_MS} ms:")
+        for name, (message, reports) in blocked.items():
+            print(f"  - {name}: {message}")
+            worst = max(reports, key=lambda report: report.blocked_ms)
+            print(f"    longest ({worst.blocked_ms}+ ms):")
+            print("".join(f"      {line}\n" for line in worst.stack.rstrip().splitlines()[-12:]))
+        return 1
+
+    if args.save_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if args.baseline.exists():
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  - {line}")
+            if args.fail_on_regression:
+                return 1
+        else:
+            print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+Scripted load scenarios. Each takes a started BenchEnvironment and a scale
+factor and returns a ScenarioResult.
+"""
+import asyncio
+import time
+
+from benchmarks.fakes import ARTICLE_BODY, CATEGORIES, make_article
+from benchmarks.harness import BenchEnvironment
+from benchmarks.stats import ScenarioResult
+
+BENCH_PASSWORD = "bench-password"
+
+
+async def _timed(client, result: ScenarioResult, method: str, url: str, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        if response.status_code >= 400:
+            result.errors += 1
+        return response
+    except Exception:
+        result.errors += 1
+        return None
+    finally:
+        result.latencies.append(time.perf_counter() - start)
+
+
+async def _run_bounded(coros, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(bounded(coro) for coro in coros))
+
+
+def _ensure_user(email: str, username: str):
+    from app.database import SessionLocal
+    from app.models.user import User
+    from app.utils.security import get_password_hash
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == email).first()
+        if not user:
+            user = User(email=email, username=username, hashed_password=get_password_hash(BENCH_PASSWORD))
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+        return user.id
+    finally:
+        db.close()
+
+
+def _auth_headers(user_id: int) -> dict:
+    from app.services.auth_service import auth_service
+    return {"Authorization": f"Bearer {auth_service.create_token(user_id)}"}
+
+
+async def headline_burst(env: BenchEnvironment, scale: float = 1.0) -> ScenarioResult:
+    """Every category expires at once and a burst of readers arrives."""
+    result = ScenarioResult("headline_burst")
+    total = int(210 * scale)
+    env.flush_cache()
+    env.reset_counters()
+    async with env.client() as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _timed(client, result, "GET", "/api/news/headlines", params={"category": CATEGORIES[i % len(CATEGORIES)]})
+            for i in range(total)
+        ))
+        result.duration = time.perf_counter() - start
+    result.upstream_calls = env.upstream_calls()
+    return result
+
+
+async def login_storm(env: BenchEnvironment, scale: float = 1.0) -> ScenarioResult:
+    """Many users log in at once (bcrypt + user lookup)."""
+    result = ScenarioResult("login_storm")
+    users = max(1, int(10 * scale))
+    logins = max(1, int(30 * scale))
+    emails = [f"storm{i}@bench.example.com" for i in range(users)]
+    for i, email in enumerate(emails):
+        _ensure_user(email, f"storm{i}")
+    env.reset_counters()
+    async with env.client() as client:
+        start = time.perf_counter()
+        await _run_bounded((
+            _timed(client, result, "POST", "/api/auth/login",
+                   json={"email": emails[i % users], "password": BENCH_PASSWORD})
+            for i in range(logins)
+        ), concurrency=15)
+        result.duration = time.perf_counter() - start
+    result.upstream_calls = env.upstream_calls()
+    return result
+
+
+async def _summarize_batch(env: BenchEnvironment, name: str, mode: str, scale: float) -> ScenarioResult:
+    from app.database import SessionLocal
+    from app.services.news_service import news_service
+
+    result = ScenarioResult(name)
+    count = max(1, int(20 * scale))
+    user_id = _ensure_user("summarizer@bench.example.com", "summarizer")
+    headers = _auth_headers(user_id)
+
+    db = SessionLocal()
+    try:
+        article_ids = []
+        for i in range(count):
+            data = make_article(name, i)
+            # Every other article is long enough that `auto` routes it to Gemini
+            data["content"] = ARTICLE_BODY * (6 if i % 2 == 0 else 12)
+            article_ids.append(news_service.save_article_to_db(db, data).id)
+    finally:
+        db.close()
+
+    env.flush_cache()
+    env.reset_counters()
+    async with env.client() as client:
+        start = time.perf_counter()
+        for _ in range(2):
+            await _run_bounded((
+                _timed(client, result, "POST", f"/api/ai/summarize/{article_id}?mode={mode}", headers=headers)
+                for article_id in article_ids
+            ), concurrency=10)
+        result.duration = time.perf_counter() - start
+    result.upstream_calls = env.upstream_calls()
+    return result
+
+
+async def batch_summarize(env: BenchEnvironment, scale: float = 1.0) -> ScenarioResult:
+    """Summarize a batch of saved articles with Gemini twice: a cold pass then a warm pass."""
+    return await _summarize_batch(env, "batch_summarize", "llm", scale)
+
+
+async def auto_summarize(env: BenchEnvironment, scale: float = 1.0) -> ScenarioResult:
+    """Same batch in `auto` mode: short articles are summarized locally, long ones by Gemini."""
+    return await _summarize_batch(env, "auto_summarize", "auto", scale)
+
+
+async def long_chat(env: BenchEnvironment, scale: float = 1.0) -> ScenarioResult:
+    """Several users hold multi-turn conversations concurrently."""
+    result = ScenarioResult("long_chat")
+    sessions = max(1, int(5 * scale))
+    turns = 8
+    user_ids = [_ensure_user(f"chatter{i}@bench.example.com", f"chatter{i}") for i in range(sessions)]
+
+    async def conversation(client, user_id: int):
+        headers = _auth_headers(user_id)
+        await _timed(client, result, "DELETE", "/api/chat/history", headers=headers)
+        for turn in range(turns):
+            await _timed(client, result, "POST", "/api/chat/message", headers=headers,
+                         json={"message": f"What is the latest news about topic {turn}?"})
+
+    env.reset_counters()
+    async with env.client() as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(conversation(client, user_id) for user_id in user_ids))
+        result.duration = time.perf_counter() - start
+    result.upstream_calls = env.upstream_calls()
+    return result
+
+
+async def presummarized_reads(env: BenchEnvironment, scale: float = 1.0) -> ScenarioResult:
+    """Readers summarize top headlines after the pre-summarization job has run."""
+    from app.jobs import presummarize
+
+    result = ScenarioResult("presummarized_reads")
+    top = max(1, int(5 * scale))
+    user_id = _ensure_user("reader@bench.example.com", "reader")
+    headers = _auth_headers(user_id)
+
+    env.flush_cache()
+    async with env.client() as client:
+        for category in CATEGORIES:
+            await client.get("/api/news/headlines", params={"category": category, "page_size": top})
+        await asyncio.to_thread(presummarize.run_once, top * len(CATEGORIES))
+
+        env.reset_counters()
+        urls = [f"https://news.example.com/{category}/{i}" for category in CATEGORIES for i in range(top)]
+        start = time.perf_counter()
+        await _run_bounded((
+            _timed(client, result, "POST", "/api/ai/summarize", headers=headers, json={"article_url": url})
+            for url in urls * 2
+        ), concurrency=10)
+        result.duration = time.perf_counter() - start
+    result.upstream_calls = env.upstream_calls()
+    return result
+
+
+SCENARIOS = {
+    "headline_burst": headline_burst,
+    "login_storm": login_storm,
+    "batch_summarize": batch_summarize,
+    "auto_summarize": auto_summarize,
+    "long_chat": long_chat,
+    "presummarized_reads": presummarized_reads,
+}
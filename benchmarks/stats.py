@@ -0,0 +1,52 @@
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    duration: float = 0.0
+    upstream_calls: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> dict:
+        requests = len(self.latencies)
+        return {
+            "requests": requests,
+            "errors": self.errors,
+            "throughput_rps": round(requests / self.duration, 2) if self.duration else 0.0,
+            "p50_ms": round(percentile(self.latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(self.latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(self.latencies, 99) * 1000, 3),
+            "upstream_calls": dict(self.upstream_calls),
+        }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Return human-readable regressions of ``current`` against ``baseline``."""
+    regressions = []
+    for name, result in current.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base.get("throughput_rps") and result["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {result['throughput_rps']} rps < baseline {base['throughput_rps']} rps"
+            )
+        if base.get("p95_ms") and result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']} ms > baseline {base['p95_ms']} ms")
+        for upstream, calls in result.get("upstream_calls", {}).items():
+            base_calls = base.get("upstream_calls", {}).get(upstream)
+            if base_calls is not None and calls > base_calls:
+                regressions.append(f"{name}: {upstream} calls {calls} > baseline {base_calls}")
+    return regressions